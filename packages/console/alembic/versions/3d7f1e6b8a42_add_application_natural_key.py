@@ -0,0 +1,79 @@
+"""Add a unique natural key to applications
+
+Revision ID: 3d7f1e6b8a42
+Revises: 8c4e2b7a9d31
+Create Date: 2026-10-17 13:05:47.920316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3d7f1e6b8a42"
+down_revision: Union[str, None] = "8c4e2b7a9d31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fold duplicate applications into the oldest row with the same key
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE application_canonical ON COMMIT DROP AS
+        SELECT id, first_value(id) OVER (
+            PARTITION BY organization_id, name, version, hash
+            ORDER BY created_at, id
+        ) AS canonical_id
+        FROM applications
+        """
+    )
+    # A device may list several duplicates; keep one inventory row per device,
+    # preferring the one that already points at the canonical application
+    op.execute(
+        """
+        DELETE FROM inventories
+        WHERE id IN (
+            SELECT ranked.id
+            FROM (
+                SELECT inventories.id, row_number() OVER (
+                    PARTITION BY inventories.device_id, c.canonical_id
+                    ORDER BY (inventories.application_id = c.canonical_id) DESC,
+                             inventories.last_updated DESC NULLS LAST,
+                             inventories.id
+                ) AS position
+                FROM inventories
+                JOIN application_canonical AS c
+                  ON c.id = inventories.application_id
+            ) AS ranked
+            WHERE ranked.position > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE inventories
+        SET application_id = c.canonical_id
+        FROM application_canonical AS c
+        WHERE inventories.application_id = c.id AND c.id <> c.canonical_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM applications
+        USING application_canonical AS c
+        WHERE applications.id = c.id AND c.id <> c.canonical_id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_applications_org_name_version_hash",
+        "applications",
+        ["organization_id", "name", "version", "hash"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_applications_org_name_version_hash", "applications", type_="unique"
+    )
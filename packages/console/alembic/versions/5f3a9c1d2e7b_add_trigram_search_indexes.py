@@ -0,0 +1,54 @@
+"""Add trigram indexes for substring search
+
+Revision ID: 5f3a9c1d2e7b
+Revises: 11c29dcb85ba
+Create Date: 2026-10-17 10:12:31.218904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5f3a9c1d2e7b"
+down_revision: Union[str, None] = "11c29dcb85ba"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) for every column searched with ILIKE '%term%'
+TRIGRAM_INDEXES = [
+    ("ix_devices_name_trgm", "devices", "name"),
+    ("ix_devices_serial_number_trgm", "devices", "serial_number"),
+    ("ix_activity_logs_activity_type_trgm", "activity_logs", "activity_type"),
+    ("ix_file_recoveries_file_name_trgm", "file_recoveries", "file_name"),
+    ("ix_applications_name_trgm", "applications", "name"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build the indexes without blocking writes to the searched tables
+    with op.get_context().autocommit_block():
+        for index_name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                index_name,
+                table,
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    # The pg_trgm extension is left installed; other objects may depend on it
+    with op.get_context().autocommit_block():
+        for index_name, table, _ in TRIGRAM_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,137 @@
+"""Add composite indexes matching the list queries
+
+Revision ID: 8c4e2b7a9d31
+Revises: 5f3a9c1d2e7b
+Create Date: 2026-10-17 11:40:05.613027
+
+"""
+
+from typing import List, Optional, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4e2b7a9d31"
+down_revision: Union[str, None] = "5f3a9c1d2e7b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns); every list filters by owner and sorts newest first
+COMPOSITE_INDEXES = [
+    (
+        "ix_activity_logs_org_id_created_at",
+        "activity_logs",
+        ["org_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    ),
+    (
+        "ix_activity_logs_device_id_org_id_created_at",
+        "activity_logs",
+        ["device_id", "org_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    ),
+    (
+        "ix_file_recoveries_org_id_created_at",
+        "file_recoveries",
+        ["org_id", sa.text("created_at DESC")],
+    ),
+    (
+        "ix_file_recoveries_device_id_org_id_created_at",
+        "file_recoveries",
+        ["device_id", "org_id", sa.text("created_at DESC")],
+    ),
+    (
+        "ix_devices_org_id_created_at",
+        "devices",
+        ["org_id", sa.text("created_at DESC")],
+    ),
+    (
+        "ix_applications_organization_id_created_at",
+        "applications",
+        ["organization_id", sa.text("created_at DESC")],
+    ),
+]
+
+# Leading columns of the composite indexes above; no longer worth maintaining
+REDUNDANT_INDEXES = [
+    ("ix_activity_logs_org_id", "activity_logs", "org_id"),
+    ("ix_activity_logs_device_id", "activity_logs", "device_id"),
+]
+
+
+def index_is_valid(name: str) -> Optional[bool]:
+    """Whether the index exists and is usable; None if it does not exist."""
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": name},
+        )
+        .scalar()
+    )
+
+
+def build_index(name: str, table: str, columns: List, unique: bool = False) -> None:
+    # A failed concurrent build (a duplicate key, a cancelled statement)
+    # leaves an invalid index that IF NOT EXISTS would accept as built
+    valid = index_is_valid(name)
+    if valid is False:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    if not valid:
+        op.create_index(
+            name, table, columns, unique=unique, postgresql_concurrently=True
+        )
+
+
+def upgrade() -> None:
+    # Build the indexes without blocking writes to the listed tables
+    with op.get_context().autocommit_block():
+        # Keep the most recently updated row for each device and application
+        # pair, right before the build, so few duplicates can arrive between
+        # the two; if one does, the build fails and a rerun starts over
+        op.execute(
+            """
+            DELETE FROM inventories AS stale
+            USING inventories AS newer
+            WHERE stale.device_id = newer.device_id
+              AND stale.application_id = newer.application_id
+              AND (COALESCE(stale.last_updated, '-infinity'), stale.id)
+                < (COALESCE(newer.last_updated, '-infinity'), newer.id)
+            """
+        )
+        build_index(
+            "uq_inventories_device_id_application_id",
+            "inventories",
+            ["device_id", "application_id"],
+            unique=True,
+        )
+        for index_name, table, columns in COMPOSITE_INDEXES:
+            build_index(index_name, table, columns)
+        for index_name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table, column in REDUNDANT_INDEXES:
+            build_index(index_name, table, [column])
+        for index_name, table, _ in reversed(COMPOSITE_INDEXES):
+            op.drop_index(
+                index_name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+        op.drop_index(
+            "uq_inventories_device_id_application_id",
+            table_name="inventories",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,29 @@
+"""Add inventory digest to devices
+
+Revision ID: b2e6d4c8f913
+Revises: 3d7f1e6b8a42
+Create Date: 2026-10-17 14:22:10.384615
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b2e6d4c8f913"
+down_revision: Union[str, None] = "3d7f1e6b8a42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Starts empty, so each device does one full diff sync before short-circuiting
+    op.add_column(
+        "devices", sa.Column("inventory_digest", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("devices", "inventory_digest")
@@ -0,0 +1,151 @@
+"""Partition activity_logs by month of created_at
+
+The existing table is attached whole as the partition for everything before
+the next month, so no rows are copied; monthly partitions follow it and the
+retention job drops the legacy partition once all of its rows have expired.
+Rows stamped after the end of the current month are rejected until the
+upgrade has finished, so do not start it in the month's last minutes. After
+it, a DEFAULT partition takes rows for months the maintenance job has not
+created yet, and that job moves them out when it creates their partition.
+
+Revision ID: c7e1a5f2d094
+Revises: b2e6d4c8f913
+Create Date: 2026-10-17 15:12:48.204117
+
+"""
+
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e1a5f2d094"
+down_revision: Union[str, None] = "b2e6d4c8f913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEGACY = "activity_logs_legacy"
+# Monthly partitions created past the current month; the maintenance job
+# keeps this many ahead from then on
+MONTHS_AHEAD = 3
+
+# (index name, definition) of every index on activity_logs
+INDEXES = [
+    ("ix_activity_logs_activity_type", "(activity_type)"),
+    ("ix_activity_logs_created_at", "(created_at)"),
+    ("ix_activity_logs_severity", "(severity)"),
+    ("ix_activity_logs_org_id_created_at", "(org_id, created_at DESC, id DESC)"),
+    (
+        "ix_activity_logs_device_id_org_id_created_at",
+        "(device_id, org_id, created_at DESC, id DESC)",
+    ),
+    ("ix_activity_logs_activity_type_trgm", "USING gin (activity_type gin_trgm_ops)"),
+]
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    month = moment.month - 1 + months
+    return moment.replace(year=moment.year + month // 12, month=month % 12 + 1)
+
+
+def index_is_valid(name: str) -> Optional[bool]:
+    """Whether the index exists and is usable; None if it does not exist."""
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": name},
+        )
+        .scalar()
+    )
+
+
+def upgrade() -> None:
+    now = datetime.now(timezone.utc)
+    this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    boundary = add_months(this_month, 1)
+
+    # The partition key must be part of the primary key. Build its index and
+    # prove every row predates the boundary without blocking writes, so the
+    # attach below neither builds an index nor scans the table under lock
+    with op.get_context().autocommit_block():
+        # Left behind by an earlier attempt that failed further down
+        op.execute(
+            "ALTER TABLE activity_logs "
+            "DROP CONSTRAINT IF EXISTS activity_logs_legacy_bound"
+        )
+        # An interrupted concurrent build leaves an invalid index behind, which
+        # IF NOT EXISTS would accept; only a valid one is kept
+        valid = index_is_valid("activity_logs_legacy_pkey")
+        if valid is False:
+            op.execute("DROP INDEX CONCURRENTLY activity_logs_legacy_pkey")
+        if not valid:
+            op.execute(
+                "CREATE UNIQUE INDEX CONCURRENTLY activity_logs_legacy_pkey "
+                "ON activity_logs (id, created_at)"
+            )
+        op.execute(
+            "ALTER TABLE activity_logs ADD CONSTRAINT activity_logs_legacy_bound "
+            f"CHECK (created_at < '{boundary.isoformat()}') NOT VALID"
+        )
+        op.execute(
+            "ALTER TABLE activity_logs VALIDATE CONSTRAINT activity_logs_legacy_bound"
+        )
+
+    op.execute(f"ALTER TABLE activity_logs RENAME TO {LEGACY}")
+    op.execute(
+        f"ALTER TABLE {LEGACY} DROP CONSTRAINT activity_logs_pkey, "
+        "ADD CONSTRAINT activity_logs_legacy_pkey PRIMARY KEY "
+        "USING INDEX activity_logs_legacy_pkey"
+    )
+    for index_name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_legacy")
+
+    op.execute(
+        f"CREATE TABLE activity_logs (LIKE {LEGACY} INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE activity_logs ADD PRIMARY KEY (id, created_at)")
+    for index_name, definition in INDEXES:
+        op.execute(f"CREATE INDEX {index_name} ON activity_logs {definition}")
+
+    # The legacy indexes match the parent's, so they are attached, not rebuilt
+    op.execute(
+        f"ALTER TABLE activity_logs ATTACH PARTITION {LEGACY} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    )
+    op.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT activity_logs_legacy_bound")
+
+    start = boundary
+    for _ in range(MONTHS_AHEAD):
+        stop = add_months(start, 1)
+        op.execute(
+            f"CREATE TABLE activity_logs_p{start:%Y_%m} PARTITION OF activity_logs "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{stop.isoformat()}')"
+        )
+        start = stop
+    op.execute("CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_partitioned")
+    for index_name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_partitioned")
+    op.execute(
+        "ALTER INDEX activity_logs_pkey RENAME TO activity_logs_partitioned_pkey"
+    )
+
+    op.execute(
+        "CREATE TABLE activity_logs "
+        "(LIKE activity_logs_partitioned INCLUDING DEFAULTS)"
+    )
+    op.execute("INSERT INTO activity_logs SELECT * FROM activity_logs_partitioned")
+    op.execute("ALTER TABLE activity_logs ADD PRIMARY KEY (id)")
+    for index_name, definition in INDEXES:
+        op.execute(f"CREATE INDEX {index_name} ON activity_logs {definition}")
+    op.execute("DROP TABLE activity_logs_partitioned")
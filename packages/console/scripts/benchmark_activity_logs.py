@@ -0,0 +1,115 @@
+"""Measure activity log ingestion throughput against batch size.
+
+Seeds one throwaway device, then times
+``ActivityLogRepository.create_activity_logs`` at each batch size and reports
+logs per second. ``--baseline`` also times the previous per-row ORM path
+(add, commit, re-query the device names, refresh each log) for comparison.
+
+Run against a disposable database that has the migrations applied:
+
+    PYTHONPATH=src python scripts/benchmark_activity_logs.py --batch-sizes 1 100 10000
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models import ActivityLog, SeverityLevel
+from app.models.device import Device
+from app.repositories.activity_logs import ActivityLogRepository
+from app.schemas.activity_logs import ActivityLogCreate
+
+BENCH_ORG_ID = "benchmark-activity-logs-org"
+BENCH_DEVICE_ID = f"{BENCH_ORG_ID}-device"
+
+
+def make_batch(size: int) -> List[ActivityLogCreate]:
+    return [
+        ActivityLogCreate(
+            device_id=BENCH_DEVICE_ID,
+            activity_type="RANSOMWARE",
+            severity=SeverityLevel.HIGH,
+            details={"threat_name": "benchmark", "sequence": number},
+        )
+        for number in range(size)
+    ]
+
+
+def insert_per_row(db: Session, logs: List[ActivityLogCreate], org_id: str) -> None:
+    created = []
+    for log_data in logs:
+        log = ActivityLog(**log_data.model_dump(), org_id=org_id)
+        db.add(log)
+        created.append(log)
+    db.commit()
+    db.query(ActivityLog, Device.name).join(
+        Device, ActivityLog.device_id == Device.id
+    ).filter(ActivityLog.id.in_([log.id for log in created])).all()
+    for log in created:
+        db.refresh(log)
+
+
+def logs_per_second(
+    insert: Callable[[List[ActivityLogCreate], str], object], size: int, repeat: int
+) -> float:
+    samples = []
+    for _ in range(repeat):
+        batch = make_batch(size)
+        started = time.perf_counter()
+        insert(batch, BENCH_ORG_ID)
+        samples.append(time.perf_counter() - started)
+    return size / statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--baseline", action="store_true", help="also time the per-row ORM path"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    repository = ActivityLogRepository(db)
+    db.add(
+        Device(
+            id=BENCH_DEVICE_ID,
+            org_id=BENCH_ORG_ID,
+            name="benchmark-host",
+            serial_number=f"{BENCH_DEVICE_ID}-sn",
+        )
+    )
+    db.commit()
+    try:
+        header = f"{'batch':>8} {'logs/sec':>12}"
+        print(header + (f" {'per-row logs/sec':>18}" if args.baseline else ""))
+        for size in args.batch_sizes:
+            line = f"{size:>8} "
+            line += f"{logs_per_second(repository.create_activity_logs, size, args.repeat):>12.0f}"
+            if args.baseline:
+                baseline = logs_per_second(
+                    lambda logs, org_id: insert_per_row(db, logs, org_id),
+                    size,
+                    args.repeat,
+                )
+                line += f" {baseline:>18.0f}"
+            print(line)
+    finally:
+        db.rollback()
+        for table in ("activity_logs", "devices"):
+            db.execute(
+                text(f"DELETE FROM {table} WHERE org_id = :org_id"),
+                {"org_id": BENCH_ORG_ID},
+            )
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Measure device search latency against table size.
+
+Seeds a throwaway organization with synthetic devices in steps, then times
+``DeviceRepository.get_devices_by_criteria`` for a substring search and a
+short prefix search, once as planned and once with index scans disabled so
+the trigram indexes can be compared against a sequential scan.
+
+Run against a disposable database that has the migrations applied:
+
+    PYTHONPATH=src python scripts/benchmark_search.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.context import set_org_id
+from app.core.database import SessionLocal
+from app.repositories.device import DeviceRepository
+
+BENCH_ORG_ID = "benchmark-search-org"
+
+# Device names are md5 hex digests, so any hex fragment is a realistic hit rate
+SEARCHES = {"substring": "abc1", "prefix": "ab"}
+
+SEED_SQL = text(
+    """
+    INSERT INTO devices (id, org_id, name, type, serial_number, is_active, properties)
+    SELECT
+        :org_id || '-' || g,
+        :org_id,
+        md5(g::text),
+        'Workstation',
+        :org_id || '-SN-' || g,
+        true,
+        '{}'::jsonb
+    FROM generate_series(:start, :stop) AS g
+    """
+)
+
+
+def seed_devices(db: Session, start: int, stop: int) -> None:
+    db.execute(SEED_SQL, {"org_id": BENCH_ORG_ID, "start": start, "stop": stop})
+    db.commit()
+    db.execute(text("ANALYZE devices"))
+    db.commit()
+
+
+@contextmanager
+def index_scans_disabled(db: Session, disabled: bool) -> Iterator[None]:
+    if disabled:
+        db.execute(text("SET enable_bitmapscan = off"))
+        db.execute(text("SET enable_indexscan = off"))
+    try:
+        yield
+    finally:
+        db.execute(text("RESET enable_bitmapscan"))
+        db.execute(text("RESET enable_indexscan"))
+
+
+def time_search(db: Session, term: str, repeat: int, seq_scan: bool) -> float:
+    repository = DeviceRepository(db)
+    samples: List[float] = []
+    with index_scans_disabled(db, seq_scan):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            repository.get_devices_by_criteria(search_term=term, limit=50)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the seeded devices afterwards"
+    )
+    args = parser.parse_args()
+
+    set_org_id(BENCH_ORG_ID)
+    db = SessionLocal()
+    seeded = 0
+    try:
+        print(f"{'rows':>10} {'search':>10} {'indexed ms':>12} {'seq scan ms':>12}")
+        for size in sorted(args.sizes):
+            if size > seeded:
+                seed_devices(db, seeded + 1, size)
+                seeded = size
+            for name, term in SEARCHES.items():
+                indexed = time_search(db, term, args.repeat, seq_scan=False)
+                sequential = time_search(db, term, args.repeat, seq_scan=True)
+                print(f"{size:>10} {name:>10} {indexed:>12.2f} {sequential:>12.2f}")
+    finally:
+        if not args.keep:
+            db.execute(
+                text("DELETE FROM devices WHERE org_id = :org_id"),
+                {"org_id": BENCH_ORG_ID},
+            )
+            db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
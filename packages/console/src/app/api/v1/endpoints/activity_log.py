@@ -1,19 +1,31 @@
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.core.auth import get_org_from_api_key, jwt_required
-from app.core.dependencies import get_db
-from app.repositories.activity_logs import ActivityLogRepository
-from app.repositories.device import DeviceRepository
+from app.core.database import SessionLocal
+from app.core.dependencies import get_async_db, get_db, get_read_db
+from app.core.metrics import metrics
+from app.models import ActivityLog
+from app.repositories.activity_logs import (
+    ActivityLogRepository,
+    AsyncActivityLogRepository,
+)
+from app.repositories.device import AsyncDeviceRepository, DeviceRepository
+from app.repositories.partitions import MonthlyPartitionRepository
 from app.schemas.activity_logs import (
     ActivityLogCreate,
     ActivityLogResponse,
     ActivityLogsListResponse,
 )
-from app.schemas.common import OrgData
-from app.services.activity_logs import ActivityLogService
+from app.schemas.common import CountMode, IngestionAccepted, IngestionMode, OrgData
+from app.services.activity_logs import ActivityLogService, AsyncActivityLogService
+from app.services.ingestion_queue import ingestion_queue
 
 router = APIRouter()
 
@@ -24,16 +36,80 @@ def get_activity_log_service(db: Session = Depends(get_db)) -> ActivityLogServic
     return ActivityLogService(
         activity_log_repository=activity_log_repository,
         device_repository=device_repository,
+        queue=ingestion_queue,
+    )
+
+
+def get_activity_log_read_service(
+    db: Session = Depends(get_read_db),
+) -> ActivityLogService:
+    return get_activity_log_service(db)
+
+
+async def get_async_activity_log_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncActivityLogService:
+    return AsyncActivityLogService(
+        activity_log_repository=AsyncActivityLogRepository(db),
+        device_repository=AsyncDeviceRepository(db),
+        queue=ingestion_queue,
+    )
+
+
+def create_activity_log_partitions() -> int:
+    db = SessionLocal()
+    try:
+        with metrics.timer("activity_logs.partition_maintenance"):
+            created = MonthlyPartitionRepository(
+                db, ActivityLog.__tablename__
+            ).create_ahead(
+                datetime.now(timezone.utc),
+                settings.CONSOLE_ACTIVITY_LOG_PARTITIONS_AHEAD,
+            )
+    finally:
+        db.close()
+    metrics.increment("activity_logs.partitions_created", len(created))
+    return len(created)
+
+
+def expire_activity_log_partitions() -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.CONSOLE_ACTIVITY_LOG_RETENTION_DAYS
     )
+    db = SessionLocal()
+    try:
+        with metrics.timer("activity_logs.retention"):
+            removed = MonthlyPartitionRepository(
+                db, ActivityLog.__tablename__
+            ).remove_before(
+                cutoff, detach=settings.CONSOLE_ACTIVITY_LOG_RETENTION_DETACH
+            )
+    finally:
+        db.close()
+    metrics.increment("activity_logs.partitions_expired", len(removed))
+    return len(removed)
 
 
-@router.post("/activity-logs", response_model=List[ActivityLogResponse])
-def create_activity_log(
+@router.post(
+    "/activity-logs",
+    response_model=List[ActivityLogResponse],
+    responses={202: {"model": IngestionAccepted}},
+)
+async def create_activity_log(
     log_data: List[ActivityLogCreate],
+    mode: IngestionMode = IngestionMode.SYNC,
     org_data: OrgData = Depends(get_org_from_api_key),
-    activity_log_service: ActivityLogService = Depends(get_activity_log_service),
+    activity_log_service: AsyncActivityLogService = Depends(
+        get_async_activity_log_service
+    ),
 ):
-    return activity_log_service.create_activity_logs(log_data, org_data.org_id)
+    # Without a configured queue, async requests are served synchronously
+    if mode == IngestionMode.ASYNC and activity_log_service.queue is not None:
+        accepted = await activity_log_service.enqueue_activity_logs(
+            log_data, org_data.org_id
+        )
+        return JSONResponse(status_code=202, content=accepted.model_dump())
+    return await activity_log_service.create_activity_logs(log_data, org_data.org_id)
 
 
 @router.get("/activity-logs", response_model=ActivityLogsListResponse)
@@ -43,8 +119,12 @@ def list_activity_logs(
     severity: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    include_total: bool = True,
+    count_mode: CountMode = CountMode.EXACT,
     org_id: str = Depends(jwt_required),
-    activity_log_service: ActivityLogService = Depends(get_activity_log_service),
+    activity_log_service: ActivityLogService = Depends(get_activity_log_read_service),
 ):
     return activity_log_service.get_activity_logs_with_filters(
         org_id=org_id,
@@ -53,6 +133,10 @@ def list_activity_logs(
         severity=severity,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        since=since,
+        include_total=include_total,
+        count_mode=count_mode,
     )
 
 
@@ -65,9 +149,22 @@ def list_activity_logs_by_device(
     severity: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    include_total: bool = True,
+    count_mode: CountMode = CountMode.EXACT,
     org_id: str = Depends(jwt_required),
-    activity_log_service: ActivityLogService = Depends(get_activity_log_service),
+    activity_log_service: ActivityLogService = Depends(get_activity_log_read_service),
 ) -> ActivityLogsListResponse:
     return activity_log_service.get_activity_logs_by_device(
-        device_id, org_id, search=search, severity=severity, skip=skip, limit=limit
+        device_id,
+        org_id,
+        search=search,
+        severity=severity,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        since=since,
+        include_total=include_total,
+        count_mode=count_mode,
     )
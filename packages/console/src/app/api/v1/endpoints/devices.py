@@ -1,17 +1,20 @@
-import asyncio
-from datetime import datetime
 from typing import Optional
-from datetime import timezone
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
 
+from app.config import settings
 from app.core.auth import get_org_from_api_key, jwt_required
-from app.core.dependencies import get_db
-from app.repositories.device import DeviceRepository
+from app.core.database import SessionLocal
+from app.core.dependencies import get_async_db, get_db, get_read_db
+from app.core.metrics import metrics
+from app.repositories.device import AsyncDeviceRepository, DeviceRepository
 from app.repositories.endpoint_config import EndpointConfigRepository
-from app.schemas.common import OrgData
+from app.schemas.common import CountMode, OrgData
 from app.schemas.device import (
+    BulkHeartbeatRequest,
+    BulkHeartbeatResponse,
     DeviceBase,
     DeviceCreate,
     DeviceInDB,
@@ -20,7 +23,8 @@ from app.schemas.device import (
     DeviceUpdate,
     DeviceProperties,
 )
-from app.services.device import DeviceService
+from app.services.device import AsyncDeviceService, DeviceService
+from app.services.heartbeat_buffer import heartbeat_buffer
 from app.core.exceptions import DuplicateObjectException
 
 router = APIRouter()
@@ -42,18 +46,41 @@ def get_device_service(
         get_endpoint_config_repository
     ),
 ) -> DeviceService:
-    return DeviceService(repository, endpoint_config_repository)
+    return DeviceService(
+        repository,
+        endpoint_config_repository,
+        heartbeat_buffer if settings.CONSOLE_HEARTBEAT_WRITE_BEHIND else None,
+    )
+
 
+def get_device_read_service(db: Session = Depends(get_read_db)) -> DeviceService:
+    return DeviceService(
+        DeviceRepository(db),
+        EndpointConfigRepository(db),
+        heartbeat_buffer if settings.CONSOLE_HEARTBEAT_WRITE_BEHIND else None,
+    )
 
-async def check_device_status():
-    while True:
-        await asyncio.sleep(60)
-        db = next(get_db())
-        try:
-            repo = DeviceRepository(db)
-            repo.update_device_status()
-        finally:
-            db.close()
+
+async def get_async_device_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncDeviceService:
+    return AsyncDeviceService(
+        AsyncDeviceRepository(db),
+        heartbeat_buffer if settings.CONSOLE_HEARTBEAT_WRITE_BEHIND else None,
+    )
+
+
+def sweep_offline_devices() -> int:
+    db = SessionLocal()
+    try:
+        with metrics.timer("devices.offline_sweep"):
+            swept = DeviceRepository(db).update_device_status(
+                chunk_size=settings.CONSOLE_DEVICE_STATUS_SWEEP_CHUNK_SIZE
+            )
+    finally:
+        db.close()
+    metrics.increment("devices.marked_offline", swept)
+    return swept
 
 
 @router.post("/", response_model=DeviceInDB)
@@ -102,18 +129,26 @@ def update_device(
 
 
 @router.post("/{device_id}/heartbeat", response_model=DeviceInDB)
-def update_device_heartbeat(
+async def update_device_heartbeat(
     device_id: str,
     device_properties: Optional[DeviceProperties] = None,
     org_key: str = Depends(get_org_from_api_key),
-    service: DeviceService = Depends(get_device_service),
+    service: AsyncDeviceService = Depends(get_async_device_service),
 ):
     properties = {}
     if device_properties:
         properties = device_properties.model_dump()
 
-    device = DeviceUpdate(last_seen=datetime.now(timezone.utc), properties=properties)
-    return service.update_device(device_id, device)
+    return await service.record_heartbeat(device_id, properties)
+
+
+@router.post("/heartbeats", response_model=BulkHeartbeatResponse)
+async def update_device_heartbeats(
+    request: BulkHeartbeatRequest,
+    org_data: OrgData = Depends(get_org_from_api_key),
+    service: AsyncDeviceService = Depends(get_async_device_service),
+):
+    return await service.bulk_update_heartbeats(org_data.org_id, request.heartbeats)
 
 
 @router.delete("/{device_id}", response_model=DeviceInDB)
@@ -133,8 +168,9 @@ def read_devices_by_org(
     device_type: Optional[str] = None,
     status: Optional[str] = None,
     health: Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
     org_id: str = Depends(jwt_required),
-    service: DeviceService = Depends(get_device_service),
+    service: DeviceService = Depends(get_device_read_service),
 ):
     search = search.strip() if search else None
     health_value = health.upper() if health else None
@@ -147,6 +183,7 @@ def read_devices_by_org(
         health=health_value,
         skip=skip,
         limit=limit,
+        count_mode=count_mode,
     )
     message = None
     if total == 0:
@@ -156,5 +193,10 @@ def read_devices_by_org(
             message = "No devices found for this organization."
 
     return DeviceListResponse(
-        devices=devices, total=total, skip=skip, limit=limit, message=message
+        devices=devices,
+        total=total,
+        skip=skip,
+        limit=limit,
+        message=message,
+        count_mode=count_mode,
     )
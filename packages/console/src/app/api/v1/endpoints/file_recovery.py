@@ -1,20 +1,26 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_org_from_api_key, jwt_required
-from app.core.dependencies import get_db
-from app.repositories.device import DeviceRepository
-from app.repositories.file_recovery import FileRecoveryRepository
-from app.schemas.common import OrgData
+from app.core.dependencies import get_async_db, get_db, get_read_db
+from app.repositories.device import AsyncDeviceRepository, DeviceRepository
+from app.repositories.file_recovery import (
+    AsyncFileRecoveryRepository,
+    FileRecoveryRepository,
+)
+from app.schemas.common import CountMode, IngestionAccepted, IngestionMode, OrgData
 from app.schemas.file_recovery import (
     FileRecoveryCreate,
     FileRecoveryListResponse,
     FileRecoveryResponse,
     FileRecoveryUpdate,
 )
-from app.services.file_recovery import FileRecoveryService
+from app.services.file_recovery import AsyncFileRecoveryService, FileRecoveryService
+from app.services.ingestion_queue import ingestion_queue
 
 router = APIRouter()
 
@@ -23,17 +29,50 @@ def get_file_recovery_service(db: Session = Depends(get_db)) -> FileRecoveryServ
     repository = FileRecoveryRepository(db)
     device_repository = DeviceRepository(db)
     return FileRecoveryService(
-        file_recovery_repository=repository, device_repository=device_repository
+        file_recovery_repository=repository,
+        device_repository=device_repository,
+        queue=ingestion_queue,
+    )
+
+
+def get_file_recovery_read_service(
+    db: Session = Depends(get_read_db),
+) -> FileRecoveryService:
+    return get_file_recovery_service(db)
+
+
+async def get_async_file_recovery_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncFileRecoveryService:
+    return AsyncFileRecoveryService(
+        file_recovery_repository=AsyncFileRecoveryRepository(db),
+        device_repository=AsyncDeviceRepository(db),
+        queue=ingestion_queue,
     )
 
 
-@router.post("/file_recovery", response_model=List[FileRecoveryResponse])
-def create_file_recovery(
+@router.post(
+    "/file_recovery",
+    response_model=List[FileRecoveryResponse],
+    responses={202: {"model": IngestionAccepted}},
+)
+async def create_file_recovery(
     recovery_data: List[FileRecoveryCreate],
+    mode: IngestionMode = IngestionMode.SYNC,
     org_data: OrgData = Depends(get_org_from_api_key),
-    file_recovery_service: FileRecoveryService = Depends(get_file_recovery_service),
+    file_recovery_service: AsyncFileRecoveryService = Depends(
+        get_async_file_recovery_service
+    ),
 ):
-    return file_recovery_service.create_file_recovery(recovery_data, org_data.org_id)
+    # Without a configured queue, async requests are served synchronously
+    if mode == IngestionMode.ASYNC and file_recovery_service.queue is not None:
+        accepted = await file_recovery_service.enqueue_file_recoveries(
+            recovery_data, org_data.org_id
+        )
+        return JSONResponse(status_code=202, content=accepted.model_dump())
+    return await file_recovery_service.create_file_recovery(
+        recovery_data, org_data.org_id
+    )
 
 
 @router.get(
@@ -46,7 +85,9 @@ def list_file_recovery_by_device(
     search: Optional[str] = None,
     status: Optional[str] = None,
     org_id: str = Depends(jwt_required),
-    file_recovery_service: FileRecoveryService = Depends(get_file_recovery_service),
+    file_recovery_service: FileRecoveryService = Depends(
+        get_file_recovery_read_service
+    ),
 ):
     file_recovery_service.validator.validate_device_access(device_id)
     return file_recovery_service.get_file_recovery_by_device(
@@ -61,8 +102,11 @@ def list_all_device_recoveries(
     status: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
+    count_mode: CountMode = CountMode.EXACT,
     org_id: str = Depends(jwt_required),
-    file_recovery_service: FileRecoveryService = Depends(get_file_recovery_service),
+    file_recovery_service: FileRecoveryService = Depends(
+        get_file_recovery_read_service
+    ),
 ) -> FileRecoveryListResponse:
     return file_recovery_service.get_file_recoveries_with_filters(
         org_id=org_id,
@@ -71,6 +115,7 @@ def list_all_device_recoveries(
         status=status,
         skip=skip,
         limit=limit,
+        count_mode=count_mode,
     )
 
 
@@ -1,24 +1,36 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_org_from_api_key, jwt_required
 from app.repositories.application import ApplicationRepository
 from app.repositories.device import DeviceRepository
 from app.repositories.inventory import InventoryRepository
-from app.schemas.common import OrgData
+from app.schemas.common import CountMode, OrgData
 from app.services.application import ApplicationService
-from app.core.dependencies import get_db
+from app.services.application_catalog import application_catalog
+from app.services.application_policy import (
+    ApplicationPolicyService,
+    application_policy_cache,
+    etag_matches,
+)
+from app.core.dependencies import get_async_db, get_db, get_read_db
+from app.services.base import AsyncServiceAdapter
 from app.services.inventory import InventoryService
 from app.schemas.application import (
     ApplicationCreate,
     Application,
     ApplicationBase,
     ApplicationListResponse,
+    ApplicationPolicy,
     ApplicationResponse,
     ApprovalStatus,
+    BulkApplicationDecisionResponse,
 )
 from app.schemas.inventory import (
     InventoryCreate,
+    InventoryDiffSyncRequest,
+    InventoryDiffSyncResponse,
     InventoryListResponse,
     InventoryUpdate,
     InventoryResponse,
@@ -28,16 +40,55 @@ from typing import List, Optional
 router = APIRouter()
 
 
-def get_inventory_service(db: Session = Depends(get_db)) -> InventoryService:
+def _inventory_service(db: Session) -> InventoryService:
     repository = InventoryRepository(db)
     device_repository = DeviceRepository(db)
     application_repository = ApplicationRepository(db)
-    return InventoryService(repository, device_repository, application_repository)
+    return InventoryService(
+        repository,
+        device_repository,
+        application_repository,
+        catalog=application_catalog,
+    )
+
+
+def _application_policy_service(db: Session) -> ApplicationPolicyService:
+    return ApplicationPolicyService(
+        ApplicationRepository(db), application_catalog, application_policy_cache
+    )
+
+
+def get_inventory_service(db: Session = Depends(get_db)) -> InventoryService:
+    return _inventory_service(db)
+
+
+def get_inventory_read_service(
+    db: Session = Depends(get_read_db),
+) -> InventoryService:
+    return _inventory_service(db)
+
+
+async def get_agent_inventory_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncServiceAdapter[InventoryService]:
+    return AsyncServiceAdapter(db, _inventory_service)
 
 
 def get_application_service(db: Session = Depends(get_db)) -> ApplicationService:
     repository = ApplicationRepository(db)
-    return ApplicationService(repository)
+    return ApplicationService(repository, catalog=application_catalog)
+
+
+def get_application_read_service(
+    db: Session = Depends(get_read_db),
+) -> ApplicationService:
+    return get_application_service(db)
+
+
+async def get_application_policy_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncServiceAdapter[ApplicationPolicyService]:
+    return AsyncServiceAdapter(db, _application_policy_service)
 
 
 @router.post("/applications", response_model=Application)
@@ -57,22 +108,52 @@ def list_applications(
     status: Optional[str] = None,
     skip: int = 0,
     limit: int = 10000,
+    count_mode: CountMode = CountMode.EXACT,
     org_id: str = Depends(jwt_required),
-    app_service: ApplicationService = Depends(get_application_service),
+    app_service: ApplicationService = Depends(get_application_read_service),
 ) -> ApplicationListResponse:
     return app_service.get_by_org(
-        org_id=org_id, search=search, status=status, skip=skip, limit=limit
+        org_id=org_id,
+        search=search,
+        status=status,
+        skip=skip,
+        limit=limit,
+        count_mode=count_mode,
+    )
+
+
+@router.get(
+    "/applications/policy",
+    response_model=ApplicationPolicy,
+    responses={304: {"description": "The agent's cached policy is current"}},
+)
+async def get_application_policy(
+    if_none_match: Optional[str] = Header(None),
+    org_data: OrgData = Depends(get_org_from_api_key),
+    policy_service: AsyncServiceAdapter[ApplicationPolicyService] = Depends(
+        get_application_policy_service
+    ),
+):
+    artifact = await policy_service.get_policy(org_data.org_id)
+    # Agents must revalidate, but an unchanged policy costs only a 304
+    headers = {"ETag": artifact.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, artifact.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=artifact.body, media_type="application/json", headers=headers
     )
 
 
 @router.post("/devices/{device_id}/inventory", response_model=List[InventoryResponse])
-def create_device_inventory(
+async def create_device_inventory(
     device_id: str,
     inventory: InventoryCreate,
     org_data: OrgData = Depends(get_org_from_api_key),
-    inventory_service: InventoryService = Depends(get_inventory_service),
+    inventory_service: AsyncServiceAdapter[InventoryService] = Depends(
+        get_agent_inventory_service
+    ),
 ):
-    items = inventory_service.create_inventory(device_id, inventory)
+    items = await inventory_service.create_inventory(device_id, inventory)
     return items
 
 
@@ -83,35 +164,55 @@ def get_device_inventory(
     limit: int = 100,
     search: Optional[str] = None,
     status: Optional[ApprovalStatus] = None,
+    count_mode: CountMode = CountMode.EXACT,
     org_id: str = Depends(jwt_required),
-    inventory_service: InventoryService = Depends(get_inventory_service),
+    inventory_service: InventoryService = Depends(get_inventory_read_service),
 ):
     return inventory_service.get_device_inventory(
-        device_id, skip, limit, search, status=status
+        device_id, skip, limit, search, status=status, count_mode=count_mode
     )
 
 
 @router.get(
     "/devices/{device_id}/agent-inventory", response_model=List[InventoryResponse]
 )
-def get_device_inventory_agent(
+async def get_device_inventory_agent(
     device_id: str,
     org_data: OrgData = Depends(get_org_from_api_key),
-    inventory_service: InventoryService = Depends(get_inventory_service),
+    inventory_service: AsyncServiceAdapter[InventoryService] = Depends(
+        get_agent_inventory_service
+    ),
 ):
-    return inventory_service.get_device_inventory(device_id)
+    return await inventory_service.get_device_inventory(device_id)
 
 
 @router.post(
     "/devices/{device_id}/inventory/sync", response_model=List[InventoryResponse]
 )
-def sync_device_inventory(
+async def sync_device_inventory(
     device_id: str,
     inventory_update: InventoryUpdate,
     org_data: OrgData = Depends(get_org_from_api_key),
-    inventory_service: InventoryService = Depends(get_inventory_service),
+    inventory_service: AsyncServiceAdapter[InventoryService] = Depends(
+        get_agent_inventory_service
+    ),
 ):
-    return inventory_service.update_inventory(device_id, inventory_update)
+    return await inventory_service.update_inventory(device_id, inventory_update)
+
+
+@router.post(
+    "/devices/{device_id}/inventory/diff-sync",
+    response_model=InventoryDiffSyncResponse,
+)
+async def diff_sync_device_inventory(
+    device_id: str,
+    sync_request: InventoryDiffSyncRequest,
+    org_data: OrgData = Depends(get_org_from_api_key),
+    inventory_service: AsyncServiceAdapter[InventoryService] = Depends(
+        get_agent_inventory_service
+    ),
+):
+    return await inventory_service.diff_sync_inventory(device_id, sync_request)
 
 
 @router.delete("/inventory/{inventory_id}", response_model=dict)
@@ -143,8 +244,10 @@ async def deny_application(
     return inventory_service.deny_application(application_id)
 
 
-@router.post("/applications/bulk-approve", response_model=List[ApplicationResponse])
-async def bulk_approve_applications(
+@router.post(
+    "/applications/bulk-approve", response_model=BulkApplicationDecisionResponse
+)
+def bulk_approve_applications(
     application_ids: List[str],
     org_id: str = Depends(jwt_required),
     inventory_service: InventoryService = Depends(get_inventory_service),
@@ -152,8 +255,8 @@ async def bulk_approve_applications(
     return inventory_service.approve_applications(application_ids)
 
 
-@router.post("/applications/bulk-deny", response_model=List[ApplicationResponse])
-async def bulk_deny_applications(
+@router.post("/applications/bulk-deny", response_model=BulkApplicationDecisionResponse)
+def bulk_deny_applications(
     application_ids: List[str],
     org_id: str = Depends(jwt_required),
     inventory_service: InventoryService = Depends(get_inventory_service),
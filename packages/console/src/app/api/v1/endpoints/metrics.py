@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from app.core.auth import role_checker
+from app.core.metrics import metrics
+
+router = APIRouter()
+
+
+# Counters are process-wide rather than per organization
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(role_checker(["PLATFORM_ADMIN"]))],
+)
+def get_metrics():
+    return metrics.snapshot()
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.core.auth import role_checker
+from app.core.scheduler import scheduler
+from app.schemas.scheduler import JobStatus, JobStatusListResponse
+
+router = APIRouter()
+
+
+# Reports this process's view; only the leader of a job has run history for it
+@router.get(
+    "/scheduler/jobs",
+    response_model=JobStatusListResponse,
+    include_in_schema=False,
+    dependencies=[Depends(role_checker(["PLATFORM_ADMIN"]))],
+)
+def get_scheduled_jobs():
+    return JobStatusListResponse(
+        jobs=[JobStatus(**job.status()) for job in scheduler.jobs()]
+    )
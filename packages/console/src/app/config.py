@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,9 +13,92 @@ class Settings(BaseSettings):
     CONSOLE_KEYCLOAK_CLIENT_SECRET: str
     CONSOLE_PUBLIC_KEYCLOAK_URL: str
     CONSOLE_PUBLIC_KEYCLOAK_CLIENT_ID: str
+    CONSOLE_KEYCLOAK_TIMEOUT_SECONDS: float = 10.0
+    CONSOLE_KEYCLOAK_POOL_MAXSIZE: int = 20
+    # Refresh the service-account token this many seconds before it expires
+    CONSOLE_KEYCLOAK_TOKEN_REFRESH_MARGIN_SECONDS: int = 30
+
+    # Token verification caches
+    CONSOLE_JWKS_CACHE_TTL_SECONDS: int = 3600
+    CONSOLE_JWKS_MIN_REFRESH_INTERVAL_SECONDS: int = 30
+    CONSOLE_VERIFIED_TOKEN_CACHE_TTL_SECONDS: int = 60
+    CONSOLE_VERIFIED_TOKEN_CACHE_MAXSIZE: int = 10000
 
     # Database configuration
     CONSOLE_DATABASE_URL: str
+    # Per worker; keep workers * (pool size + max overflow) under the
+    # server's max_connections, minus what migrations and admins need
+    CONSOLE_DATABASE_POOL_SIZE: int = 5
+    CONSOLE_DATABASE_MAX_OVERFLOW: int = 10
+    CONSOLE_DATABASE_POOL_TIMEOUT_SECONDS: float = 30
+    # Below the server or proxy idle timeout, so stale connections are replaced
+    CONSOLE_DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    CONSOLE_DATABASE_POOL_PRE_PING: bool = True
+    # asyncio engine behind the agent-facing routes; derived from
+    # CONSOLE_DATABASE_URL with the asyncpg driver unless set. It keeps its
+    # own pool, sized separately, next to the one above
+    CONSOLE_ASYNC_DATABASE_URL: Optional[str] = None
+    CONSOLE_ASYNC_DATABASE_POOL_SIZE: int = 10
+    CONSOLE_ASYNC_DATABASE_MAX_OVERFLOW: int = 20
+    # Comma-separated read replicas for the dashboard list routes, each with
+    # a pool sized like the primary's. Unset, every read goes to the primary
+    CONSOLE_DATABASE_REPLICA_URL: Optional[str] = None
+    # Replicas further behind than this are skipped until they catch up
+    CONSOLE_DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    CONSOLE_DATABASE_REPLICA_LAG_PROBE_INTERVAL_SECONDS: float = 5.0
+    # After committing a write, the organization reads from the primary for
+    # this long on the worker that served it
+    CONSOLE_DATABASE_REPLICA_PIN_SECONDS: float = 10.0
+
+    # Buffer heartbeats in memory and write them to the database in bulk
+    CONSOLE_HEARTBEAT_WRITE_BEHIND: bool = False
+    CONSOLE_HEARTBEAT_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Run periodic jobs in this process (one replica is elected per job)
+    CONSOLE_SCHEDULER_ENABLED: bool = True
+
+    # Offline sweep: how often it runs and how many devices each UPDATE touches
+    CONSOLE_DEVICE_STATUS_SWEEP_INTERVAL_SECONDS: float = 60.0
+    CONSOLE_DEVICE_STATUS_SWEEP_JITTER_SECONDS: float = 10.0
+    CONSOLE_DEVICE_STATUS_SWEEP_CHUNK_SIZE: int = 5000
+
+    # activity_logs is partitioned by month; keep this many months of empty
+    # partitions ready past the current one
+    CONSOLE_ACTIVITY_LOG_PARTITIONS_AHEAD: int = 3
+    # Partitions whose rows are all older than this many days are removed,
+    # so rows live at least this long and at most a month longer. Unset
+    # keeps every row
+    CONSOLE_ACTIVITY_LOG_RETENTION_DAYS: Optional[int] = None
+    # Detach expired partitions, leaving them as tables to archive, instead
+    # of dropping them
+    CONSOLE_ACTIVITY_LOG_RETENTION_DETACH: bool = False
+    CONSOLE_ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+    CONSOLE_ACTIVITY_LOG_MAINTENANCE_JITTER_SECONDS: float = 300.0
+
+    # Cached list totals (count_mode=cached)
+    CONSOLE_COUNT_CACHE_TTL_SECONDS: int = 30
+    CONSOLE_COUNT_CACHE_MAXSIZE: int = 10000
+
+    # Durable local queue behind ?mode=async on the agent ingestion endpoints;
+    # asynchronous ingestion is disabled while no path is set
+    CONSOLE_INGESTION_QUEUE_PATH: Optional[str] = None
+    CONSOLE_INGESTION_QUEUE_MAX_DEPTH: int = 1000000
+    CONSOLE_INGESTION_DRAIN_BATCH_SIZE: int = 5000
+    CONSOLE_INGESTION_DRAIN_INTERVAL_SECONDS: float = 1.0
+    CONSOLE_INGESTION_CLAIM_TIMEOUT_SECONDS: float = 300
+
+    # Per-organization application catalog used by inventory ingestion
+    CONSOLE_APPLICATION_CATALOG_TTL_SECONDS: int = 600
+    CONSOLE_APPLICATION_CATALOG_MAXSIZE: int = 100000
+    # SQLite file shared by the workers on a host so invalidations reach all
+    CONSOLE_APPLICATION_CATALOG_SHARED_PATH: Optional[str] = None
+    # Built policy artifacts kept per organization for GET /applications/policy
+    CONSOLE_APPLICATION_POLICY_CACHE_MAXSIZE: int = 1000
+
+    # X-Org-Key validation cache
+    CONSOLE_ORG_KEY_CACHE_TTL_SECONDS: int = 300
+    CONSOLE_ORG_KEY_CACHE_NEGATIVE_TTL_SECONDS: int = 30
+    CONSOLE_ORG_KEY_CACHE_MAXSIZE: int = 10000
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", extra="ignore"
@@ -1,17 +1,220 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Union
+
+from sqlalchemy import Engine, create_engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.config import settings
+from app.core.db_pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    PoolMonitor,
+)
+from app.core.context import get_org_id
+from app.core.db_replicas import (
+    Replica,
+    ReplicaRouter,
+    RoutingSession,
+    track_writes,
+    wrote,
+)
+from app.core.metrics import metrics
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.CONSOLE_DATABASE_POOL_SIZE,
+        max_overflow=settings.CONSOLE_DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.CONSOLE_DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.CONSOLE_DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.CONSOLE_DATABASE_POOL_PRE_PING,
+    )
+    engine.pool.monitor = PoolMonitor()
+    return engine
 
-engine = create_engine(settings.CONSOLE_DATABASE_URL)
+
+engine = _create_engine(settings.CONSOLE_DATABASE_URL)
+# engine.pool, not a captured pool: dispose() swaps in a recreated one
+metrics.register_collector("db_pool", lambda: engine.pool.stats())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Sessions from ReadSessionLocal read from the replicas when any are
+# configured, and are plain primary sessions otherwise
+replica_router: Optional[ReplicaRouter] = None
+ReadSessionLocal = SessionLocal
+if settings.CONSOLE_DATABASE_REPLICA_URL:
+    replica_router = ReplicaRouter(
+        engine,
+        [
+            Replica(_create_engine(url.strip()))
+            for url in settings.CONSOLE_DATABASE_REPLICA_URL.split(",")
+            if url.strip()
+        ],
+        max_lag=settings.CONSOLE_DATABASE_REPLICA_MAX_LAG_SECONDS,
+        pin_seconds=settings.CONSOLE_DATABASE_REPLICA_PIN_SECONDS,
+    )
+    metrics.register_collector("db_replicas", replica_router.stats)
+    ReadSessionLocal = sessionmaker(
+        class_=RoutingSession,
+        router=replica_router,
+        autocommit=False,
+        autoflush=False,
+    )
+    track_writes(SessionLocal)
+    track_writes(ReadSessionLocal)
 
+# Loaded objects stay readable after the commit, where an expired attribute
+# could not be lazily refreshed without an explicit await
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+_async_engine: Optional[AsyncEngine] = None
 
-def get_db():
-    db = SessionLocal()
+
+def async_database_url() -> str:
+    if settings.CONSOLE_ASYNC_DATABASE_URL:
+        return settings.CONSOLE_ASYNC_DATABASE_URL
+    url = make_url(settings.CONSOLE_DATABASE_URL)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(
+        hide_password=False
+    )
+
+
+def get_async_engine() -> AsyncEngine:
+    """The asyncio engine, created on first use.
+
+    Processes that never serve an async route (scripts, Alembic) then do not
+    load the async driver or register a second pool.
+    """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            async_database_url(),
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            pool_size=settings.CONSOLE_ASYNC_DATABASE_POOL_SIZE,
+            max_overflow=settings.CONSOLE_ASYNC_DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.CONSOLE_DATABASE_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.CONSOLE_DATABASE_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.CONSOLE_DATABASE_POOL_PRE_PING,
+        )
+        sync_engine = _async_engine.sync_engine
+        sync_engine.pool.monitor = PoolMonitor()
+        metrics.register_collector("db_pool_async", lambda: sync_engine.pool.stats())
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+class _ModelBase:
+    # Server-generated columns (created_at, updated_at) come back through
+    # RETURNING during the flush instead of a refresh round trip afterwards
+    __mapper_args__ = {"eager_defaults": True}
+
+
+Base = declarative_base(cls=_ModelBase)
+
+_UNIT_OF_WORK = "unit_of_work"
+_AFTER_COMMIT = "after_commit"
+
+
+AnySession = Union[Session, AsyncSession]
+
+
+def _open_unit_of_work(db: AnySession) -> None:
+    db.info[_UNIT_OF_WORK] = True
+    db.info[_AFTER_COMMIT] = []
+
+
+def _close_unit_of_work(db: AnySession) -> List[Callable[[], None]]:
+    db.info.pop(_UNIT_OF_WORK, None)
+    return db.info.pop(_AFTER_COMMIT, [])
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """Run everything inside as one transaction, committed once at the end.
+
+    Repository writes only flush while a unit of work is open, so the whole
+    block commits or rolls back together. Callbacks registered with
+    ``after_commit`` run once the commit succeeded.
+    """
+    _open_unit_of_work(db)
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        callbacks = _close_unit_of_work(db)
+    for callback in callbacks:
+        callback()
+
+
+@asynccontextmanager
+async def async_unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """``unit_of_work`` for an ``AsyncSession``.
+
+    The flags live in ``db.info``, which the async session shares with its
+    sync session, so sync repositories run through ``run_sync`` see them too.
+    """
+    _open_unit_of_work(db)
     try:
         yield db
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        callbacks = _close_unit_of_work(db)
+    for callback in callbacks:
+        callback()
+
+
+def in_unit_of_work(db: AnySession) -> bool:
+    return db.info.get(_UNIT_OF_WORK) is True
+
+
+def after_commit(db: AnySession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the current work is committed."""
+    if in_unit_of_work(db):
+        db.info[_AFTER_COMMIT].append(callback)
+    else:
+        callback()
+
+
+def _request_session(factory: Callable[[], Session]) -> Iterator[Session]:
+    db = factory()
+    try:
+        with unit_of_work(db):
+            yield db
+        # Keep the organization's next reads on the primary until the
+        # replicas have replayed this write
+        if replica_router is not None and wrote(db):
+            replica_router.record_write(get_org_id())
     finally:
         db.close()
+
+
+def get_db():
+    yield from _request_session(SessionLocal)
+
+
+def get_read_db():
+    """``get_db`` for read-mostly routes, whose SELECTs may go to a replica."""
+    yield from _request_session(ReadSessionLocal)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        async with async_unit_of_work(db):
+            yield db
@@ -0,0 +1,90 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMonitor:
+    """Checkout wait times and timeouts of one connection pool."""
+
+    def __init__(self, buckets: Sequence[float] = WAIT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # One slot per bucket plus one for waits above the last bound
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)
+        self._total = 0.0
+        self._max = 0.0
+        self._timeouts = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total, longest, timeouts = self._total, self._max, self._timeouts
+        bounds = [f"le_{bound:g}" for bound in self.buckets] + ["le_inf"]
+        cumulative, running = {}, 0
+        for bound, count in zip(bounds, counts):
+            running += count
+            cumulative[bound] = running
+        return {
+            "checkouts": running,
+            "wait_seconds_total": total,
+            "wait_seconds_max": longest,
+            "wait_seconds_buckets": cumulative,
+            "timeouts": timeouts,
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long callers wait for a connection.
+
+    The wait covers the whole checkout: queueing for a free connection,
+    opening a new one within the overflow, and the pre-ping.
+    """
+
+    monitor: PoolMonitor
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.monitor.record_timeout()
+            raise
+        finally:
+            self.monitor.record_wait(time.perf_counter() - started)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            # Negative while the pool has not reached its size yet
+            "overflow": max(self.overflow(), 0),
+            **self.monitor.stats(),
+        }
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """The same instrumentation for the pool of an asyncio engine."""
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import random
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import TTLCache
+from app.core.context import get_org_id
+
+logger = logging.getLogger(__name__)
+
+# How far the replica's replayed state trails the primary, in seconds. A
+# replica streaming from the primary that has replayed everything it
+# received is caught up even when the primary has been idle since. One that
+# is not streaming (disconnected, or restoring from an archive) only knows
+# when it last replayed a transaction, so its lag is measured from then. A
+# server that is not in recovery (a standalone database standing in for a
+# replica) has no lag at all. The receiver's status is only visible to
+# roles with pg_read_all_stats; without it every replica counts as not
+# streaming.
+LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN (SELECT status FROM pg_stat_wal_receiver) = 'streaming'
+            AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+_WROTE = "wrote"
+_PINNED = "pinned_to_primary"
+_READ_ENGINE = "read_engine"
+
+
+class Replica:
+    """One read replica and the lag last measured on it."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.name = engine.url.render_as_string(hide_password=True)
+        # Unknown until the first probe succeeds; the replica is skipped until then
+        self.lag_seconds: Optional[float] = None
+        self.probe_failures = 0
+        self.reads = 0
+
+    def probe(self) -> None:
+        try:
+            with self.engine.connect() as connection:
+                lag = connection.execute(LAG_SQL).scalar()
+        except Exception:
+            self.lag_seconds = None
+            self.probe_failures += 1
+            logger.warning("Replica lag probe failed on %s", self.name, exc_info=True)
+            return
+        self.lag_seconds = None if lag is None else float(lag)
+
+    def is_healthy(self, max_lag: float) -> bool:
+        return self.lag_seconds is not None and self.lag_seconds <= max_lag
+
+
+class ReplicaRouter:
+    """Picks the engine the reads of each ``RoutingSession`` go to.
+
+    Reads go to a replica whose last measured lag is within ``max_lag``, or
+    to the primary when no replica is, and when the organization committed
+    a write within the last ``pin_seconds``. Those pins are kept per
+    process: a read served by another worker right after a write may trail
+    it by up to ``max_lag``.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: Sequence[Replica],
+        max_lag: float,
+        pin_seconds: float,
+        pin_maxsize: int = 10000,
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self._recent_writes = TTLCache(maxsize=pin_maxsize, ttl=pin_seconds)
+        self._lock = threading.Lock()
+        # Counted once per session, when it picks the engine for its reads
+        self.pinned_reads = 0
+        self.fallback_reads = 0
+
+    def record_write(self, org_id: Optional[str]) -> None:
+        if org_id is not None:
+            self._recent_writes.set(org_id, True)
+
+    def is_pinned(self, org_id: Optional[str]) -> bool:
+        return org_id is not None and self._recent_writes.get(org_id, False)
+
+    def read_engine(self, org_id: Optional[str]) -> Engine:
+        if self.is_pinned(org_id):
+            with self._lock:
+                self.pinned_reads += 1
+            return self.primary
+        healthy = [r for r in self.replicas if r.is_healthy(self.max_lag)]
+        with self._lock:
+            if not healthy:
+                self.fallback_reads += 1
+                return self.primary
+            replica = random.choice(healthy)
+            replica.reads += 1
+        return replica.engine
+
+    def probe(self) -> None:
+        for replica in self.replicas:
+            replica.probe()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "pinned_reads": self.pinned_reads,
+            "fallback_reads": self.fallback_reads,
+            "replicas": {
+                replica.name: {
+                    "lag_seconds": replica.lag_seconds,
+                    "healthy": replica.is_healthy(self.max_lag),
+                    "reads": replica.reads,
+                    "probe_failures": replica.probe_failures,
+                    "pool": replica.engine.pool.stats(),
+                }
+                for replica in self.replicas
+            },
+        }
+
+
+def _is_plain_select(clause: Any) -> bool:
+    # SELECT ... FOR UPDATE takes row locks, which only the primary can grant
+    return (
+        clause is not None
+        and getattr(clause, "is_select", False)
+        and getattr(clause, "_for_update_arg", None) is None
+    )
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica and the rest to the primary.
+
+    The engine is chosen at the first read and kept for the whole session,
+    so a request's reads never move between replicas that have replayed to
+    different points. Once the session has flushed or executed a write, or
+    was pinned with ``pin_to_primary``, its reads stay on the primary as
+    well, so a request always sees its own changes.
+    """
+
+    def __init__(self, *args: Any, router: ReplicaRouter, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if (
+            _is_plain_select(clause)
+            and not self._flushing
+            and not wrote(self)
+            and not self.info.get(_PINNED)
+        ):
+            engine = self.info.get(_READ_ENGINE)
+            if engine is None:
+                engine = self.router.read_engine(get_org_id())
+                self.info[_READ_ENGINE] = engine
+            return engine
+        return self.router.primary
+
+
+def pin_to_primary(db: Session) -> None:
+    """Serve every further read of ``db`` from the primary."""
+    db.info[_PINNED] = True
+
+
+def wrote(db: Session) -> bool:
+    return db.info.get(_WROTE) is True
+
+
+def _flag_flush(session: Session, flush_context: Any) -> None:
+    session.info[_WROTE] = True
+
+
+def _flag_write(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[_WROTE] = True
+
+
+def track_writes(target: Any) -> None:
+    """Flag the sessions of ``target`` that flush or execute a write."""
+    event.listen(target, "after_flush", _flag_flush)
+    event.listen(target, "do_orm_execute", _flag_write)
+
+
+async def run_replica_lag_probe(router: ReplicaRouter, interval: float) -> None:
+    """Measure replica lag now and every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            await run_in_threadpool(router.probe)
+        except Exception:
+            logger.exception("Replica lag probe failed; will retry next interval")
+        await asyncio.sleep(interval)
@@ -1,38 +1,50 @@
-from typing import Optional
+import asyncio
+from typing import Dict, Optional
 
 from fastapi import Depends, Header
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 
 from app.config import settings
+from app.core.cache import TTLCache
 from app.core.context import set_org_id
-from app.core.database import SessionLocal
+from app.core.database import (  # noqa: F401 - endpoints import them from here
+    get_async_db,
+    get_db,
+    get_read_db,
+)
 from app.core.exceptions import ForbiddenException, UnauthorizedException
 from app.core.jwt_utils import verify_token
 from app.core.keycloak_client import KeycloakClient
+from app.core.metrics import metrics
 from app.schemas.common import OrgData, TokenData
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.CONSOLE_PUBLIC_KEYCLOAK_URL}/realms/{settings.CONSOLE_KEYCLOAK_REALM}/protocol/openid-connect/token",
 )
 
 api_key_header = APIKeyHeader(name="X-Org-Key")
 
+# Validated (True) and rejected (False) org keys, so agent traffic does not
+# cost a Keycloak round trip per request.
+org_key_cache = TTLCache(
+    maxsize=settings.CONSOLE_ORG_KEY_CACHE_MAXSIZE,
+    ttl=settings.CONSOLE_ORG_KEY_CACHE_TTL_SECONDS,
+)
+metrics.register_collector("org_key_cache", org_key_cache.stats)
+
+# Keycloak lookups in flight, so a burst of agents presenting the same
+# uncached key shares a single round trip.
+_org_key_lookups: Dict[str, asyncio.Task] = {}
 
-def get_keycloak_client():
+
+# async so the agent routes, which are async end to end, do not hop to a thread
+async def get_keycloak_client():
     return KeycloakClient()
 
 
 async def get_token_data(token: str = Depends(oauth2_scheme)) -> TokenData:
-    token_data = verify_token(token)
+    token_data = await verify_token(token)
     set_org_id(token_data.org_id)
     return token_data
 
@@ -41,12 +53,39 @@ async def get_org_from_api_key(
     api_key: str = Depends(api_key_header),
     keycloak_client: KeycloakClient = Depends(get_keycloak_client),
 ) -> OrgData:
-    if not keycloak_client.validate_org_access(api_key):
+    is_valid = org_key_cache.get(api_key)
+    if is_valid is None:
+        is_valid = await _validate_org_key(api_key, keycloak_client)
+    if not is_valid:
         raise ForbiddenException(message="Invalid API key")
     set_org_id(api_key)
     return OrgData(org_id=api_key)
 
 
+async def _validate_org_key(api_key: str, keycloak_client: KeycloakClient) -> bool:
+    lookup = _org_key_lookups.get(api_key)
+    if lookup is None:
+        lookup = asyncio.ensure_future(_lookup_org_key(api_key, keycloak_client))
+        _org_key_lookups[api_key] = lookup
+        lookup.add_done_callback(lambda _: _org_key_lookups.pop(api_key, None))
+    # Shield so one cancelled request does not cancel the lookup for the others
+    return await asyncio.shield(lookup)
+
+
+async def _lookup_org_key(api_key: str, keycloak_client: KeycloakClient) -> bool:
+    is_valid = await keycloak_client.validate_org_access(api_key)
+    org_key_cache.set(
+        api_key,
+        is_valid,
+        ttl=(
+            settings.CONSOLE_ORG_KEY_CACHE_TTL_SECONDS
+            if is_valid
+            else settings.CONSOLE_ORG_KEY_CACHE_NEGATIVE_TTL_SECONDS
+        ),
+    )
+    return is_valid
+
+
 async def get_current_org(
     authorization: Optional[str] = Header(None), x_org_key: Optional[str] = Header(None)
 ):
@@ -54,7 +93,7 @@ async def get_current_org(
         token_data = await get_token_data(authorization.split()[1])
         return token_data.org_id
     elif x_org_key:
-        org_data = await get_org_from_api_key(x_org_key)
+        org_data = await get_org_from_api_key(x_org_key, await get_keycloak_client())
         return org_data.org_id
     else:
         raise UnauthorizedException(message="Authentication required")
@@ -102,6 +102,18 @@ class DatabaseOperationException(AppException):
         )
 
 
+class ServiceUnavailableException(AppException):
+    def __init__(
+        self,
+        message: str,
+        error_code: str = "SERVICE_UNAVAILABLE",
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(
+            message, status_code=503, error_code=error_code, details=details
+        )
+
+
 class DeviceNotFoundException(ObjectNotFoundException):
     def __init__(
         self, device_id: str, org_id: str, details: Optional[Dict[str, Any]] = None
@@ -142,7 +154,7 @@ class BatchDeviceValidationException(ValidationException):
             message=message,
             error_code="INVALID_DEVICES_IN_BATCH",
             details=details
-            or {"invalid_devices": list(invalid_devices), "org_id": org_id},
+            or {"invalid_devices": sorted(invalid_devices), "org_id": org_id},
         )
 
 
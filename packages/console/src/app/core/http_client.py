@@ -0,0 +1,28 @@
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client used for calls to Keycloak."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.CONSOLE_KEYCLOAK_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.CONSOLE_KEYCLOAK_POOL_MAXSIZE,
+                max_keepalive_connections=settings.CONSOLE_KEYCLOAK_POOL_MAXSIZE,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -1,58 +1,186 @@
+import asyncio
 import base64
+import hashlib
 import json
-from functools import lru_cache
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
 
-import requests
+import httpx
 from jose import JWTError, jwk, jwt
+from jose.exceptions import JWKError
 from jose.utils import base64url_decode
+from starlette.concurrency import run_in_threadpool
 
 from ..config import settings
 from ..schemas.common import TokenData
+from .cache import TTLCache
 from .exceptions import UnauthorizedException
+from .http_client import get_http_client
+from .metrics import metrics
 
+logger = logging.getLogger(__name__)
 
-@lru_cache(maxsize=1)
-def get_jwks():
-    jwks_uri = f"{settings.CONSOLE_KEYCLOAK_URL}/realms/{settings.CONSOLE_KEYCLOAK_REALM}/protocol/openid-connect/certs"
-    jwks_response = requests.get(jwks_uri)
-    jwks_response.raise_for_status()
-    return jwks_response.json()
 
+class JWKSCache:
+    """Realm signing keys keyed by ``kid``, constructed once per fetch.
 
-def verify_token(token: str) -> TokenData:
-    try:
-        headers = jwt.get_unverified_headers(token)
-        jwks = get_jwks()
+    The key set is refetched after ``ttl`` seconds, or early when a token
+    names a ``kid`` we have not seen (Keycloak rotated its keys). Early
+    refetches are limited to one per ``min_refresh_interval`` so tokens with
+    bogus ``kid`` values cannot hammer Keycloak. Refreshes are single-flight,
+    and a failed refresh keeps serving the keys we already have.
+    """
+
+    def __init__(
+        self,
+        jwks_uri: str,
+        ttl: float,
+        min_refresh_interval: float,
+        http_client: Optional[httpx.AsyncClient] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.jwks_uri = jwks_uri
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._http_client = http_client
+        self._clock = clock
+        self._lock: Optional[asyncio.Lock] = None
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._last_refresh = float("-inf")
 
-        key = next((k for k in jwks["keys"] if k["kid"] == headers["kid"]), None)
-        if not key:
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    async def get_key(self, kid: Optional[str]) -> Any:
+        if self._needs_refresh(kid):
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # Another caller may have refreshed while we waited for the lock
+                if self._needs_refresh(kid):
+                    await self._refresh()
+        key = self._keys.get(kid)
+        if key is None:
             raise UnauthorizedException(message="Invalid token: Key not found")
+        return key
 
-        public_key = jwk.construct(key)
-        message, encoded_sig = token.rsplit(".", 1)
-        decoded_sig = base64url_decode(encoded_sig.encode())
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._keys)}
 
-        if not public_key.verify(message.encode(), decoded_sig):
-            raise UnauthorizedException(message="Invalid token signature")
+    def _needs_refresh(self, kid: Optional[str]) -> bool:
+        now = self._clock()
+        if now >= self._expires_at:
+            return True
+        if kid not in self._keys:
+            return now - self._last_refresh >= self.min_refresh_interval
+        return False
 
-        payload = token.split(".")[1]
-        payload += "=" * ((4 - len(payload) % 4) % 4)
-        decoded_payload = base64.urlsafe_b64decode(payload)
-        claims = json.loads(decoded_payload)
+    async def _refresh(self) -> None:
+        self._last_refresh = self._clock()
+        metrics.increment("jwks.refreshes")
+        try:
+            response = await self.http_client.get(self.jwks_uri)
+            response.raise_for_status()
+            keys = self._build_keys(response.json())
+        except (httpx.HTTPError, ValueError):
+            if not self._keys:
+                raise
+            metrics.increment("jwks.refresh_failures")
+            logger.warning(
+                "JWKS refresh failed; keeping %d cached keys",
+                len(self._keys),
+                exc_info=True,
+            )
+            self._expires_at = self._last_refresh + self.min_refresh_interval
+            return
+        self._keys = keys
+        self._expires_at = self._last_refresh + self.ttl
 
-        if (
-            claims["iss"]
-            != f"{settings.CONSOLE_PUBLIC_KEYCLOAK_URL}/realms/{settings.CONSOLE_KEYCLOAK_REALM}"
-        ):
-            raise UnauthorizedException(message="Invalid token issuer")
+    @staticmethod
+    def _build_keys(jwks: Dict[str, Any]) -> Dict[str, Any]:
+        keys = {}
+        for key_data in jwks.get("keys", []):
+            # Keycloak also publishes encryption keys, which never sign tokens
+            if "kid" not in key_data or key_data.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[key_data["kid"]] = jwk.construct(key_data)
+            except JWKError:
+                logger.warning("Skipping unusable JWKS key %s", key_data["kid"])
+        return keys
 
-        if claims["azp"] != settings.CONSOLE_PUBLIC_KEYCLOAK_CLIENT_ID:
-            raise UnauthorizedException(message="Token not intended for this client")
 
-        return TokenData(
-            username=claims.get("preferred_username"),
-            org_id=claims.get("org_id") if claims.get("org_id") else "",
-            roles=claims.get("realm_access", {}).get("roles", []),
-        )
+jwks_cache = JWKSCache(
+    jwks_uri=f"{settings.CONSOLE_KEYCLOAK_URL}/realms/{settings.CONSOLE_KEYCLOAK_REALM}/protocol/openid-connect/certs",
+    ttl=settings.CONSOLE_JWKS_CACHE_TTL_SECONDS,
+    min_refresh_interval=settings.CONSOLE_JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+)
+metrics.register_collector("jwks", jwks_cache.stats)
+
+# Tokens whose signature and claims already checked out, keyed by digest. An
+# entry never outlives the token's own ``exp``.
+verified_tokens = TTLCache(
+    maxsize=settings.CONSOLE_VERIFIED_TOKEN_CACHE_MAXSIZE,
+    ttl=settings.CONSOLE_VERIFIED_TOKEN_CACHE_TTL_SECONDS,
+)
+metrics.register_collector("verified_token_cache", verified_tokens.stats)
+
+
+async def verify_token(token: str) -> TokenData:
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    token_data = verified_tokens.get(token_key)
+    if token_data is not None:
+        return token_data
+
+    try:
+        headers = jwt.get_unverified_headers(token)
+        key = await jwks_cache.get_key(headers.get("kid"))
+
+        # RSA verification is CPU-bound; keep it off the event loop
+        claims = await run_in_threadpool(_verify_signature, token, key)
     except JWTError:
         raise UnauthorizedException(message="Invalid authentication credentials")
+
+    token_data = _validate_claims(claims)
+    if "exp" in claims:
+        remaining = claims["exp"] - time.time()
+        verified_tokens.set(
+            token_key, token_data, ttl=min(verified_tokens.ttl, remaining)
+        )
+    return token_data
+
+
+def _verify_signature(token: str, public_key: Any) -> Dict[str, Any]:
+    message, encoded_sig = token.rsplit(".", 1)
+    decoded_sig = base64url_decode(encoded_sig.encode())
+
+    if not public_key.verify(message.encode(), decoded_sig):
+        raise UnauthorizedException(message="Invalid token signature")
+
+    payload = token.split(".")[1]
+    payload += "=" * ((4 - len(payload) % 4) % 4)
+    decoded_payload = base64.urlsafe_b64decode(payload)
+    return json.loads(decoded_payload)
+
+
+def _validate_claims(claims: Dict[str, Any]) -> TokenData:
+    if "exp" in claims and claims["exp"] <= time.time():
+        raise UnauthorizedException(message="Token has expired")
+
+    if (
+        claims["iss"]
+        != f"{settings.CONSOLE_PUBLIC_KEYCLOAK_URL}/realms/{settings.CONSOLE_KEYCLOAK_REALM}"
+    ):
+        raise UnauthorizedException(message="Invalid token issuer")
+
+    if claims["azp"] != settings.CONSOLE_PUBLIC_KEYCLOAK_CLIENT_ID:
+        raise UnauthorizedException(message="Token not intended for this client")
+
+    return TokenData(
+        username=claims.get("preferred_username"),
+        org_id=claims.get("org_id") if claims.get("org_id") else "",
+        roles=claims.get("realm_access", {}).get("roles", []),
+    )
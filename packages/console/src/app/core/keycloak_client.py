@@ -1,53 +1,156 @@
-import requests
+import asyncio
+import time
+from typing import Callable, Optional
+
+import httpx
 
 from app.config import settings
-from app.core.exceptions import UnauthorizedException
+from app.core.exceptions import ServiceUnavailableException, UnauthorizedException
+from app.core.http_client import get_http_client
+from app.core.metrics import metrics
+
+
+class ServiceAccountTokenManager:
+    """Process-wide cache of the client_credentials token.
+
+    The token is reused until ``refresh_margin`` seconds before it expires.
+    Refreshes are single-flight: concurrent callers wait on the lock and pick
+    up the token fetched by whichever caller got there first.
+    """
+
+    def __init__(
+        self,
+        token_url: str,
+        client_id: str,
+        client_secret: str,
+        refresh_margin: float,
+        http_client: Optional[httpx.AsyncClient] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_margin = refresh_margin
+        self._http_client = http_client
+        self._clock = clock
+        self._lock: Optional[asyncio.Lock] = None
+        self._access_token: Optional[str] = None
+        self._expires_at = 0.0
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    async def get_token(self) -> str:
+        token = self._current_token()
+        if token:
+            return token
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            token = self._current_token()
+            if token:
+                return token
+            return await self._fetch_token()
+
+    def invalidate(self, stale_token: str) -> None:
+        """Drop ``stale_token`` unless another caller has already replaced it.
+
+        Runs without awaiting, so the compare-and-clear is atomic with
+        respect to refreshes on the event loop.
+        """
+        if self._access_token == stale_token:
+            self._access_token = None
+            self._expires_at = 0.0
+
+    def _current_token(self) -> Optional[str]:
+        if self._access_token and self._clock() < self._expires_at:
+            return self._access_token
+        return None
+
+    async def _fetch_token(self) -> str:
+        metrics.increment("keycloak.token_fetches")
+        response = await self.http_client.post(
+            self.token_url,
+            data={
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+            },
+        )
+        if response.status_code != 200:
+            raise UnauthorizedException(message="Failed to authenticate with Keycloak")
+        payload = response.json()
+        expires_in = payload.get("expires_in", 0)
+        self._access_token = payload["access_token"]
+        self._expires_at = self._clock() + max(expires_in - self.refresh_margin, 0)
+        return self._access_token
+
+
+service_account_tokens = ServiceAccountTokenManager(
+    token_url=f"{settings.CONSOLE_KEYCLOAK_URL}/realms/{settings.CONSOLE_KEYCLOAK_REALM}/protocol/openid-connect/token",
+    client_id=settings.CONSOLE_KEYCLOAK_CLIENT_ID,
+    client_secret=settings.CONSOLE_KEYCLOAK_CLIENT_SECRET,
+    refresh_margin=settings.CONSOLE_KEYCLOAK_TOKEN_REFRESH_MARGIN_SECONDS,
+)
 
 
 class KeycloakClient:
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        token_manager: Optional[ServiceAccountTokenManager] = None,
+    ):
         self.server_url = settings.CONSOLE_KEYCLOAK_URL
         self.realm = settings.CONSOLE_KEYCLOAK_REALM
         self.client_id = settings.CONSOLE_KEYCLOAK_CLIENT_ID
         self.client_secret = settings.CONSOLE_KEYCLOAK_CLIENT_SECRET
+        self._http_client = http_client
+        self.token_manager = token_manager or service_account_tokens
 
-    def get_token(self):
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-        }
-        response = requests.post(
-            f"{self.server_url}/realms/{self.realm}/protocol/openid-connect/token",
-            data=data,
-        )
-        if response.status_code == 200:
-            return response.json()["access_token"]
-        else:
-            raise UnauthorizedException(message="Failed to authenticate with Keycloak")
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
 
-    def validate_org_access(self, org_key: str) -> bool:
-        token = self.get_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.get(
-            f"{self.server_url}/admin/realms/{self.realm}/organizations/{org_key}",
-            headers=headers,
-        )
-        return response.status_code == 200
+    async def get_token(self) -> str:
+        return await self.token_manager.get_token()
+
+    async def _admin_get(self, path: str) -> httpx.Response:
+        token = await self.get_token()
+        response = await self._send_admin_get(path, token)
+        if response.status_code == 401:
+            # Token was revoked or expired early; fetch a new one and retry once
+            self.token_manager.invalidate(token)
+            response = await self._send_admin_get(path, await self.get_token())
+        return response
 
-    def get_user_roles(self, username: str) -> list:
-        token = self.get_token()
+    async def _send_admin_get(self, path: str, token: str) -> httpx.Response:
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-        response = requests.get(
-            f"{self.server_url}/admin/realms/{self.realm}/users/{username}/role-mappings/realm",
-            headers=headers,
+        return await self.http_client.get(
+            f"{self.server_url}/admin/realms/{self.realm}/{path}", headers=headers
         )
+
+    async def validate_org_access(self, org_key: str) -> bool:
+        """Whether ``org_key`` names an organization.
+
+        Only a 404 means it does not; any other failure raises, so callers
+        never mistake a Keycloak outage for an invalid key and cache it.
+        """
+        response = await self._admin_get(f"organizations/{org_key}")
+        if response.status_code == 404:
+            return False
+        if response.status_code != 200:
+            raise ServiceUnavailableException(
+                message="Failed to validate organization access"
+            )
+        return True
+
+    async def get_user_roles(self, username: str) -> list:
+        response = await self._admin_get(f"users/{username}/role-mappings/realm")
         if response.status_code == 200:
             return [role["name"] for role in response.json()]
         else:
@@ -0,0 +1,58 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+
+class MetricsRegistry:
+    """In-process counters and timings for operational visibility."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.setdefault(
+                name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            )
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+            timing["last"] = seconds
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record how long the block takes under ``name``, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def register_collector(
+        self, name: str, collector: Callable[[], Dict[str, Any]]
+    ) -> None:
+        """Register a callable whose result is reported under ``name``."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: dict(timing) for name, timing in self._timings.items()}
+            collectors = dict(self._collectors)
+        return {
+            "counters": counters,
+            "timings": timings,
+            **{name: collector() for name, collector in collectors.items()},
+        }
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import engine as default_engine
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    def __init__(
+        self, name: str, func: Callable[[], Any], interval: float, jitter: float
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        # Stable across processes, so every replica contends for the same lock
+        self.lock_key = int.from_bytes(
+            hashlib.sha256(name.encode()).digest()[:8], "big", signed=True
+        )
+        self.is_leader = False
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_started_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_duration_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval,
+            "jitter_seconds": self.jitter,
+            "is_leader": self.is_leader,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started_at": self.last_started_at,
+            "last_success_at": self.last_success_at,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """Runs periodic jobs in exactly one process across all workers and replicas.
+
+    Each job has a Postgres advisory lock. The first process to take the lock
+    becomes that job's leader and keeps the lock, on a dedicated connection,
+    for as long as it lives. The other processes try again on every tick, so
+    leadership moves as soon as the leader's connection goes away.
+    """
+
+    def __init__(self, engine: Optional[Engine] = None):
+        self._engine = engine
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._connection: Optional[Connection] = None
+        self._connection_lock = threading.Lock()
+        self._held_locks: Set[str] = set()
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval: float,
+        jitter: float = 0.0,
+    ) -> ScheduledJob:
+        job = ScheduledJob(name, func, interval, jitter)
+        self._jobs[name] = job
+        return job
+
+    def jobs(self) -> List[ScheduledJob]:
+        return list(self._jobs.values())
+
+    def start(self) -> None:
+        for job in self._jobs.values():
+            self._tasks.append(asyncio.create_task(self._run_periodically(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Closing the connection hands leadership to another process
+        await run_in_threadpool(self._close_connection)
+
+    def run_once(self, job: ScheduledJob) -> bool:
+        """Run ``job`` if this process leads it; returns whether it ran."""
+        job.is_leader = self._acquire_leadership(job)
+        if not job.is_leader:
+            return False
+
+        job.running = True
+        job.last_started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            job.func()
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            metrics.increment(f"scheduler.{job.name}.failures")
+            logger.exception("Scheduled job %s failed", job.name)
+        else:
+            job.last_success_at = datetime.now(timezone.utc)
+            job.last_error = None
+        finally:
+            job.running = False
+            job.runs += 1
+            job.last_duration_seconds = time.perf_counter() - started
+            metrics.observe(f"scheduler.{job.name}", job.last_duration_seconds)
+        return True
+
+    async def _run_periodically(self, job: ScheduledJob) -> None:
+        while True:
+            # Jitter keeps replicas started together from ticking in lockstep
+            await asyncio.sleep(job.interval + random.uniform(0, job.jitter))
+            await run_in_threadpool(self.run_once, job)
+
+    def _acquire_leadership(self, job: ScheduledJob) -> bool:
+        with self._connection_lock:
+            try:
+                if self._connection is None:
+                    engine = self._engine or default_engine
+                    self._connection = engine.connect().execution_options(
+                        isolation_level="AUTOCOMMIT"
+                    )
+                if job.name in self._held_locks:
+                    # The lock lives as long as the connection; make sure it does
+                    self._connection.execute(text("SELECT 1"))
+                    return True
+                acquired = self._connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key}
+                ).scalar()
+            except SQLAlchemyError:
+                logger.warning(
+                    "Lost the scheduler lock connection; retrying next tick",
+                    exc_info=True,
+                )
+                self._reset_connection()
+                return False
+            if acquired:
+                self._held_locks.add(job.name)
+                logger.info("Became the leader for scheduled job %s", job.name)
+            return bool(acquired)
+
+    def _close_connection(self) -> None:
+        with self._connection_lock:
+            self._reset_connection()
+
+    def _reset_connection(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except SQLAlchemyError:
+                pass
+        self._connection = None
+        self._held_locks.clear()
+        for job in self._jobs.values():
+            job.is_leader = False
+
+
+scheduler = JobScheduler()
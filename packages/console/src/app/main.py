@@ -1,3 +1,7 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -8,15 +12,100 @@ from app.api.v1.endpoints import (
     endpoint_config,
     file_recovery,
     inventory,
+    metrics,
+    scheduler as scheduler_endpoints,
 )
 from app.config import settings
+from app.core.database import dispose_async_engine, replica_router
+from app.core.db_replicas import run_replica_lag_probe
 from app.core.exceptions import AppException
+from app.core.http_client import close_http_client
+from app.core.logging import logger
+from app.core.scheduler import scheduler
+from app.services.heartbeat_buffer import heartbeat_buffer, run_heartbeat_flusher
+from app.services.ingestion_queue import ingestion_queue, run_ingestion_drainer
+from starlette.concurrency import run_in_threadpool
+
+
+scheduler.add_job(
+    "device_offline_sweep",
+    devices.sweep_offline_devices,
+    interval=settings.CONSOLE_DEVICE_STATUS_SWEEP_INTERVAL_SECONDS,
+    jitter=settings.CONSOLE_DEVICE_STATUS_SWEEP_JITTER_SECONDS,
+)
+scheduler.add_job(
+    "activity_log_partitions",
+    activity_log.create_activity_log_partitions,
+    interval=settings.CONSOLE_ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS,
+    jitter=settings.CONSOLE_ACTIVITY_LOG_MAINTENANCE_JITTER_SECONDS,
+)
+if settings.CONSOLE_ACTIVITY_LOG_RETENTION_DAYS is not None:
+    scheduler.add_job(
+        "activity_log_retention",
+        activity_log.expire_activity_log_partitions,
+        interval=settings.CONSOLE_ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS,
+        jitter=settings.CONSOLE_ACTIVITY_LOG_MAINTENANCE_JITTER_SECONDS,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.CONSOLE_SCHEDULER_ENABLED:
+        scheduler.start()
+    # Buffered heartbeats belong to this process, so every process flushes its own
+    flusher = None
+    if settings.CONSOLE_HEARTBEAT_WRITE_BEHIND:
+        flusher = asyncio.create_task(
+            run_heartbeat_flusher(
+                heartbeat_buffer, settings.CONSOLE_HEARTBEAT_FLUSH_INTERVAL_SECONDS
+            )
+        )
+    # Lag decides where this process routes reads, so each one probes its own
+    prober = None
+    if replica_router is not None:
+        prober = asyncio.create_task(
+            run_replica_lag_probe(
+                replica_router,
+                settings.CONSOLE_DATABASE_REPLICA_LAG_PROBE_INTERVAL_SECONDS,
+            )
+        )
+    drainer = None
+    if ingestion_queue is not None:
+        drainer = asyncio.create_task(
+            run_ingestion_drainer(
+                ingestion_queue, settings.CONSOLE_INGESTION_DRAIN_INTERVAL_SECONDS
+            )
+        )
+    yield
+    await scheduler.stop()
+    if prober is not None:
+        prober.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await prober
+    # Queued requests are durable, so whatever is left is drained after restart
+    if drainer is not None:
+        drainer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await drainer
+    if flusher is not None:
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+        # Write out whatever arrived since the last interval
+        try:
+            await run_in_threadpool(heartbeat_buffer.flush)
+        except Exception:
+            logger.exception("Final heartbeat flush failed")
+    await close_http_client()
+    await dispose_async_engine()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url="/console/openapi.json",
     docs_url="/console/docs",
     redoc_url=None,
+    lifespan=lifespan,
 )
 
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -50,6 +139,16 @@ app.include_router(
     prefix=f"{settings.API_V1_STR}",
     tags=["file-recovery"],
 )
+app.include_router(
+    metrics.router,
+    prefix=f"{settings.API_V1_STR}",
+    tags=["metrics"],
+)
+app.include_router(
+    scheduler_endpoints.router,
+    prefix=f"{settings.API_V1_STR}",
+    tags=["scheduler"],
+)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import JSON, Column, DateTime, Enum, String
+from sqlalchemy import JSON, Column, DateTime, Enum, Index, String
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -18,11 +18,41 @@ class ActivityLog(Base):
     __tablename__ = "activity_logs"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    org_id = Column(String, nullable=False, index=True)
-    device_id = Column(String, nullable=False, index=True)
+    org_id = Column(String, nullable=False)
+    device_id = Column(String, nullable=False)
     activity_type = Column(String, nullable=False, index=True)
     severity = Column(Enum(SeverityLevel), nullable=False, index=True)
     details = Column(JSON, nullable=False)
+    # Part of the primary key because the table is partitioned on it
     created_at = Column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+        primary_key=True,
+    )
+
+    __table_args__ = (
+        # Match the listing order, including the keyset tie-breaker on id
+        Index(
+            "ix_activity_logs_org_id_created_at",
+            org_id,
+            created_at.desc(),
+            id.desc(),
+        ),
+        Index(
+            "ix_activity_logs_device_id_org_id_created_at",
+            device_id,
+            org_id,
+            created_at.desc(),
+            id.desc(),
+        ),
+        Index(
+            "ix_activity_logs_activity_type_trgm",
+            "activity_type",
+            postgresql_using="gin",
+            postgresql_ops={"activity_type": "gin_trgm_ops"},
+        ),
+        # One partition per month; see app.repositories.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
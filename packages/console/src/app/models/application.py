@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Column, DateTime, Enum, String
+from sqlalchemy import Column, DateTime, Enum, Index, String, UniqueConstraint
 
 from app.core.database import Base
 from sqlalchemy.sql import func
@@ -25,3 +25,25 @@ class Application(Base):
     approved_at = Column(DateTime(timezone=True))
     denied_at = Column(DateTime(timezone=True))
     organization_id = Column(String)
+
+    __table_args__ = (
+        # Backs the ON CONFLICT clause used by bulk inventory ingestion
+        UniqueConstraint(
+            "organization_id",
+            "name",
+            "version",
+            "hash",
+            name="uq_applications_org_name_version_hash",
+        ),
+        Index(
+            "ix_applications_organization_id_created_at",
+            organization_id,
+            created_at.desc(),
+        ),
+        Index(
+            "ix_applications_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
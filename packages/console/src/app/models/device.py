@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, Index, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
@@ -20,3 +20,21 @@ class Device(Base):
     last_seen = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True)
     properties = Column(JSONB)
+    # Fingerprint of the stored inventory, see app.utils.inventory_digest
+    inventory_digest = Column(String(64), nullable=True)
+
+    __table_args__ = (
+        Index("ix_devices_org_id_created_at", org_id, created_at.desc()),
+        Index(
+            "ix_devices_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_devices_serial_number_trgm",
+            "serial_number",
+            postgresql_using="gin",
+            postgresql_ops={"serial_number": "gin_trgm_ops"},
+        ),
+    )
@@ -15,4 +15,7 @@ class EndpointConfig(Base):
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=True
     )
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+    # Set on insert too, so it comes back through RETURNING like created_at
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=True
+    )
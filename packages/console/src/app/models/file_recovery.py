@@ -1,6 +1,6 @@
 from enum import Enum as PyEnum
 
-from sqlalchemy import Column, DateTime, Enum, Float, Integer, String
+from sqlalchemy import Column, DateTime, Enum, Float, Index, Integer, String
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -43,3 +43,19 @@ class FileRecovery(Base):
     updated_at = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
     )
+
+    __table_args__ = (
+        Index("ix_file_recoveries_org_id_created_at", org_id, created_at.desc()),
+        Index(
+            "ix_file_recoveries_device_id_org_id_created_at",
+            device_id,
+            org_id,
+            created_at.desc(),
+        ),
+        Index(
+            "ix_file_recoveries_file_name_trgm",
+            "file_name",
+            postgresql_using="gin",
+            postgresql_ops={"file_name": "gin_trgm_ops"},
+        ),
+    )
@@ -21,4 +21,12 @@ class Inventory(Base):
     )
     application = relationship("Application")
 
-    __table_args__ = (Index("ix_inventory_status", "status"),)
+    __table_args__ = (
+        Index("ix_inventory_status", "status"),
+        Index(
+            "uq_inventories_device_id_application_id",
+            device_id,
+            application_id,
+            unique=True,
+        ),
+    )
@@ -1,12 +1,29 @@
+import uuid
+from datetime import datetime
 from typing import List, Optional, Tuple
 
-from sqlalchemy import String, and_, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, String, and_, insert, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
 
 from app.models import ActivityLog
 from app.models.device import Device
-from app.repositories.base import BaseRepository
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+from app.repositories.counting import count_rows
+from app.repositories.search import text_search
 from app.schemas.activity_logs import ActivityLogCreate
+from app.schemas.common import CountMode
+
+
+_table = ActivityLog.__table__
+_INSERT_RETURNING = insert(_table).returning(*_table.c, sort_by_parameter_order=True)
+
+
+def _activity_log_rows(logs: List[ActivityLogCreate], org_id: str) -> List[dict]:
+    return [
+        {**log_data.model_dump(), "id": str(uuid.uuid4()), "org_id": org_id}
+        for log_data in logs
+    ]
 
 
 class ActivityLogRepository(BaseRepository[ActivityLog, ActivityLogCreate, None]):
@@ -15,32 +32,29 @@ class ActivityLogRepository(BaseRepository[ActivityLog, ActivityLogCreate, None]
 
     def create_activity_logs(
         self, logs: List[ActivityLogCreate], org_id: str
-    ) -> List[Tuple[ActivityLog, str]]:
-        created_logs = []
+    ) -> List[Tuple[Row, Optional[str]]]:
+        """Insert a batch of logs and return each created row with its device name.
+
+        The rows go out as multi-row ``INSERT ... RETURNING`` statements (one
+        per ``insertmanyvalues`` page of 1000) and come back as plain rows, so
+        a batch of N costs one lookup for the device names plus N/1000
+        inserts, with no ORM objects to flush, expire or refresh.
+        """
+        if not logs:
+            return []
+        rows = _activity_log_rows(logs, org_id)
         try:
-            for log_data in logs:
-                log_dict = log_data.model_dump()
-                log_dict["org_id"] = org_id
-
-                log = ActivityLog(**log_dict)
-                self.db.add(log)
-                created_logs.append(log)
-            self.db.commit()
-
-            # Fetch device names in a single query
-            log_ids = [log.id for log in created_logs]
-            device_names = (
-                self.db.query(ActivityLog, Device.name)
-                .join(Device, ActivityLog.device_id == Device.id)
-                .filter(ActivityLog.id.in_(log_ids))
-                .all()
+            device_names = dict(
+                self.db.query(Device.id, Device.name).filter(
+                    Device.id.in_({row["device_id"] for row in rows})
+                )
             )
-            for log in created_logs:
-                self.db.refresh(log)
-            return device_names
+            created_logs = self.db.execute(_INSERT_RETURNING, rows).all()
+            self.commit()
         except Exception as e:
             self.db.rollback()
             raise e
+        return [(log, device_names.get(log.device_id)) for log in created_logs]
 
     def get_activity_logs_by_filters(
         self,
@@ -50,17 +64,23 @@ class ActivityLogRepository(BaseRepository[ActivityLog, ActivityLogCreate, None]
         severity: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[Tuple[ActivityLog, str]], int]:
+        cursor: Optional[Tuple[datetime, str]] = None,
+        since: Optional[datetime] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> Tuple[List[Tuple[ActivityLog, str]], Optional[int]]:
         base_conditions = [ActivityLog.org_id == org_id]
+        if since is not None:
+            base_conditions.append(ActivityLog.created_at >= since)
         # filter condition
         if device_name and device_name.strip():
-            base_conditions.append(Device.name.ilike(f"%{device_name.strip()}%"))
+            base_conditions.append(text_search(Device.name, device_name))
 
         if search and search.strip():
             base_conditions.append(
                 or_(
-                    Device.name.ilike(f"%{search.strip()}%"),
-                    ActivityLog.activity_type.ilike(f"%{search.strip()}%"),
+                    text_search(Device.name, search),
+                    text_search(ActivityLog.activity_type, search),
                 )
             )
 
@@ -74,17 +94,16 @@ class ActivityLogRepository(BaseRepository[ActivityLog, ActivityLogCreate, None]
             .join(Device, ActivityLog.device_id == Device.id)
             .filter(and_(*base_conditions))
         )
-
-        total_filtered = query.count()
-
-        logs = (
-            query.order_by(ActivityLog.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        total_filtered = (
+            count_rows(
+                query,
+                count_mode,
+                ("activity_logs", org_id, None, device_name, search, severity, since),
+            )
+            if include_total
+            else None
         )
-
-        return logs, total_filtered
+        return self._paginate(query, skip, limit, cursor), total_filtered
 
     def get_activity_logs_by_device(
         self,
@@ -94,15 +113,19 @@ class ActivityLogRepository(BaseRepository[ActivityLog, ActivityLogCreate, None]
         severity: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[Tuple[ActivityLog, str]], int]:
+        cursor: Optional[Tuple[datetime, str]] = None,
+        since: Optional[datetime] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> Tuple[List[Tuple[ActivityLog, str]], Optional[int]]:
         base_conditions = [
             ActivityLog.device_id == device_id,
             ActivityLog.org_id == org_id,
         ]
+        if since is not None:
+            base_conditions.append(ActivityLog.created_at >= since)
         if search and search.strip():
-            base_conditions.append(
-                ActivityLog.activity_type.ilike(f"%{search.strip()}%")
-            )
+            base_conditions.append(text_search(ActivityLog.activity_type, search))
 
         if severity and severity.strip():
             base_conditions.append(
@@ -114,13 +137,63 @@ class ActivityLogRepository(BaseRepository[ActivityLog, ActivityLogCreate, None]
             .join(Device, ActivityLog.device_id == Device.id)
             .filter(and_(*base_conditions))
         )
+        total_filtered = (
+            count_rows(
+                query,
+                count_mode,
+                ("activity_logs", org_id, device_id, None, search, severity, since),
+            )
+            if include_total
+            else None
+        )
+        return self._paginate(query, skip, limit, cursor), total_filtered
+
+    @staticmethod
+    def _paginate(
+        query: Query,
+        skip: int,
+        limit: int,
+        cursor: Optional[Tuple[datetime, str]],
+    ) -> List[Tuple[ActivityLog, str]]:
+        if cursor is not None:
+            # Keyset pagination: resume right after the previous page's last
+            # row, so a deep page costs the same as the first one
+            query = query.filter(
+                tuple_(ActivityLog.created_at, ActivityLog.id) < tuple_(*cursor)
+            )
+            skip = 0
 
-        total_filtered = query.count()
-
-        logs = (
-            query.order_by(ActivityLog.created_at.desc())
+        return (
+            query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
             .offset(skip)
             .limit(limit)
             .all()
         )
-        return logs, total_filtered
+
+
+class AsyncActivityLogRepository(
+    AsyncBaseRepository[ActivityLog, ActivityLogCreate, None]
+):
+    def __init__(self, db: AsyncSession):
+        super().__init__(ActivityLog, db)
+
+    async def create_activity_logs(
+        self, logs: List[ActivityLogCreate], org_id: str
+    ) -> List[Tuple[Row, Optional[str]]]:
+        """See ``ActivityLogRepository.create_activity_logs``."""
+        if not logs:
+            return []
+        rows = _activity_log_rows(logs, org_id)
+        try:
+            names = await self.db.execute(
+                select(Device.id, Device.name).where(
+                    Device.id.in_({row["device_id"] for row in rows})
+                )
+            )
+            device_names = dict(names.all())
+            created_logs = (await self.db.execute(_INSERT_RETURNING, rows)).all()
+            await self.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        return [(log, device_names.get(log.device_id)) for log in created_logs]
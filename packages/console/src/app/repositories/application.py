@@ -1,11 +1,14 @@
 from datetime import datetime
 
 from app.repositories.base import BaseRepository
+from app.repositories.counting import count_rows
+from app.repositories.search import text_search
 from app.models import Application, ApprovalStatus
-from sqlalchemy import String, cast, case
+from sqlalchemy import String, cast, case, func, update
 from sqlalchemy.orm import Session
-from typing import Optional, Type, Tuple
+from typing import Dict, List, Optional, Sequence, Type, Tuple
 from app.schemas.application import ApplicationCreate
+from app.schemas.common import CountMode
 
 
 class ApplicationRepository(
@@ -21,6 +24,7 @@ class ApplicationRepository(
         status: Optional[str] = None,
         skip: int = 0,
         limit: int = 10000,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> Tuple[list[Type[Application]], int]:
         query = self.db.query(self.model).filter(self.model.organization_id == org_id)
 
@@ -31,12 +35,14 @@ class ApplicationRepository(
                     cast(self.model.status, String).ilike(f"%{status.strip()}%")
                 )
         if search:
-            base_conditions.append(self.model.name.ilike(f"%{search.strip()}%"))
+            base_conditions.append(text_search(self.model.name, search))
 
         for condition in base_conditions:
             query = query.filter(condition)
 
-        total_filtered = query.count()
+        total_filtered = count_rows(
+            query, count_mode, ("applications", org_id, search, status)
+        )
 
         # Fixed case syntax for status ordering
         status_order = case(
@@ -78,7 +84,7 @@ class ApplicationRepository(
         if application:
             application.status = ApprovalStatus.APPROVED
             application.approved_at = datetime.now()
-            self.db.commit()
+            self.commit()
         return application
 
     def deny_application(self, application_id: str) -> Application | None:
@@ -86,8 +92,51 @@ class ApplicationRepository(
         if application:
             application.status = ApprovalStatus.DENIED
             application.denied_at = datetime.now()
-            self.db.commit()
+            self.commit()
         return application
 
-    def commit(self):
-        self.db.commit()
+    def lock_statuses(
+        self, org_id: str, application_ids: Sequence[str]
+    ) -> Dict[str, ApprovalStatus]:
+        """Return the status of each owned application, locking the rows."""
+        rows = (
+            self.db.query(self.model.id, self.model.status)
+            .filter(
+                self.model.organization_id == org_id,
+                self.model.id.in_(application_ids),
+            )
+            .with_for_update()
+            .all()
+        )
+        return {app_id: status for app_id, status in rows}
+
+    def set_status(
+        self, application_ids: Sequence[str], status: ApprovalStatus
+    ) -> List[Application]:
+        """Decide every listed application in one UPDATE; not committed."""
+        decided_at = (
+            self.model.approved_at
+            if status == ApprovalStatus.APPROVED
+            else self.model.denied_at
+        )
+        statement = (
+            update(self.model)
+            .where(self.model.id.in_(application_ids))
+            .values({self.model.status: status, decided_at: func.now()})
+            .returning(self.model)
+        )
+        return list(self.db.scalars(statement))
+
+    def get_decided_hashes(self, org_id: str) -> List[Tuple[str, ApprovalStatus]]:
+        """Return (hash, status) of every approved or denied application."""
+        rows = (
+            self.db.query(self.model.hash, self.model.status)
+            .filter(
+                self.model.organization_id == org_id,
+                self.model.status.in_([ApprovalStatus.APPROVED, ApprovalStatus.DENIED]),
+                self.model.hash.isnot(None),
+            )
+            .order_by(self.model.hash)
+            .all()
+        )
+        return [(app_hash, status) for app_hash, status in rows]
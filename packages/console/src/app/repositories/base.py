@@ -1,11 +1,14 @@
 import uuid
-from typing import Generic, List, Type, TypeVar
+from typing import Any, Callable, Generic, List, Type, TypeVar
 
 from fastapi import HTTPException
 from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.database import after_commit, in_unit_of_work
+
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -22,15 +25,25 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         return self.db.query(self.model).offset(skip).limit(limit).all()
 
-    def create(self, obj_in: CreateSchemaType) -> ModelType:
+    def commit(self) -> None:
+        """Commit, or only flush while a unit of work owns the transaction."""
+        if in_unit_of_work(self.db):
+            self.db.flush()
+        else:
+            self.db.commit()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        after_commit(self.db, callback)
+
+    def create(self, obj_in: CreateSchemaType, **attributes: Any) -> ModelType:
+        """Insert ``obj_in``; ``attributes`` set columns the schema lacks."""
         obj_data = obj_in.model_dump()
-        db_obj = self.model(**obj_data)
+        db_obj = self.model(**obj_data, **attributes)
         if hasattr(db_obj, "id") and not db_obj.id:
             db_obj.id = str(uuid.uuid4())
         self.db.add(db_obj)
         try:
-            self.db.commit()
-            self.db.refresh(db_obj)
+            self.commit()
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
@@ -45,8 +58,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             setattr(db_obj, key, value)
         self.db.add(db_obj)
         try:
-            self.db.commit()
-            self.db.refresh(db_obj)
+            self.commit()
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
@@ -57,8 +69,27 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if db_obj:
             self.db.delete(db_obj)
             try:
-                self.db.commit()
+                self.commit()
             except SQLAlchemyError as e:
                 self.db.rollback()
                 raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
         return db_obj
+
+
+class AsyncBaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """``BaseRepository`` for an ``AsyncSession``, used by the agent routes."""
+
+    def __init__(self, model: Type[ModelType], db: AsyncSession):
+        self.model = model
+        self.db = db
+
+    async def get(self, id: str) -> ModelType | None:
+        # An object the request already loaded is served without a round trip
+        return await self.db.get(self.model, id)
+
+    async def commit(self) -> None:
+        """Commit, or only flush while a unit of work owns the transaction."""
+        if in_unit_of_work(self.db):
+            await self.db.flush()
+        else:
+            await self.db.commit()
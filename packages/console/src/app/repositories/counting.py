@@ -0,0 +1,44 @@
+from typing import Hashable
+
+from sqlalchemy.orm import Query
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+from app.schemas.common import CountMode
+
+count_cache = TTLCache(
+    maxsize=settings.CONSOLE_COUNT_CACHE_MAXSIZE,
+    ttl=settings.CONSOLE_COUNT_CACHE_TTL_SECONDS,
+)
+metrics.register_collector("count_cache", count_cache.stats)
+
+
+def count_rows(query: Query, count_mode: CountMode, cache_key: Hashable) -> int:
+    """Total for a filtered list query, computed the way ``count_mode`` asks.
+
+    ``cache_key`` must identify the organization and every filter applied
+    to ``query``; it is only used by the cached mode.
+    """
+    if count_mode == CountMode.ESTIMATE:
+        return estimate_rows(query)
+    if count_mode == CountMode.CACHED:
+        total = count_cache.get(cache_key)
+        if total is None:
+            total = query.count()
+            count_cache.set(cache_key, total)
+        return total
+    return query.count()
+
+
+def estimate_rows(query: Query) -> int:
+    """The planner's row estimate for ``query``, read from EXPLAIN without running it."""
+    statement = query.statement
+    # Explain on the connection the query itself would run on, which for a
+    # routing session is a replica rather than the session's primary
+    connection = query.session.connection(bind_arguments={"clause": statement})
+    compiled = statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -2,16 +2,45 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from app.core.exceptions import NotFoundException
-from sqlalchemy import and_, or_, distinct, func, cast, Float
+from sqlalchemy import and_, or_, distinct, cast, Float, DateTime, String
+from sqlalchemy import Update, column, select, update, values
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.context import get_org_id
 
 # from app.core.exceptions import NotFoundException, UnauthorizedException
 from app.models.device import Device
+from app.schemas.common import CountMode
 from app.schemas.device import DeviceCreate, DeviceUpdate
 
-from .base import BaseRepository
+from .base import AsyncBaseRepository, BaseRepository
+from .counting import count_rows
+from .search import text_search
+
+Heartbeats = Dict[str, Tuple[datetime, Dict[str, Any]]]
+
+
+def _bulk_heartbeat_update(org_id: str, heartbeats: Heartbeats) -> Update:
+    incoming = values(
+        column("id", String),
+        column("last_seen", DateTime(timezone=True)),
+        column("properties", JSONB),
+        name="incoming",
+    ).data(
+        [
+            (device_id, last_seen, properties)
+            for device_id, (last_seen, properties) in heartbeats.items()
+        ]
+    )
+    return (
+        update(Device)
+        .where(Device.id == incoming.c.id, Device.org_id == org_id)
+        .values(last_seen=incoming.c.last_seen, properties=incoming.c.properties)
+        .returning(Device.id)
+        .execution_options(synchronize_session=False)
+    )
 
 
 class DeviceRepository(BaseRepository[Device, DeviceCreate, DeviceUpdate]):
@@ -23,6 +52,8 @@ class DeviceRepository(BaseRepository[Device, DeviceCreate, DeviceUpdate]):
     HEALTH_HEALTHY = "HEALTHY"
     HEALTH_UNKNOWN = "UNKNOWN"
 
+    OFFLINE_PROPERTIES = {"cpu": None, "memory": None, "disk": None}
+
     def get_by_serial_number(self, serial_number: str, org_id: str) -> Optional[Device]:
         return (
             self.db.query(self.model)
@@ -45,17 +76,20 @@ class DeviceRepository(BaseRepository[Device, DeviceCreate, DeviceUpdate]):
             .all()
         ]
 
-    def update_device_status(self) -> None:
+    def update_device_status(self, chunk_size: int = 5000) -> int:
         """
-        Update device status based on heartbeat timeout
+        Mark devices offline when their heartbeat has timed out.
+
+        Runs as set-based UPDATEs of at most ``chunk_size`` rows, each
+        committed on its own so locks are held briefly. Devices that were
+        already cleared are skipped. Returns the number of devices updated.
         """
         current_time = datetime.now(timezone.utc)
         five_minutes_ago = current_time - timedelta(minutes=5)
 
-        # Update devices that haven't sent heartbeat in 5 minutes
-        inactive_devices = (
-            self.db.query(Device)
-            .filter(
+        stale_ids = (
+            select(Device.id)
+            .where(
                 or_(
                     # Devices with last_seen older than 5 minutes
                     and_(
@@ -67,24 +101,64 @@ class DeviceRepository(BaseRepository[Device, DeviceCreate, DeviceUpdate]):
                         Device.last_seen.is_(None),
                         Device.created_at <= five_minutes_ago,
                     ),
-                )
+                ),
+                Device.properties.is_distinct_from(self.OFFLINE_PROPERTIES),
             )
-            .all()
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        # Clear all metrics when a device goes offline
+        statement = (
+            update(Device)
+            .where(Device.id.in_(stale_ids))
+            .values(last_seen=None, properties=self.OFFLINE_PROPERTIES)
+            .returning(Device.id)
+            .execution_options(synchronize_session=False)
         )
 
-        if inactive_devices:
-            for device in inactive_devices:
-                # Clear all metrics and set new properties when device goes offline
-                self.db.execute(
-                    Device.__table__.update()
-                    .where(Device.id == device.id)
-                    .values(
-                        last_seen=None,
-                        health=self.HEALTH_UNKNOWN,
-                        properties={"cpu": None, "memory": None, "disk": None},
-                    )
-                )
+        total = 0
+        while True:
+            updated = len(self.db.execute(statement).all())
             self.db.commit()
+            total += updated
+            if updated < chunk_size:
+                return total
+
+    def bulk_update_heartbeats(self, org_id: str, heartbeats: Heartbeats) -> List[str]:
+        """
+        Record heartbeats for many devices in one UPDATE ... FROM (VALUES ...).
+
+        ``heartbeats`` maps device ids to their ``(last_seen, properties)``.
+        Only devices belonging to ``org_id`` are touched; the ids of the
+        devices actually updated are returned.
+        """
+        if not heartbeats:
+            return []
+        updated_ids = list(
+            self.db.execute(_bulk_heartbeat_update(org_id, heartbeats)).scalars()
+        )
+        self.commit()
+        return updated_ids
+
+    def get_owned_device_ids(self, org_id: str, device_ids: List[str]) -> List[str]:
+        """Return the subset of ``device_ids`` that belong to ``org_id``."""
+        if not device_ids:
+            return []
+        return [
+            row[0]
+            for row in self.db.query(self.model.id)
+            .filter(self.model.org_id == org_id, self.model.id.in_(device_ids))
+            .all()
+        ]
+
+    def set_inventory_digest(self, device_id: str, digest: Optional[str]) -> None:
+        """Store the inventory fingerprint; committed with the caller's changes."""
+        self.db.execute(
+            update(self.model).where(self.model.id == device_id)
+            # An inventory change is not an edit of the device itself
+            .values(inventory_digest=digest, updated_at=self.model.updated_at)
+        )
 
     def update(self, id: str, obj_in: Union[DeviceUpdate, Dict[str, Any]]) -> Device:
         db_obj = self.get(id)
@@ -103,8 +177,7 @@ class DeviceRepository(BaseRepository[Device, DeviceCreate, DeviceUpdate]):
             setattr(db_obj, field, update_data[field])
 
         self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        self.commit()
         return db_obj
 
     def _calculate_device_status(self, device: Device) -> str:
@@ -162,15 +235,17 @@ class DeviceRepository(BaseRepository[Device, DeviceCreate, DeviceUpdate]):
         health: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> Tuple[List[Device], int]:
         org_id = get_org_id()
+        # Keyed on the raw arguments: the status filter embeds the current time
+        cache_key = ("devices", org_id, search_term, device_type, status, health)
         query = self.db.query(self.model).filter(self.model.org_id == org_id)
 
         if search_term and search_term.strip():
-            search_term = f"%{search_term.strip().lower()}%"
             search_filter = or_(
-                func.lower(self.model.name).contains(search_term),
-                func.lower(self.model.serial_number).contains(search_term),
+                text_search(self.model.name, search_term),
+                text_search(self.model.serial_number, search_term),
             )
             query = query.filter(search_filter)
 
@@ -246,8 +321,55 @@ class DeviceRepository(BaseRepository[Device, DeviceCreate, DeviceUpdate]):
                     )
                 )
 
-        total_filtered = query.count()
+        total_filtered = count_rows(query, count_mode, cache_key)
         devices = (
             query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
         )
         return devices, total_filtered
+
+
+class AsyncDeviceRepository(AsyncBaseRepository[Device, DeviceCreate, DeviceUpdate]):
+    """The heartbeat and validation paths of ``DeviceRepository``, on asyncio."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(Device, db)
+
+    async def bulk_update_heartbeats(
+        self, org_id: str, heartbeats: Heartbeats
+    ) -> List[str]:
+        """See ``DeviceRepository.bulk_update_heartbeats``."""
+        if not heartbeats:
+            return []
+        result = await self.db.execute(_bulk_heartbeat_update(org_id, heartbeats))
+        updated_ids = list(result.scalars())
+        await self.commit()
+        return updated_ids
+
+    async def get_owned_device_ids(
+        self, org_id: str, device_ids: List[str]
+    ) -> List[str]:
+        """Return the subset of ``device_ids`` that belong to ``org_id``."""
+        if not device_ids:
+            return []
+        result = await self.db.execute(
+            select(Device.id).where(Device.org_id == org_id, Device.id.in_(device_ids))
+        )
+        return list(result.scalars())
+
+    async def update(
+        self, id: str, obj_in: Union[DeviceUpdate, Dict[str, Any]]
+    ) -> Device:
+        db_obj = await self.get(id)
+        if not db_obj:
+            raise NotFoundException(f"Device with id {id} not found")
+
+        update_data = (
+            obj_in
+            if isinstance(obj_in, dict)
+            else obj_in.model_dump(exclude_unset=True)
+        )
+        for field in update_data:
+            setattr(db_obj, field, update_data[field])
+
+        await self.commit()
+        return db_obj
@@ -43,11 +43,6 @@ class EndpointConfigRepository(
             # Mark the object as modified
             self.db.add(db_obj)
 
-            # Commit the changes
-            self.db.commit()
-
-            # Refresh the object
-            self.db.expire(db_obj)
-            self.db.refresh(db_obj)
+            self.commit()
 
         return db_obj
@@ -1,15 +1,42 @@
 from typing import List, Optional, Tuple
 
-from sqlalchemy import String, and_, or_
+from sqlalchemy import Row, String, and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.exceptions import DatabaseOperationException
 from app.models.device import Device
 from app.models.file_recovery import FileRecovery, RecoveryStatus
-from app.repositories.base import BaseRepository
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+from app.repositories.counting import count_rows
+from app.repositories.search import text_search
+from app.schemas.common import CountMode
 from app.schemas.file_recovery import FileRecoveryCreate, FileRecoveryUpdate
 
 
+_table = FileRecovery.__table__
+_INSERT_RETURNING = insert(_table).returning(*_table.c, sort_by_parameter_order=True)
+
+
+def _file_recovery_rows(
+    recoveries_data: List[FileRecoveryCreate], org_id: str
+) -> List[dict]:
+    return [
+        {**recovery_data.model_dump(), "org_id": org_id}
+        for recovery_data in recoveries_data
+    ]
+
+
+def _create_failed(
+    error: Exception, org_id: str, count: int
+) -> DatabaseOperationException:
+    return DatabaseOperationException(
+        message=f"Failed to create file recoveries: {str(error)}",
+        error_code="FILE_RECOVERY_CREATE_FAILED",
+        details={"org_id": org_id, "recoveries_count": count},
+    )
+
+
 class FileRecoveryRepository(
     BaseRepository[FileRecovery, FileRecoveryCreate, FileRecoveryUpdate]
 ):
@@ -37,7 +64,7 @@ class FileRecoveryRepository(
         )
 
         if search:
-            query = query.filter(FileRecovery.file_name.ilike(f"%{search}%"))
+            query = query.filter(text_search(FileRecovery.file_name, search))
 
         if status:
             query = query.filter(FileRecovery.status.cast(String).ilike(f"%{status}%"))
@@ -61,7 +88,7 @@ class FileRecoveryRepository(
         )
 
         if search:
-            query = query.filter(FileRecovery.file_name.ilike(f"%{search}%"))
+            query = query.filter(text_search(FileRecovery.file_name, search))
 
         if status:
             query = query.filter(FileRecovery.status.cast(String).ilike(f"%{status}%"))
@@ -76,18 +103,19 @@ class FileRecoveryRepository(
         status: Optional[RecoveryStatus] = None,
         skip: int = 0,
         limit: int = 100,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> Tuple[List[Tuple[FileRecovery, str]], int]:
         base_conditions = [FileRecovery.org_id == org_id]
 
         # Filter conditions
         if device_name and device_name.strip():
-            base_conditions.append(Device.name.ilike(f"%{device_name.strip()}%"))
+            base_conditions.append(text_search(Device.name, device_name))
 
         if search and search.strip():
             base_conditions.append(
                 or_(
-                    Device.name.ilike(f"%{search.strip()}%"),
-                    FileRecovery.file_name.ilike(f"%{search.strip()}%"),
+                    text_search(Device.name, search),
+                    text_search(FileRecovery.file_name, search),
                 )
             )
 
@@ -102,7 +130,11 @@ class FileRecoveryRepository(
             .filter(and_(*base_conditions))
         )
 
-        total_filtered = query.count()
+        total_filtered = count_rows(
+            query,
+            count_mode,
+            ("file_recoveries", org_id, device_name, search, status),
+        )
 
         recoveries = (
             query.order_by(FileRecovery.created_at.desc())
@@ -114,34 +146,26 @@ class FileRecoveryRepository(
 
     def create_file_recoveries(
         self, recoveries_data: List[FileRecoveryCreate], org_id: str
-    ) -> List[Tuple[FileRecovery, str]]:
-        created_recoveries = []
+    ) -> List[Tuple[Row, Optional[str]]]:
+        """Insert a batch with ``INSERT ... RETURNING``; see create_activity_logs."""
+        if not recoveries_data:
+            return []
+        rows = _file_recovery_rows(recoveries_data, org_id)
         try:
-            for recovery_data in recoveries_data:
-                recovery_dict = recovery_data.model_dump()
-                recovery_dict["org_id"] = org_id
-
-                recovery = FileRecovery(**recovery_dict)
-                self.db.add(recovery)
-                created_recoveries.append(recovery)
-            self.db.commit()
-            for recovery in created_recoveries:
-                self.db.refresh(recovery)
-            recoveries_with_names = (
-                self.db.query(FileRecovery, Device.name)
-                .join(Device, FileRecovery.device_id == Device.id)
-                .filter(FileRecovery.id.in_([r.id for r in created_recoveries]))
-                .all()
+            device_names = dict(
+                self.db.query(Device.id, Device.name).filter(
+                    Device.id.in_({row["device_id"] for row in rows})
+                )
             )
-
-            return recoveries_with_names
+            created_recoveries = self.db.execute(_INSERT_RETURNING, rows).all()
+            self.commit()
         except Exception as e:
             self.db.rollback()
-            raise DatabaseOperationException(
-                message=f"Failed to create file recoveries: {str(e)}",
-                error_code="FILE_RECOVERY_CREATE_FAILED",
-                details={"org_id": org_id, "recoveries_count": len(recoveries_data)},
-            )
+            raise _create_failed(e, org_id, len(recoveries_data))
+        return [
+            (recovery, device_names.get(recovery.device_id))
+            for recovery in created_recoveries
+        ]
 
     def update_file_recovery(
         self, recovery_id: int, recovery_data: FileRecoveryUpdate
@@ -151,8 +175,8 @@ class FileRecoveryRepository(
             for key, value in recovery_data.model_dump(exclude_unset=True).items():
                 setattr(recovery, key, value)
             try:
-                self.db.commit()
-                self.db.refresh(recovery)  # Added refresh to get updated_at timestamp
+                # updated_at comes back through RETURNING (eager defaults)
+                self.commit()
             except Exception as e:
                 self.db.rollback()
                 raise DatabaseOperationException(
@@ -161,3 +185,34 @@ class FileRecoveryRepository(
                     details={"recovery_id": recovery_id},
                 ) from e
         return recovery
+
+
+class AsyncFileRecoveryRepository(
+    AsyncBaseRepository[FileRecovery, FileRecoveryCreate, FileRecoveryUpdate]
+):
+    def __init__(self, db: AsyncSession):
+        super().__init__(FileRecovery, db)
+
+    async def create_file_recoveries(
+        self, recoveries_data: List[FileRecoveryCreate], org_id: str
+    ) -> List[Tuple[Row, Optional[str]]]:
+        """See ``FileRecoveryRepository.create_file_recoveries``."""
+        if not recoveries_data:
+            return []
+        rows = _file_recovery_rows(recoveries_data, org_id)
+        try:
+            names = await self.db.execute(
+                select(Device.id, Device.name).where(
+                    Device.id.in_({row["device_id"] for row in rows})
+                )
+            )
+            device_names = dict(names.all())
+            created_recoveries = (await self.db.execute(_INSERT_RETURNING, rows)).all()
+            await self.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise _create_failed(e, org_id, len(recoveries_data))
+        return [
+            (recovery, device_names.get(recovery.device_id))
+            for recovery in created_recoveries
+        ]
@@ -1,12 +1,34 @@
-from typing import List, Tuple, Type
+from typing import Dict, Iterator, List, Sequence, Tuple, Type, TypeVar
+from uuid import uuid4
 
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app.models import Application, Inventory
+from app.models.application import ApprovalStatus as ModelApprovalStatus
 from app.repositories.base import BaseRepository
+from app.repositories.counting import count_rows
+from app.repositories.search import text_search
+from app.schemas.application import ApplicationBase
+from app.schemas.common import CountMode
 from app.schemas.inventory import ApprovalStatus, InventoryCreate, InventoryUpdate
 from typing import Optional
 
+# (name, version, hash) identifies an application within an organization
+ApplicationKey = Tuple[str, str, str]
+
+# Rows per multi-row statement, keeping each well under the bind parameter limit
+BULK_CHUNK_SIZE = 1000
+
+T = TypeVar("T")
+
+
+def _chunks(items: Sequence[T]) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), BULK_CHUNK_SIZE):
+        end = start + BULK_CHUNK_SIZE
+        yield items[start:end]
+
 
 class InventoryRepository(BaseRepository[Inventory, InventoryCreate, InventoryUpdate]):
     def __init__(self, db: Session):
@@ -19,16 +41,18 @@ class InventoryRepository(BaseRepository[Inventory, InventoryCreate, InventoryUp
         limit: int = 100,
         search: str = None,
         status: Optional[ApprovalStatus] = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> Tuple[List[Inventory], int]:
         query = self.db.query(Inventory).filter(Inventory.device_id == device_id)
         if search:
             query = query.filter(
-                Inventory.application.has(Application.name.ilike(f"%{search}%"))
+                Inventory.application.has(text_search(Application.name, search))
             )
 
         if status:
             query = query.filter(Inventory.status == status.value.upper())
-        total = query.count()
+        # Devices belong to a single organization, so the device id scopes the key
+        total = count_rows(query, count_mode, ("inventory", device_id, search, status))
         device_inventory = query.offset(skip).limit(limit).all()
         return device_inventory, total
 
@@ -72,6 +96,156 @@ class InventoryRepository(BaseRepository[Inventory, InventoryCreate, InventoryUp
         self.db.add(inventory_item)
         return inventory_item
 
+    def get_applications_by_keys(
+        self, org_id: str, keys: Sequence[ApplicationKey]
+    ) -> List[Application]:
+        applications = []
+        for chunk in _chunks(keys):
+            applications.extend(
+                self.db.query(Application)
+                .filter(
+                    Application.organization_id == org_id,
+                    tuple_(Application.name, Application.version, Application.hash).in_(
+                        chunk
+                    ),
+                )
+                .all()
+            )
+        return applications
+
+    def insert_applications(
+        self, org_id: str, applications: Sequence[ApplicationBase]
+    ) -> List[Application]:
+        """Insert ``applications``, skipping any that already exist.
+
+        Returns only the rows this call created; rows inserted concurrently by
+        another request are left for the caller to look up.
+        """
+        created = []
+        for chunk in _chunks(applications):
+            statement = (
+                insert(Application)
+                .values(
+                    [
+                        {
+                            "id": str(uuid4()),
+                            "name": application.name,
+                            "version": application.version,
+                            "publisher": application.publisher,
+                            "hash": application.hash,
+                            "organization_id": org_id,
+                        }
+                        for application in chunk
+                    ]
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        Application.organization_id,
+                        Application.name,
+                        Application.version,
+                        Application.hash,
+                    ]
+                )
+                .returning(Application)
+            )
+            created.extend(self.db.scalars(statement).all())
+        return created
+
+    def get_device_application_keys(self, device_id: str) -> Dict[ApplicationKey, str]:
+        """Map each application on the device to its application id."""
+        rows = (
+            self.db.query(
+                Application.name,
+                Application.version,
+                Application.hash,
+                Inventory.application_id,
+            )
+            .join(Application, Inventory.application_id == Application.id)
+            .filter(Inventory.device_id == device_id)
+            .all()
+        )
+        return {(name, version, hash): app_id for name, version, hash, app_id in rows}
+
+    def get_device_inventory_for_applications(
+        self, device_id: str, application_ids: Sequence[str]
+    ) -> List[Inventory]:
+        items = []
+        for chunk in _chunks(application_ids):
+            items.extend(
+                self.db.query(Inventory)
+                .filter(
+                    Inventory.device_id == device_id,
+                    Inventory.application_id.in_(chunk),
+                )
+                .all()
+            )
+        return items
+
+    def insert_inventory_items(
+        self, device_id: str, applications: Sequence[Application]
+    ) -> List[Inventory]:
+        """Add ``applications`` to the device inventory, skipping existing pairs.
+
+        New items start with the application's current approval status.
+        """
+        created = []
+        for chunk in _chunks(applications):
+            statement = (
+                insert(Inventory)
+                .values(
+                    [
+                        {
+                            "id": str(uuid4()),
+                            "device_id": device_id,
+                            "application_id": application.id,
+                            "status": application.status,
+                        }
+                        for application in chunk
+                    ]
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[Inventory.device_id, Inventory.application_id]
+                )
+                .returning(Inventory)
+            )
+            created.extend(self.db.scalars(statement).all())
+        return created
+
+    def set_status_for_applications(
+        self,
+        application_ids: Sequence[str],
+        from_statuses: Sequence[ModelApprovalStatus],
+        status: ModelApprovalStatus,
+    ) -> int:
+        """Move matching inventory rows of the applications to ``status``.
+
+        Runs as one UPDATE and is committed with the caller's transaction.
+        """
+        decided_at = (
+            Inventory.approved_at
+            if status == ModelApprovalStatus.APPROVED
+            else Inventory.denied_at
+        )
+        result = self.db.execute(
+            update(Inventory)
+            .where(
+                Inventory.application_id.in_(application_ids),
+                Inventory.status.in_(from_statuses),
+            )
+            .values({Inventory.status: status, decided_at: func.now()})
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def remove_inventory_items(
+        self, device_id: str, application_ids: Sequence[str]
+    ) -> None:
+        for chunk in _chunks(application_ids):
+            self.db.query(Inventory).filter(
+                Inventory.device_id == device_id,
+                Inventory.application_id.in_(chunk),
+            ).delete(synchronize_session=False)
+
     def remove_inventory_item(self, device_id: str, application_id: str) -> None:
         self.db.query(Inventory).filter(
             Inventory.device_id == device_id, Inventory.application_id == application_id
@@ -81,6 +255,3 @@ class InventoryRepository(BaseRepository[Inventory, InventoryCreate, InventoryUp
         return (
             self.db.query(self.model).filter(self.model.application_id == app_id).all()
         )
-
-    def commit(self):
-        self.db.commit()
@@ -0,0 +1,143 @@
+import re
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Partition DDL locks the parent table; give up rather than queue every
+# reader and writer behind a long-running query, and retry on the next run
+LOCK_TIMEOUT = "5s"
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+_PARTITIONS_SQL = text(
+    """
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = CAST(:table AS regclass)
+    """
+)
+
+
+class Partition(NamedTuple):
+    name: str
+    # Exclusive; None for a partition without a time upper bound (MAXVALUE
+    # or DEFAULT), which retention never removes
+    upper_bound: Optional[datetime]
+    is_default: bool = False
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    month = moment.month - 1 + months
+    return moment.replace(year=moment.year + month // 12, month=month % 12 + 1)
+
+
+def upper_bound(bound: str) -> Optional[datetime]:
+    """The exclusive upper bound of a range partition's ``FOR VALUES`` clause."""
+    match = _UPPER_BOUND.search(bound)
+    if match is None:
+        return None
+    # Printed in the session time zone; partitions are named by UTC month
+    return datetime.fromisoformat(match.group(1)).astimezone(timezone.utc)
+
+
+class MonthlyPartitionRepository:
+    """Monthly range partitions of a table partitioned by ``created_at``.
+
+    Partitions are named ``<table>_pYYYY_MM`` and cover one UTC calendar
+    month each. Creating and removing a partition is a catalog change, so
+    both cost the same however many rows the month holds.
+
+    A DEFAULT partition, if the table has one, takes the rows of months
+    that have no partition yet instead of rejecting them. Retention never
+    removes it, so those rows stay until ``create_ahead`` moves them out.
+    """
+
+    def __init__(self, db: Session, table: str):
+        self.db = db
+        self.table = table
+
+    def get_partitions(self) -> List[Partition]:
+        rows = self.db.execute(_PARTITIONS_SQL, {"table": self.table})
+        return [
+            Partition(name, upper_bound(bound), bound == "DEFAULT")
+            for name, bound in rows
+        ]
+
+    def create_ahead(self, now: datetime, months_ahead: int) -> List[str]:
+        """Create the missing partitions through ``months_ahead`` months past now.
+
+        Creation starts where the existing partitions end, so ranges never
+        overlap. Without a DEFAULT partition no row can exist for a month
+        that has no partition, so a gap before the current month is skipped.
+        With one, the gap is filled and each new partition takes its month's
+        rows out of the DEFAULT partition.
+        """
+        partitions = self.get_partitions()
+        default = next((p.name for p in partitions if p.is_default), None)
+        current = month_start(now)
+        bounds = [p.upper_bound for p in partitions if p.upper_bound]
+        start = max(bounds) if default and bounds else max([current, *bounds])
+        end = add_months(current, months_ahead + 1)
+        created = []
+        while start < end:
+            stop = add_months(start, 1)
+            name = f"{self.table}_p{start:%Y_%m}"
+            values = (
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{stop.isoformat()}')"
+            )
+            if default is None:
+                self._locked(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" '
+                    f'PARTITION OF "{self.table}" {values}'
+                )
+            else:
+                # Creating a partition whose range has rows in the DEFAULT
+                # partition fails, so the rows move over before it is attached
+                self._locked(
+                    f'CREATE TABLE "{name}" (LIKE "{self.table}" INCLUDING DEFAULTS)',
+                    f'WITH moved AS (DELETE FROM "{default}" '
+                    f"WHERE created_at >= '{start.isoformat()}' "
+                    f"AND created_at < '{stop.isoformat()}' RETURNING *) "
+                    f'INSERT INTO "{name}" SELECT * FROM moved',
+                    f'ALTER TABLE "{self.table}" ATTACH PARTITION "{name}" {values}',
+                )
+            created.append(name)
+            start = stop
+        return created
+
+    def remove_before(self, cutoff: datetime, detach: bool = False) -> List[str]:
+        """Drop, or detach, every partition whose rows all predate ``cutoff``.
+
+        Detached partitions stay behind as plain tables for archiving.
+        """
+        removed = []
+        for partition in self.get_partitions():
+            if partition.upper_bound is None or partition.upper_bound > cutoff:
+                continue
+            if detach:
+                self._locked(
+                    f'ALTER TABLE "{self.table}" DETACH PARTITION "{partition.name}"'
+                )
+            else:
+                self._locked(f'DROP TABLE "{partition.name}"')
+            removed.append(partition.name)
+        return removed
+
+    def _locked(self, *statements: str) -> None:
+        # One transaction per partition, so a lock timeout loses only that one
+        try:
+            self.db.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            for statement in statements:
+                self.db.execute(text(statement))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
@@ -0,0 +1,31 @@
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import InstrumentedAttribute
+
+# pg_trgm indexes trigrams, so a substring shorter than this cannot be
+# narrowed by a trigram index and would scan the whole index instead
+TRIGRAM_MIN_LENGTH = 3
+
+_LIKE_ESCAPE = "\\"
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return (
+        term.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", _LIKE_ESCAPE + "%")
+        .replace("_", _LIKE_ESCAPE + "_")
+    )
+
+
+def text_search(column: InstrumentedAttribute, term: str) -> ColumnElement[bool]:
+    """Case-insensitive search on ``column`` that can use its trigram index.
+
+    Terms of at least ``TRIGRAM_MIN_LENGTH`` characters match anywhere in the
+    value. Shorter terms fall back to a prefix match, which the trigram index
+    still serves because the anchored start of the pattern yields trigrams.
+    """
+    term = term.strip()
+    pattern = escape_like(term)
+    if len(term) < TRIGRAM_MIN_LENGTH:
+        return column.ilike(f"{pattern}%", escape=_LIKE_ESCAPE)
+    return column.ilike(f"%{pattern}%", escape=_LIKE_ESCAPE)
@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.models import SeverityLevel
+from app.schemas.common import CountMode
 
 
 class ActivityLogBase(BaseModel):
@@ -40,7 +41,15 @@ class ActivityLogsListResponse(BaseModel):
         default_factory=list, description="Array of activity logs"
     )
     message: Optional[str] = Field(None, description="Status or information message")
-    total_count: int = Field(..., description="Total number of logs")
+    total_count: Optional[int] = Field(
+        None, description="Total number of logs, unless the count was skipped"
+    )
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page; absent on the last page"
+    )
+    count_mode: CountMode = Field(
+        CountMode.EXACT, description="How the total count was computed"
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,7 +1,9 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
+from app.schemas.common import CountMode
+
 
 class ApprovalStatus(str, Enum):
     PENDING = "pending"
@@ -51,4 +53,34 @@ class ApplicationListResponse(BaseModel):
     )
     message: Optional[str] = Field(None, description="Status or information message")
     total_count: int = Field(None, description="Total number of applications")
+    count_mode: CountMode = Field(
+        CountMode.EXACT, description="How the total count was computed"
+    )
     model_config = ConfigDict(from_attributes=True)
+
+
+class ApplicationDecisionResult(BaseModel):
+    application_id: str
+    # not_found also covers applications owned by another organization
+    status: Literal["updated", "not_found", "already_decided"]
+    application: Optional[ApplicationResponse] = None
+
+
+class BulkApplicationDecisionResponse(BaseModel):
+    results: List[ApplicationDecisionResult]
+    updated: int
+    not_found: int
+    already_decided: int
+
+
+class ApplicationPolicy(BaseModel):
+    """Approval decisions an agent can enforce locally.
+
+    Both lists are sorted so agents can binary-search them. A hash that is
+    denied under any application entry is listed as denied only.
+    """
+
+    version: str = Field(..., description="Content hash, also sent as the ETag")
+    organization_id: str
+    approved: List[str] = Field(default_factory=list)
+    denied: List[str] = Field(default_factory=list)
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import List, Optional
 
 from pydantic import BaseModel
@@ -11,3 +12,26 @@ class TokenData(BaseModel):
 
 class OrgData(BaseModel):
     org_id: str
+
+
+class CountMode(str, Enum):
+    """How list endpoints compute their total."""
+
+    EXACT = "exact"
+    # Planner row estimate from EXPLAIN; cheap but approximate
+    ESTIMATE = "estimate"
+    # Exact count reused for a short time per organization and filter set
+    CACHED = "cached"
+
+
+class IngestionMode(str, Enum):
+    """How agent ingestion endpoints persist a batch."""
+
+    SYNC = "sync"
+    # Queued durably and written to the database in the background
+    ASYNC = "async"
+
+
+class IngestionAccepted(BaseModel):
+    ingestion_id: str
+    accepted: int
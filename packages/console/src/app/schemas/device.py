@@ -1,10 +1,11 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 from functools import cached_property
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, computed_field
 
 from app.core.exceptions import ValidationException
+from app.schemas.common import CountMode
 
 
 class DeviceBase(BaseModel):
@@ -141,6 +142,7 @@ class DeviceListResponse(BaseModel):
     skip: int
     limit: int
     message: Optional[str] = None
+    count_mode: CountMode = CountMode.EXACT
 
 
 class StatusOption(BaseModel):
@@ -171,3 +173,29 @@ class DeviceProperties(BaseModel):
 
     class config:
         extra = "allow"
+
+
+# Upper bound on entries accepted by one bulk heartbeat request
+MAX_BULK_HEARTBEATS = 10000
+
+
+class DeviceHeartbeat(BaseModel):
+    device_id: str = Field(..., min_length=1)
+    properties: Optional[DeviceProperties] = None
+
+
+class BulkHeartbeatRequest(BaseModel):
+    heartbeats: List[DeviceHeartbeat] = Field(
+        ..., min_length=1, max_length=MAX_BULK_HEARTBEATS
+    )
+
+
+class DeviceHeartbeatResult(BaseModel):
+    device_id: str
+    status: Literal["updated", "not_found"]
+
+
+class BulkHeartbeatResponse(BaseModel):
+    results: List[DeviceHeartbeatResult]
+    updated: int
+    not_found: int
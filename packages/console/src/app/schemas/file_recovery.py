@@ -4,6 +4,7 @@ from typing import List, Optional, Union
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.file_recovery import RecoveryMethod, RecoveryStatus
+from app.schemas.common import CountMode
 
 
 class FileRecoveryBase(BaseModel):
@@ -46,6 +47,9 @@ class FileRecoveryListResponse(BaseModel):
     )
     message: Optional[str] = Field(None, description="Status or information message")
     total_count: int = Field(..., description="Total number of recoveries")
+    count_mode: CountMode = Field(
+        CountMode.EXACT, description="How the total count was computed"
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,8 +1,10 @@
 from datetime import datetime
+from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
+from app.schemas.common import CountMode
 from app.schemas.application import (
     Application,
     ApplicationBase,
@@ -61,3 +63,24 @@ class InventoryListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+    count_mode: CountMode = CountMode.EXACT
+
+
+class InventorySyncStatus(str, Enum):
+    UNCHANGED = "unchanged"
+    ITEMS_REQUIRED = "items_required"
+    UPDATED = "updated"
+
+
+class InventoryDiffSyncRequest(BaseModel):
+    digest: str = Field(..., pattern="^[0-9a-f]{64}$")
+    items: Optional[List[ApplicationBase]] = None
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class InventoryDiffSyncResponse(BaseModel):
+    status: InventorySyncStatus
+    digest: Optional[str] = None
+    added: List[InventoryResponse] = Field(default_factory=list)
+    removed_application_ids: List[str] = Field(default_factory=list)
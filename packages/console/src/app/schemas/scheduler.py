@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class JobStatus(BaseModel):
+    name: str
+    interval_seconds: float
+    jitter_seconds: float
+    is_leader: bool
+    running: bool
+    runs: int
+    failures: int
+    last_started_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class JobStatusListResponse(BaseModel):
+    jobs: List[JobStatus]
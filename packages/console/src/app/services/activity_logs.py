@@ -1,14 +1,36 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
 
 from app.models import ActivityLog
-from app.repositories.activity_logs import ActivityLogRepository
-from app.repositories.device import DeviceRepository
+from app.repositories.activity_logs import (
+    ActivityLogRepository,
+    AsyncActivityLogRepository,
+)
+from app.repositories.device import AsyncDeviceRepository, DeviceRepository
+from app.schemas.common import CountMode, IngestionAccepted
 from app.schemas.activity_logs import (
     ActivityLogCreate,
     ActivityLogResponse,
     ActivityLogsListResponse,
 )
-from app.validators.devices import DeviceValidator
+from app.services.ingestion_queue import IngestionQueue
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.validators.devices import AsyncDeviceValidator, DeviceValidator
+
+
+def _log_response(log: ActivityLog, device_name: Optional[str]) -> ActivityLogResponse:
+    return ActivityLogResponse(
+        id=log.id,
+        org_id=log.org_id,
+        device_id=log.device_id,
+        device_name=device_name,
+        activity_type=log.activity_type,
+        severity=log.severity,
+        details=log.details,
+        created_at=log.created_at,
+    )
 
 
 class ActivityLogService:
@@ -16,29 +38,30 @@ class ActivityLogService:
         self,
         activity_log_repository: ActivityLogRepository,
         device_repository: DeviceRepository,
+        queue: Optional[IngestionQueue] = None,
     ):
         self.repository = activity_log_repository
         self.validator = DeviceValidator(device_repository)
+        self.queue = queue
 
     def create_activity_logs(
         self, logs: List[ActivityLogCreate], org_id: str
     ) -> List[ActivityLogResponse]:
-        for log_data in logs:
-            self.validator.validate_device_access(log_data.device_id)
+        self.validator.validate_devices_access(
+            (log_data.device_id for log_data in logs), org_id
+        )
         created_logs = self.repository.create_activity_logs(logs, org_id)
-        return [
-            ActivityLogResponse(
-                id=log.id,
-                org_id=log.org_id,
-                device_id=log.device_id,
-                device_name=device_name,
-                activity_type=log.activity_type,
-                severity=log.severity,
-                details=log.details,
-                created_at=log.created_at,
-            )
-            for log, device_name in created_logs
-        ]
+        return [_log_response(log, device_name) for log, device_name in created_logs]
+
+    def enqueue_activity_logs(
+        self, logs: List[ActivityLogCreate], org_id: str
+    ) -> IngestionAccepted:
+        """Validate the batch and hand it to the ingestion queue."""
+        self.validator.validate_devices_access(
+            (log_data.device_id for log_data in logs), org_id
+        )
+        ingestion_id = self.queue.enqueue("activity_logs", org_id, logs)
+        return IngestionAccepted(ingestion_id=ingestion_id, accepted=len(logs))
 
     def get_activity_logs_with_filters(
         self,
@@ -48,6 +71,10 @@ class ActivityLogService:
         severity: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> ActivityLogsListResponse:
         logs, total_count = self.repository.get_activity_logs_by_filters(
             org_id=org_id,
@@ -56,25 +83,19 @@ class ActivityLogService:
             severity=severity,
             skip=skip,
             limit=limit,
+            cursor=decode_cursor(cursor) if cursor else None,
+            since=since,
+            include_total=include_total,
+            count_mode=count_mode,
         )
-        converted_logs = [
-            ActivityLogResponse(
-                id=log.id,
-                org_id=log.org_id,
-                device_id=log.device_id,
-                device_name=device_name,
-                activity_type=log.activity_type,
-                severity=log.severity,
-                details=log.details,
-                created_at=log.created_at,
-            )
-            for log, device_name in logs
-        ]
+        converted_logs = [_log_response(log, device_name) for log, device_name in logs]
 
         return ActivityLogsListResponse(
             logs=converted_logs,
             message="No activity logs found for the organization" if not logs else None,
             total_count=total_count,
+            next_cursor=self._next_cursor(logs, limit),
+            count_mode=count_mode,
         )
 
     def get_activity_logs_by_device(
@@ -85,32 +106,43 @@ class ActivityLogService:
         severity: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> ActivityLogsListResponse:
         logs, total_count = self.repository.get_activity_logs_by_device(
-            device_id, org_id, search=search, severity=severity, skip=skip, limit=limit
+            device_id,
+            org_id,
+            search=search,
+            severity=severity,
+            skip=skip,
+            limit=limit,
+            cursor=decode_cursor(cursor) if cursor else None,
+            since=since,
+            include_total=include_total,
+            count_mode=count_mode,
         )
 
-        converted_logs = [
-            ActivityLogResponse(
-                id=log.id,
-                org_id=log.org_id,
-                device_id=log.device_id,
-                device_name=device_name,
-                activity_type=log.activity_type,
-                severity=log.severity,
-                details=log.details,
-                created_at=log.created_at,
-            )
-            for log, device_name in logs
-        ]
+        converted_logs = [_log_response(log, device_name) for log, device_name in logs]
         return ActivityLogsListResponse(
             logs=converted_logs,
             message=(
                 f"No activity logs found for device {device_id}" if not logs else None
             ),
             total_count=total_count,
+            next_cursor=self._next_cursor(logs, limit),
+            count_mode=count_mode,
         )
 
+    @staticmethod
+    def _next_cursor(logs: List[Tuple[ActivityLog, str]], limit: int) -> Optional[str]:
+        # A short page is the last one
+        if not logs or len(logs) < limit:
+            return None
+        last_log, _ = logs[-1]
+        return encode_cursor(last_log.created_at, last_log.id)
+
     @staticmethod
     def _convert_to_response(activity_log: ActivityLog) -> ActivityLogResponse:
         return ActivityLogResponse(
@@ -122,3 +154,38 @@ class ActivityLogService:
             details=activity_log.details,
             created_at=activity_log.created_at,
         )
+
+
+class AsyncActivityLogService:
+    """The agent ingestion paths of ``ActivityLogService`` on an ``AsyncSession``."""
+
+    def __init__(
+        self,
+        activity_log_repository: AsyncActivityLogRepository,
+        device_repository: AsyncDeviceRepository,
+        queue: Optional[IngestionQueue] = None,
+    ):
+        self.repository = activity_log_repository
+        self.validator = AsyncDeviceValidator(device_repository)
+        self.queue = queue
+
+    async def create_activity_logs(
+        self, logs: List[ActivityLogCreate], org_id: str
+    ) -> List[ActivityLogResponse]:
+        await self.validator.validate_devices_access(
+            (log_data.device_id for log_data in logs), org_id
+        )
+        created_logs = await self.repository.create_activity_logs(logs, org_id)
+        return [_log_response(log, device_name) for log, device_name in created_logs]
+
+    async def enqueue_activity_logs(
+        self, logs: List[ActivityLogCreate], org_id: str
+    ) -> IngestionAccepted:
+        await self.validator.validate_devices_access(
+            (log_data.device_id for log_data in logs), org_id
+        )
+        # The enqueue waits for an fsync, which must not stall the event loop
+        ingestion_id = await run_in_threadpool(
+            self.queue.enqueue, "activity_logs", org_id, logs
+        )
+        return IngestionAccepted(ingestion_id=ingestion_id, accepted=len(logs))
@@ -7,18 +7,25 @@ from app.schemas.application import (
     ApplicationResponse,
     ApprovalStatus,
 )
+from app.services.application_catalog import ApplicationCatalog
 from app.services.base import BaseService
 from app.repositories.application import ApplicationRepository
 from app.schemas.application import ApplicationCreate
+from app.schemas.common import CountMode
 from typing import Optional
 
 
 class ApplicationService(
     BaseService[Application, ApplicationCreate, ApplicationCreate]
 ):
-    def __init__(self, repository: ApplicationRepository):
+    def __init__(
+        self,
+        repository: ApplicationRepository,
+        catalog: Optional[ApplicationCatalog] = None,
+    ):
         super().__init__(repository)
         self.repository = repository
+        self.catalog = catalog
 
     def get_by_org(
         self,
@@ -27,9 +34,15 @@ class ApplicationService(
         status: Optional[ApprovalStatus] = None,
         skip: int = 0,
         limit: int = 10000,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> ApplicationListResponse:
         applications, total_count = self.repository.get_by_org(
-            org_id=org_id, search=search, status=status, skip=skip, limit=limit
+            org_id=org_id,
+            search=search,
+            status=status,
+            skip=skip,
+            limit=limit,
+            count_mode=count_mode,
         )
         converted_applications = [
             ApplicationResponse(
@@ -51,6 +64,7 @@ class ApplicationService(
                 else None
             ),
             total_count=total_count,
+            count_mode=count_mode,
         )
 
     def create_application(self, app: ApplicationCreate) -> Application:
@@ -70,7 +84,11 @@ class ApplicationService(
             )
         app.id = str(uuid4())
 
-        return self.create(app)
+        application = self.create(app)
+        if self.catalog is not None:
+            catalog, org_id = self.catalog, app.organization_id
+            self.repository.after_commit(lambda: catalog.invalidate(org_id))
+        return application
 
     @staticmethod
     def convert_to_response(application: Application) -> ApplicationResponse:
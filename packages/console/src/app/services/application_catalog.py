@@ -0,0 +1,160 @@
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Protocol, Sequence
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+from app.models import ApprovalStatus
+from app.repositories.inventory import ApplicationKey
+
+
+class CatalogEntry(NamedTuple):
+    """The application fields the inventory paths need, without a session."""
+
+    id: str
+    name: str
+    version: str
+    publisher: str
+    hash: str
+    status: ApprovalStatus
+    organization_id: str
+
+    @classmethod
+    def from_application(cls, application: Any) -> "CatalogEntry":
+        return cls(
+            id=application.id,
+            name=application.name,
+            version=application.version,
+            publisher=application.publisher,
+            hash=application.hash,
+            status=application.status,
+            organization_id=application.organization_id,
+        )
+
+
+class GenerationStore(Protocol):
+    def get(self, org_id: str) -> int: ...
+
+    def bump(self, org_id: str) -> None: ...
+
+
+class LocalGenerationStore:
+    """Per-process generations; invalidations are not seen by other workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+
+    def get(self, org_id: str) -> int:
+        with self._lock:
+            return self._generations.get(org_id, 0)
+
+    def bump(self, org_id: str) -> None:
+        with self._lock:
+            self._generations[org_id] = self._generations.get(org_id, 0) + 1
+
+
+class SQLiteGenerationStore:
+    """Generations kept in a SQLite file shared by the workers on one host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def get(self, org_id: str) -> int:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT generation FROM catalog_generations WHERE org_id = ?",
+                    (org_id,),
+                )
+                .fetchone()
+            )
+        return row[0] if row else 0
+
+    def bump(self, org_id: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO catalog_generations (org_id, generation) VALUES (?, 1) "
+                "ON CONFLICT (org_id) DO UPDATE SET generation = generation + 1",
+                (org_id,),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS catalog_generations "
+                "(org_id TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+
+class ApplicationCatalog:
+    """Per-organization LRU of applications keyed by (name, version, hash).
+
+    Every approve, deny or create bumps the organization's generation, and
+    entries cached under an older generation are treated as misses. Callers
+    read the generation before reading the database and pass it back to
+    ``put_many``, so rows read before an invalidation are never cached
+    under the newer generation.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        generations: Optional[GenerationStore] = None,
+    ):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = generations or LocalGenerationStore()
+        self.invalidations = 0
+
+    def generation(self, org_id: str) -> int:
+        return self._generations.get(org_id)
+
+    def get_many(
+        self, org_id: str, generation: int, keys: Iterable[ApplicationKey]
+    ) -> Dict[ApplicationKey, CatalogEntry]:
+        found = {}
+        for key in keys:
+            cached = self._entries.get((org_id, key))
+            if cached is not None and cached[0] == generation:
+                found[key] = cached[1]
+        return found
+
+    def put_many(
+        self, org_id: str, generation: int, applications: Sequence[Any]
+    ) -> None:
+        if self._generations.get(org_id) != generation:
+            return
+        for application in applications:
+            entry = CatalogEntry.from_application(application)
+            key = (entry.name, entry.version, entry.hash)
+            self._entries.set((org_id, key), (generation, entry))
+
+    def invalidate(self, org_id: str) -> None:
+        self._generations.bump(org_id)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._entries.stats(), "invalidations": self.invalidations}
+
+
+application_catalog = ApplicationCatalog(
+    maxsize=settings.CONSOLE_APPLICATION_CATALOG_MAXSIZE,
+    ttl=settings.CONSOLE_APPLICATION_CATALOG_TTL_SECONDS,
+    generations=(
+        SQLiteGenerationStore(settings.CONSOLE_APPLICATION_CATALOG_SHARED_PATH)
+        if settings.CONSOLE_APPLICATION_CATALOG_SHARED_PATH
+        else None
+    ),
+)
+metrics.register_collector("application_catalog", application_catalog.stats)
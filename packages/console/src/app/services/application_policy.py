@@ -0,0 +1,94 @@
+import hashlib
+from typing import NamedTuple, Optional
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+from app.models import ApprovalStatus
+from app.repositories.application import ApplicationRepository
+from app.schemas.application import ApplicationPolicy
+from app.services.application_catalog import ApplicationCatalog
+
+
+class PolicyArtifact(NamedTuple):
+    generation: int
+    etag: str
+    body: bytes
+
+
+def policy_version(approved: list, denied: list) -> str:
+    """Hash of the decisions only, so rebuilding unchanged data keeps the ETag."""
+    digest = hashlib.sha256()
+    for prefix, hashes in (("A", approved), ("D", denied)):
+        for app_hash in hashes:
+            digest.update(f"{prefix}:{app_hash}\n".encode())
+    return digest.hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class ApplicationPolicyService:
+    """Builds the per-organization policy artifact agents enforce locally.
+
+    An artifact is rebuilt only when the organization's catalog generation
+    moved, which happens on every approve, deny and create. The generation is
+    read before the decisions are, so a decision committed mid-build leaves
+    the artifact under the older generation and the next request rebuilds it.
+    """
+
+    def __init__(
+        self,
+        repository: ApplicationRepository,
+        catalog: ApplicationCatalog,
+        cache: TTLCache,
+    ):
+        self.repository = repository
+        self.catalog = catalog
+        self.cache = cache
+
+    def get_policy(self, org_id: str) -> PolicyArtifact:
+        generation = self.catalog.generation(org_id)
+        cached = self.cache.get(org_id)
+        if cached is not None and cached.generation == generation:
+            return cached
+
+        with metrics.timer("application_policy.build"):
+            artifact = self._build(org_id, generation)
+        self.cache.set(org_id, artifact)
+        return artifact
+
+    def _build(self, org_id: str, generation: int) -> PolicyArtifact:
+        approved, denied = set(), set()
+        for app_hash, status in self.repository.get_decided_hashes(org_id):
+            if status == ApprovalStatus.DENIED:
+                denied.add(app_hash)
+            else:
+                approved.add(app_hash)
+        # A hash denied under any name or version is never allowed
+        approved = sorted(approved - denied)
+        denied = sorted(denied)
+
+        version = policy_version(approved, denied)
+        policy = ApplicationPolicy(
+            version=version,
+            organization_id=org_id,
+            approved=approved,
+            denied=denied,
+        )
+        return PolicyArtifact(
+            generation=generation,
+            etag=f'"{version}"',
+            body=policy.model_dump_json().encode(),
+        )
+
+
+application_policy_cache = TTLCache(
+    maxsize=settings.CONSOLE_APPLICATION_POLICY_CACHE_MAXSIZE,
+    ttl=settings.CONSOLE_APPLICATION_CATALOG_TTL_SECONDS,
+)
+metrics.register_collector("application_policy", application_policy_cache.stats)
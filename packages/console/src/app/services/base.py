@@ -1,6 +1,8 @@
-from typing import Generic, List, TypeVar
+from typing import Any, Awaitable, Callable, Generic, List, TypeVar
 
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.core.exceptions import DatabaseOperationException, ObjectNotFoundException
 from app.repositories.base import BaseRepository
@@ -9,6 +11,7 @@ from app.utils import error_utils
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+ServiceType = TypeVar("ServiceType")
 
 
 class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
@@ -66,3 +69,25 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 details={"id": id},
             )
         return db_obj
+
+
+class AsyncServiceAdapter(Generic[ServiceType]):
+    """Serve a sync service from an async route without a worker thread.
+
+    ``await adapter.method(...)`` builds the service around the async
+    session's sync ``Session`` and calls ``method`` through
+    ``AsyncSession.run_sync``: the service code stays as it is, while every
+    statement it issues is awaited on the async driver.
+    """
+
+    def __init__(self, db: AsyncSession, build: Callable[[Session], ServiceType]):
+        self._db = db
+        self._build = build
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._db.run_sync(
+                lambda session: getattr(self._build(session), name)(*args, **kwargs)
+            )
+
+        return call
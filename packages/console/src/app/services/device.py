@@ -1,19 +1,83 @@
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple, Union
+from typing import List, Optional, Set, Tuple, Union
 
 from fastapi.responses import JSONResponse
 
 from app.core.exceptions import DuplicateObjectException
 from app.models.device import Device
-from app.repositories.device import DeviceRepository
+from app.repositories.device import AsyncDeviceRepository, DeviceRepository, Heartbeats
 from app.repositories.endpoint_config import EndpointConfigRepository
-from app.schemas.device import DeviceCreate, DeviceInDB, DeviceTypes, DeviceUpdate
+from app.schemas.common import CountMode
+from app.schemas.device import (
+    BulkHeartbeatResponse,
+    DeviceCreate,
+    DeviceHeartbeat,
+    DeviceHeartbeatResult,
+    DeviceInDB,
+    DeviceTypes,
+    DeviceUpdate,
+)
 from app.schemas.endpoint_config import EndpointConfigCreate
 from app.services.endpoint_config_converter import DEFAULT_CONFIG
 
-from ..validators.devices import DeviceValidator
+from ..validators.devices import AsyncDeviceValidator, DeviceValidator
 from .base import BaseService
 from .endpoint_config import EndpointConfigService
+from .heartbeat_buffer import HeartbeatBuffer
+
+
+def _device_response(
+    device: Device, heartbeat_buffer: Optional[HeartbeatBuffer]
+) -> DeviceInDB:
+    device_data = {
+        "id": device.id,
+        "org_id": device.org_id,
+        "name": device.name,
+        "type": device.type,
+        "serial_number": device.serial_number,
+        "created_at": device.created_at,
+        "updated_at": device.updated_at,
+        "last_seen": device.last_seen,
+        "properties": device.properties or {},
+    }
+    # Serve live status from heartbeats that have not been flushed yet
+    pending = heartbeat_buffer.get(device.id) if heartbeat_buffer else None
+    if pending and (device.last_seen is None or pending.last_seen > device.last_seen):
+        device_data["last_seen"] = pending.last_seen
+        device_data["properties"] = pending.properties
+    return DeviceInDB(**device_data)
+
+
+def _heartbeats_by_device(
+    heartbeats: List[DeviceHeartbeat], seen_at: datetime
+) -> Heartbeats:
+    # Later entries for the same device win, as they would one at a time
+    return {
+        heartbeat.device_id: (
+            seen_at,
+            heartbeat.properties.model_dump() if heartbeat.properties else {},
+        )
+        for heartbeat in heartbeats
+    }
+
+
+def _bulk_heartbeat_response(
+    heartbeats_by_device: Heartbeats, updated_ids: Set[str]
+) -> BulkHeartbeatResponse:
+    # Devices that do not exist and devices of another organization are
+    # reported the same way, as the single-device endpoint does
+    results = [
+        DeviceHeartbeatResult(
+            device_id=device_id,
+            status="updated" if device_id in updated_ids else "not_found",
+        )
+        for device_id in heartbeats_by_device
+    ]
+    return BulkHeartbeatResponse(
+        results=results,
+        updated=len(updated_ids),
+        not_found=len(results) - len(updated_ids),
+    )
 
 
 class DeviceService(BaseService[Device, DeviceCreate, DeviceUpdate]):
@@ -21,31 +85,22 @@ class DeviceService(BaseService[Device, DeviceCreate, DeviceUpdate]):
         self,
         repository: DeviceRepository,
         endpoint_config_repository: EndpointConfigRepository,
+        heartbeat_buffer: Optional[HeartbeatBuffer] = None,
     ):
         super().__init__(repository)
         self.repository = repository
         self.validator = DeviceValidator(repository)
         self.endpoint_config_repository = endpoint_config_repository
         self.endpoint_config_service = EndpointConfigService(endpoint_config_repository)
+        # Set when heartbeats are written behind; see HeartbeatBuffer
+        self.heartbeat_buffer = heartbeat_buffer
 
     def _convert_to_response(
         self, device: Union[Device, List[Device]]
     ) -> Union[DeviceInDB, List[DeviceInDB]]:
         if isinstance(device, list):
             return [self._convert_to_response(d) for d in device]
-
-        device_data = {
-            "id": device.id,
-            "org_id": device.org_id,
-            "name": device.name,
-            "type": device.type,
-            "serial_number": device.serial_number,
-            "created_at": device.created_at,
-            "updated_at": device.updated_at,
-            "last_seen": device.last_seen,
-            "properties": device.properties or {},
-        }
-        return DeviceInDB(**device_data)
+        return _device_response(device, self.heartbeat_buffer)
 
     def create_device(self, device: DeviceCreate) -> Device:
         existing_device = self.repository.get_by_serial_number(
@@ -78,11 +133,9 @@ class DeviceService(BaseService[Device, DeviceCreate, DeviceUpdate]):
             serial_number=device.serial_number,
             properties=properties,
         )
-        new_device = self.repository.create(create_data)
-
-        # Update with last_seen and properties
-        update_data = DeviceUpdate(last_seen=current_time, properties=properties)
-        new_device = self.repository.update(new_device.id, update_data)
+        # One INSERT with last_seen set; the device and its endpoint config
+        # are committed together by the request's unit of work
+        new_device = self.repository.create(create_data, last_seen=current_time)
 
         endpoint_config = EndpointConfigCreate(
             id=str(new_device.id),
@@ -112,6 +165,7 @@ class DeviceService(BaseService[Device, DeviceCreate, DeviceUpdate]):
         health: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> Tuple[List[DeviceInDB], int]:
         devices, total = self.repository.get_devices_by_criteria(
             search_term=search,
@@ -120,6 +174,7 @@ class DeviceService(BaseService[Device, DeviceCreate, DeviceUpdate]):
             health=health,
             skip=skip,
             limit=limit,
+            count_mode=count_mode,
         )
         return self._convert_to_response(devices), total
 
@@ -161,6 +216,35 @@ class DeviceService(BaseService[Device, DeviceCreate, DeviceUpdate]):
         updated_device = self.repository.update(device_id, update_data)
         return self._convert_to_response(updated_device)
 
+    def record_heartbeat(self, device_id: str, properties: dict):
+        seen_at = datetime.now(timezone.utc)
+        if self.heartbeat_buffer is None:
+            return self.update_device(
+                device_id, DeviceUpdate(last_seen=seen_at, properties=properties)
+            )
+
+        device = self.validator.validate_device_access(device_id)
+        self.heartbeat_buffer.record(device.org_id, device_id, seen_at, properties)
+        return self._convert_to_response(device)
+
+    def bulk_update_heartbeats(
+        self, org_id: str, heartbeats: List[DeviceHeartbeat]
+    ) -> BulkHeartbeatResponse:
+        seen_at = datetime.now(timezone.utc)
+        heartbeats_by_device = _heartbeats_by_device(heartbeats, seen_at)
+        if self.heartbeat_buffer is None:
+            updated_ids = set(
+                self.repository.bulk_update_heartbeats(org_id, heartbeats_by_device)
+            )
+        else:
+            updated_ids = set(
+                self.repository.get_owned_device_ids(org_id, list(heartbeats_by_device))
+            )
+            for device_id in updated_ids:
+                _, properties = heartbeats_by_device[device_id]
+                self.heartbeat_buffer.record(org_id, device_id, seen_at, properties)
+        return _bulk_heartbeat_response(heartbeats_by_device, updated_ids)
+
     def delete_device(self, device_id: str) -> Device:
         self.validator.validate_device_access(device_id)
         device = self.repository.delete(device_id)
@@ -174,3 +258,50 @@ class DeviceService(BaseService[Device, DeviceCreate, DeviceUpdate]):
                 "data": None,
             },
         )
+
+
+class AsyncDeviceService:
+    """The agent heartbeat paths of ``DeviceService`` on an ``AsyncSession``."""
+
+    def __init__(
+        self,
+        repository: AsyncDeviceRepository,
+        heartbeat_buffer: Optional[HeartbeatBuffer] = None,
+    ):
+        self.repository = repository
+        self.validator = AsyncDeviceValidator(repository)
+        self.heartbeat_buffer = heartbeat_buffer
+
+    async def record_heartbeat(self, device_id: str, properties: dict) -> DeviceInDB:
+        seen_at = datetime.now(timezone.utc)
+        device = await self.validator.validate_device_access(device_id)
+        if self.heartbeat_buffer is None:
+            # The device is in the session already, so this costs one UPDATE
+            device = await self.repository.update(
+                device_id, DeviceUpdate(last_seen=seen_at, properties=properties)
+            )
+        else:
+            self.heartbeat_buffer.record(device.org_id, device_id, seen_at, properties)
+        return _device_response(device, self.heartbeat_buffer)
+
+    async def bulk_update_heartbeats(
+        self, org_id: str, heartbeats: List[DeviceHeartbeat]
+    ) -> BulkHeartbeatResponse:
+        seen_at = datetime.now(timezone.utc)
+        heartbeats_by_device = _heartbeats_by_device(heartbeats, seen_at)
+        if self.heartbeat_buffer is None:
+            updated_ids = set(
+                await self.repository.bulk_update_heartbeats(
+                    org_id, heartbeats_by_device
+                )
+            )
+        else:
+            updated_ids = set(
+                await self.repository.get_owned_device_ids(
+                    org_id, list(heartbeats_by_device)
+                )
+            )
+            for device_id in updated_ids:
+                _, properties = heartbeats_by_device[device_id]
+                self.heartbeat_buffer.record(org_id, device_id, seen_at, properties)
+        return _bulk_heartbeat_response(heartbeats_by_device, updated_ids)
@@ -1,16 +1,40 @@
 from typing import List, Optional
 
+from starlette.concurrency import run_in_threadpool
+
 from app.core.exceptions import NotFoundException
 from app.models.file_recovery import FileRecovery
-from app.repositories.device import DeviceRepository
-from app.repositories.file_recovery import FileRecoveryRepository
+from app.repositories.device import AsyncDeviceRepository, DeviceRepository
+from app.repositories.file_recovery import (
+    AsyncFileRecoveryRepository,
+    FileRecoveryRepository,
+)
+from app.schemas.common import CountMode, IngestionAccepted
 from app.schemas.file_recovery import (
     FileRecoveryCreate,
     FileRecoveryListResponse,
     FileRecoveryResponse,
     FileRecoveryUpdate,
 )
-from app.validators.devices import DeviceValidator
+from app.services.ingestion_queue import IngestionQueue
+from app.validators.devices import AsyncDeviceValidator, DeviceValidator
+
+
+def _recovery_response(
+    recovery: FileRecovery, device_name: Optional[str]
+) -> FileRecoveryResponse:
+    return FileRecoveryResponse(
+        id=recovery.id,
+        org_id=recovery.org_id,
+        device_id=recovery.device_id,
+        device_name=device_name,
+        file_name=recovery.file_name,
+        status=recovery.status,
+        recovery_method=recovery.recovery_method,
+        file_size=recovery.file_size,
+        created_at=recovery.created_at,
+        updated_at=recovery.updated_at,
+    )
 
 
 class FileRecoveryService:
@@ -18,35 +42,39 @@ class FileRecoveryService:
         self,
         file_recovery_repository: FileRecoveryRepository,
         device_repository: DeviceRepository,
+        queue: Optional[IngestionQueue] = None,
     ):
         self.repository = file_recovery_repository
         self.validator = DeviceValidator(device_repository)
+        self.queue = queue
 
     def create_file_recovery(
         self, recoveries_data: List[FileRecoveryCreate], org_id: str
     ) -> List[FileRecoveryResponse]:
-        for recovery_data in recoveries_data:
-            self.validator.validate_device_access(recovery_data.device_id)
+        self.validator.validate_devices_access(
+            (recovery_data.device_id for recovery_data in recoveries_data), org_id
+        )
         recoveries_with_names = self.repository.create_file_recoveries(
             recoveries_data, org_id
         )
 
         return [
-            FileRecoveryResponse(
-                id=recovery.id,
-                org_id=recovery.org_id,
-                device_id=recovery.device_id,
-                device_name=device_name,
-                file_name=recovery.file_name,
-                status=recovery.status,
-                recovery_method=recovery.recovery_method,
-                file_size=recovery.file_size,
-                created_at=recovery.created_at,
-                updated_at=recovery.updated_at,
-            )
+            _recovery_response(recovery, device_name)
             for recovery, device_name in recoveries_with_names
         ]
 
+    def enqueue_file_recoveries(
+        self, recoveries_data: List[FileRecoveryCreate], org_id: str
+    ) -> IngestionAccepted:
+        """Validate the batch and hand it to the ingestion queue."""
+        self.validator.validate_devices_access(
+            (recovery_data.device_id for recovery_data in recoveries_data), org_id
+        )
+        ingestion_id = self.queue.enqueue("file_recoveries", org_id, recoveries_data)
+        return IngestionAccepted(
+            ingestion_id=ingestion_id, accepted=len(recoveries_data)
+        )
+
     def get_file_recovery_by_device(
         self,
         device_id: str,
@@ -66,18 +94,7 @@ class FileRecoveryService:
         )
 
         converted_recoveries = [
-            FileRecoveryResponse(
-                id=recovery.id,
-                org_id=recovery.org_id,
-                device_id=recovery.device_id,
-                device_name=device_name,
-                file_name=recovery.file_name,
-                status=recovery.status,
-                recovery_method=recovery.recovery_method,
-                file_size=recovery.file_size,
-                created_at=recovery.created_at,
-                updated_at=recovery.updated_at,
-            )
+            _recovery_response(recovery, device_name)
             for recovery, device_name in recoveries_data
         ]
 
@@ -99,6 +116,7 @@ class FileRecoveryService:
         status: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> FileRecoveryListResponse:
         recoveries, total_count = self.repository.get_file_recoveries_by_filters(
             org_id=org_id,
@@ -107,20 +125,10 @@ class FileRecoveryService:
             status=status,
             skip=skip,
             limit=limit,
+            count_mode=count_mode,
         )
         converted_recoveries = [
-            FileRecoveryResponse(
-                id=recovery.id,
-                org_id=recovery.org_id,
-                device_id=recovery.device_id,
-                device_name=device_name,
-                file_name=recovery.file_name,
-                status=recovery.status,
-                recovery_method=recovery.recovery_method,
-                file_size=recovery.file_size,
-                created_at=recovery.created_at,
-                updated_at=recovery.updated_at,
-            )
+            _recovery_response(recovery, device_name)
             for recovery, device_name in recoveries
         ]
 
@@ -130,6 +138,7 @@ class FileRecoveryService:
                 "No recoveries found for the organization" if not recoveries else None
             ),
             total_count=total_count,
+            count_mode=count_mode,
         )
 
     def update_file_recovery(
@@ -161,3 +170,45 @@ class FileRecoveryService:
             created_at=file_recovery.created_at,
             updated_at=file_recovery.updated_at,
         )
+
+
+class AsyncFileRecoveryService:
+    """The agent ingestion paths of ``FileRecoveryService`` on an ``AsyncSession``."""
+
+    def __init__(
+        self,
+        file_recovery_repository: AsyncFileRecoveryRepository,
+        device_repository: AsyncDeviceRepository,
+        queue: Optional[IngestionQueue] = None,
+    ):
+        self.repository = file_recovery_repository
+        self.validator = AsyncDeviceValidator(device_repository)
+        self.queue = queue
+
+    async def create_file_recovery(
+        self, recoveries_data: List[FileRecoveryCreate], org_id: str
+    ) -> List[FileRecoveryResponse]:
+        await self.validator.validate_devices_access(
+            (recovery_data.device_id for recovery_data in recoveries_data), org_id
+        )
+        recoveries_with_names = await self.repository.create_file_recoveries(
+            recoveries_data, org_id
+        )
+        return [
+            _recovery_response(recovery, device_name)
+            for recovery, device_name in recoveries_with_names
+        ]
+
+    async def enqueue_file_recoveries(
+        self, recoveries_data: List[FileRecoveryCreate], org_id: str
+    ) -> IngestionAccepted:
+        await self.validator.validate_devices_access(
+            (recovery_data.device_id for recovery_data in recoveries_data), org_id
+        )
+        # The enqueue waits for an fsync, which must not stall the event loop
+        ingestion_id = await run_in_threadpool(
+            self.queue.enqueue, "file_recoveries", org_id, recoveries_data
+        )
+        return IngestionAccepted(
+            ingestion_id=ingestion_id, accepted=len(recoveries_data)
+        )
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.repositories.device import DeviceRepository
+
+logger = logging.getLogger(__name__)
+
+
+class PendingHeartbeat(NamedTuple):
+    org_id: str
+    last_seen: datetime
+    properties: Dict[str, Any]
+
+
+class HeartbeatBuffer:
+    """Write-behind buffer holding the latest heartbeat per device.
+
+    Heartbeats are coalesced in memory and written to Postgres in bulk by
+    ``flush``, so the write rate follows the number of devices rather than
+    the number of heartbeats. The buffer is per process: with several
+    workers, each flushes only the heartbeats it received.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._pending: Dict[str, PendingHeartbeat] = {}
+        self._flush_lock = threading.Lock()
+
+    def record(
+        self,
+        org_id: str,
+        device_id: str,
+        last_seen: datetime,
+        properties: Dict[str, Any],
+    ) -> None:
+        with self._lock:
+            self._pending[device_id] = PendingHeartbeat(org_id, last_seen, properties)
+
+    def get(self, device_id: str) -> Optional[PendingHeartbeat]:
+        with self._lock:
+            return self._pending.get(device_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending heartbeats; returns the number of devices written."""
+        # Serialise flushes so an older batch never lands after a newer one
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            by_org: Dict[str, Dict[str, tuple]] = defaultdict(dict)
+            for device_id, heartbeat in batch.items():
+                by_org[heartbeat.org_id][device_id] = (
+                    heartbeat.last_seen,
+                    heartbeat.properties,
+                )
+
+            started = time.perf_counter()
+            db = self._session_factory()
+            try:
+                repository = DeviceRepository(db)
+                for org_id, heartbeats in by_org.items():
+                    repository.bulk_update_heartbeats(org_id, heartbeats)
+            except Exception:
+                db.rollback()
+                self._requeue(batch)
+                metrics.increment("heartbeat_buffer.flush_failures")
+                raise
+            finally:
+                db.close()
+
+            metrics.increment("heartbeat_buffer.flushes")
+            metrics.increment("heartbeat_buffer.flushed_devices", len(batch))
+            logger.debug(
+                "Flushed %d heartbeats in %.3fs",
+                len(batch),
+                time.perf_counter() - started,
+            )
+            return len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self)}
+
+    def _requeue(self, batch: Dict[str, PendingHeartbeat]) -> None:
+        # Keep anything that arrived during the failed flush; it is newer
+        with self._lock:
+            for device_id, heartbeat in batch.items():
+                self._pending.setdefault(device_id, heartbeat)
+
+
+async def run_heartbeat_flusher(buffer: HeartbeatBuffer, interval: float) -> None:
+    """Flush ``buffer`` every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(buffer.flush)
+        except Exception:
+            logger.exception("Heartbeat flush failed; will retry next interval")
+
+
+heartbeat_buffer = HeartbeatBuffer()
+metrics.register_collector("heartbeat_buffer", heartbeat_buffer.stats)
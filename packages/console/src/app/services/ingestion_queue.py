@@ -0,0 +1,301 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Type
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.database import SessionLocal
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import metrics
+from app.repositories.activity_logs import ActivityLogRepository
+from app.repositories.file_recovery import FileRecoveryRepository
+from app.schemas.activity_logs import ActivityLogCreate
+from app.schemas.file_recovery import FileRecoveryCreate
+
+logger = logging.getLogger(__name__)
+
+# A batch that keeps failing is parked instead of blocking the queue forever
+MAX_ATTEMPTS = 5
+
+
+class IngestionKind(NamedTuple):
+    schema: Type[BaseModel]
+    write: Callable[[Session, List[Any], str], Any]
+
+
+INGESTION_KINDS: Dict[str, IngestionKind] = {
+    "activity_logs": IngestionKind(
+        ActivityLogCreate,
+        lambda db, items, org_id: ActivityLogRepository(db).create_activity_logs(
+            items, org_id
+        ),
+    ),
+    "file_recoveries": IngestionKind(
+        FileRecoveryCreate,
+        lambda db, items, org_id: FileRecoveryRepository(db).create_file_recoveries(
+            items, org_id
+        ),
+    ),
+}
+
+
+class ClaimedRequest(NamedTuple):
+    seq: int
+    kind: str
+    org_id: str
+    items: List[Any]
+
+
+class IngestionQueue:
+    """Durable queue of validated ingestion requests in a local SQLite file.
+
+    ``enqueue`` appends one row per request and returns once it is on disk,
+    so the agent's latency no longer depends on Postgres. ``drain`` claims
+    the oldest requests up to ``batch_size`` items, writes them to Postgres
+    grouped by kind and organization, and deletes them afterwards. Delivery
+    is at least once: a crash between the Postgres commit and the delete
+    replays that batch.
+
+    Claims carry a lease, so several workers can share one file and a batch
+    claimed by a worker that died is picked up again once the lease expires.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_depth: int,
+        batch_size: int,
+        claim_timeout: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.path = path
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.claim_timeout = claim_timeout
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def enqueue(self, kind: str, org_id: str, items: Sequence[BaseModel]) -> str:
+        """Persist a request and return its ingestion id."""
+        if kind not in INGESTION_KINDS:
+            raise ValueError(f"Unknown ingestion kind: {kind}")
+        payload = json.dumps([item.model_dump(mode="json") for item in items])
+        ingestion_id = str(uuid.uuid4())
+        with self._lock:
+            db = self._connect()
+            depth = db.execute(
+                "SELECT COALESCE(SUM(item_count), 0) FROM ingestion_queue "
+                "WHERE attempts < ?",
+                (MAX_ATTEMPTS,),
+            ).fetchone()[0]
+            if depth + len(items) > self.max_depth:
+                metrics.increment("ingestion_queue.rejected")
+                raise ServiceUnavailableException(
+                    message="Ingestion queue is full, retry later",
+                    error_code="INGESTION_QUEUE_FULL",
+                    details={"depth": depth, "max_depth": self.max_depth},
+                )
+            db.execute(
+                "INSERT INTO ingestion_queue "
+                "(ingestion_id, kind, org_id, payload, item_count, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (ingestion_id, kind, org_id, payload, len(items), time.time()),
+            )
+        metrics.increment("ingestion_queue.enqueued", len(items))
+        return ingestion_id
+
+    def drain(self) -> int:
+        """Write one batch to Postgres; returns the number of items written."""
+        claimed = self._claim()
+        if not claimed:
+            return 0
+
+        groups: Dict[tuple, List[ClaimedRequest]] = defaultdict(list)
+        for request in claimed:
+            groups[(request.kind, request.org_id)].append(request)
+
+        written = 0
+        done, failed = [], []
+        db = self._session_factory()
+        try:
+            for (kind, org_id), requests in groups.items():
+                if self._write(db, kind, org_id, requests):
+                    done.extend(request.seq for request in requests)
+                    written += sum(len(request.items) for request in requests)
+                    continue
+                # Retry one by one so a single bad request does not hold back
+                # the rest of its organization's batch
+                for request in requests:
+                    if len(requests) > 1 and self._write(db, kind, org_id, [request]):
+                        done.append(request.seq)
+                        written += len(request.items)
+                    else:
+                        failed.append(request.seq)
+        finally:
+            db.close()
+
+        self._settle(done, failed)
+        metrics.increment("ingestion_queue.drained", written)
+        if failed:
+            metrics.increment("ingestion_queue.drain_failures")
+        return written
+
+    @staticmethod
+    def _write(
+        db: Session, kind: str, org_id: str, requests: List[ClaimedRequest]
+    ) -> bool:
+        items = [item for request in requests for item in request.items]
+        try:
+            with metrics.timer("ingestion_queue.write"):
+                INGESTION_KINDS[kind].write(db, items, org_id)
+        except Exception:
+            db.rollback()
+            logger.exception(
+                "Writing %d queued %s for org %s failed", len(items), kind, org_id
+            )
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth, requests, oldest, parked = (
+                self._connect()
+                .execute(
+                    "SELECT "
+                    "COALESCE(SUM(CASE WHEN attempts < :max THEN item_count END), 0), "
+                    "COUNT(CASE WHEN attempts < :max THEN 1 END), "
+                    "MIN(CASE WHEN attempts < :max THEN enqueued_at END), "
+                    "COUNT(CASE WHEN attempts >= :max THEN 1 END) "
+                    "FROM ingestion_queue",
+                    {"max": MAX_ATTEMPTS},
+                )
+                .fetchone()
+            )
+        return {
+            "depth": depth,
+            "requests": requests,
+            "lag_seconds": time.time() - oldest if oldest else 0.0,
+            "parked_requests": parked,
+        }
+
+    def _claim(self) -> List[ClaimedRequest]:
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            # IMMEDIATE takes the write lock up front so two workers cannot
+            # select the same rows before either marks them as claimed
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = db.execute(
+                    "SELECT seq, kind, org_id, payload, item_count "
+                    "FROM ingestion_queue "
+                    "WHERE attempts < ? AND (claimed_at IS NULL OR claimed_at < ?) "
+                    "ORDER BY seq",
+                    (MAX_ATTEMPTS, now - self.claim_timeout),
+                )
+                claimed, unreadable, total = [], [], 0
+                for seq, kind, org_id, payload, item_count in rows:
+                    if claimed and total + item_count > self.batch_size:
+                        break
+                    try:
+                        schema = INGESTION_KINDS[kind].schema
+                        items = [
+                            schema.model_validate(item) for item in json.loads(payload)
+                        ]
+                    except (KeyError, TypeError, ValueError):
+                        # Retrying cannot fix the stored payload, so park it at
+                        # once rather than fail every claim until it is removed
+                        logger.exception(
+                            "Parking unreadable queued request %d (%s)", seq, kind
+                        )
+                        unreadable.append(seq)
+                        continue
+                    claimed.append(ClaimedRequest(seq, kind, org_id, items))
+                    total += item_count
+                db.executemany(
+                    "UPDATE ingestion_queue SET claimed_at = ? WHERE seq = ?",
+                    [(now, request.seq) for request in claimed],
+                )
+                db.executemany(
+                    "UPDATE ingestion_queue SET attempts = ? WHERE seq = ?",
+                    [(MAX_ATTEMPTS, seq) for seq in unreadable],
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        if unreadable:
+            metrics.increment("ingestion_queue.unreadable", len(unreadable))
+        return claimed
+
+    def _settle(self, done: List[int], failed: List[int]) -> None:
+        with self._lock:
+            db = self._connect()
+            db.executemany(
+                "DELETE FROM ingestion_queue WHERE seq = ?", [(seq,) for seq in done]
+            )
+            db.executemany(
+                "UPDATE ingestion_queue SET claimed_at = NULL, attempts = attempts + 1 "
+                "WHERE seq = ?",
+                [(seq,) for seq in failed],
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Acknowledged requests must survive a power loss, not just a crash
+            connection.execute("PRAGMA synchronous=FULL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS ingestion_queue ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "ingestion_id TEXT NOT NULL, "
+                "kind TEXT NOT NULL, "
+                "org_id TEXT NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "item_count INTEGER NOT NULL, "
+                "enqueued_at REAL NOT NULL, "
+                "claimed_at REAL, "
+                "attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._connection = connection
+        return self._connection
+
+
+async def run_ingestion_drainer(queue: IngestionQueue, interval: float) -> None:
+    """Drain ``queue`` until cancelled, pausing ``interval`` seconds when idle.
+
+    Batches are written one at a time, so however deep the queue gets the
+    database sees at most one ingestion transaction per worker.
+    """
+    while True:
+        try:
+            written = await run_in_threadpool(queue.drain)
+        except Exception:
+            logger.exception("Ingestion drain failed; will retry next interval")
+            written = 0
+        if not written:
+            await asyncio.sleep(interval)
+
+
+ingestion_queue: Optional[IngestionQueue] = None
+if settings.CONSOLE_INGESTION_QUEUE_PATH:
+    ingestion_queue = IngestionQueue(
+        settings.CONSOLE_INGESTION_QUEUE_PATH,
+        max_depth=settings.CONSOLE_INGESTION_QUEUE_MAX_DEPTH,
+        batch_size=settings.CONSOLE_INGESTION_DRAIN_BATCH_SIZE,
+        claim_timeout=settings.CONSOLE_INGESTION_CLAIM_TIMEOUT_SECONDS,
+    )
+    metrics.register_collector("ingestion_queue", ingestion_queue.stats)
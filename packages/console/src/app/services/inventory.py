@@ -1,6 +1,5 @@
 from datetime import datetime
-from typing import Dict, List
-from uuid import uuid4
+from typing import Dict, List, Union
 
 from app.core.context import get_org_id
 from app.core.exceptions import (
@@ -10,18 +9,31 @@ from app.core.exceptions import (
     ValidationException,
 )
 from app.core.logging import logger
+from app.core.metrics import metrics
 from app.models import ApprovalStatus, Device, Inventory
 from app.repositories.application import ApplicationRepository
 from app.repositories.device import DeviceRepository
-from app.repositories.inventory import InventoryRepository
-from app.schemas.application import Application, ApplicationResponse
+from app.repositories.inventory import ApplicationKey, InventoryRepository
+from app.schemas.application import (
+    Application,
+    ApplicationBase,
+    ApplicationDecisionResult,
+    ApplicationResponse,
+    BulkApplicationDecisionResponse,
+)
+from app.schemas.common import CountMode
 from app.schemas.inventory import (
     InventoryCreate,
+    InventoryDiffSyncRequest,
+    InventoryDiffSyncResponse,
     InventoryListResponse,
     InventoryResponse,
+    InventorySyncStatus,
     InventoryUpdate,
 )
 from app.services.application import ApplicationService
+from app.services.application_catalog import ApplicationCatalog, CatalogEntry
+from app.utils.inventory_digest import inventory_digest
 from typing import Optional
 
 
@@ -31,10 +43,12 @@ class InventoryService:
         inventory_repository: InventoryRepository,
         device_repository: DeviceRepository,
         application_repository: ApplicationRepository,
+        catalog: Optional[ApplicationCatalog] = None,
     ):
         self.inventory_repository = inventory_repository
         self.device_repository = device_repository
         self.application_repository = application_repository
+        self.catalog = catalog
 
     def _validate_inventory_access(self, inventory_id: str) -> Inventory:
         inventory_item = self.inventory_repository.get(inventory_id)
@@ -96,10 +110,11 @@ class InventoryService:
         limit: int = 100,
         search: str = None,
         status: Optional[ApprovalStatus] = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> List[InventoryResponse]:
         self._validate_device_access(device_id)
         inventory_items, total = self.inventory_repository.get_device_inventory(
-            device_id, skip, limit, search, status
+            device_id, skip, limit, search, status, count_mode=count_mode
         )
 
         if not inventory_items and len(inventory_items) == 0:
@@ -108,53 +123,109 @@ class InventoryService:
             )
         inventory = [self._convert_to_response(item) for item in inventory_items]
         return InventoryListResponse(
-            inventory=inventory, total=total, skip=skip, limit=limit
+            inventory=inventory,
+            total=total,
+            skip=skip,
+            limit=limit,
+            count_mode=count_mode,
         )
 
+    def _resolve_applications(
+        self, org_id: str, items: List[ApplicationBase]
+    ) -> List[Union[Application, CatalogEntry]]:
+        """Return the organization's application for each distinct item.
+
+        Applications come from the catalog cache when it has them. The rest
+        are read in one query and any still unknown are inserted in one
+        statement, so the cost does not grow with round trips per item.
+        """
+        requested: Dict[ApplicationKey, ApplicationBase] = {}
+        for item in items:
+            requested.setdefault((item.name, item.version, item.hash), item)
+        if not requested:
+            return []
+
+        applications: Dict[ApplicationKey, Union[Application, CatalogEntry]] = {}
+        generation = None
+        if self.catalog is not None:
+            generation = self.catalog.generation(org_id)
+            applications.update(self.catalog.get_many(org_id, generation, requested))
+        unknown = [key for key in requested if key not in applications]
+        if unknown:
+            self._add_committed_applications(
+                org_id,
+                generation,
+                applications,
+                self.inventory_repository.get_applications_by_keys(org_id, unknown),
+            )
+        missing = [item for key, item in requested.items() if key not in applications]
+        if missing:
+            # Not cached until a later request reads them back once committed
+            for app in self.inventory_repository.insert_applications(org_id, missing):
+                applications[(app.name, app.version, app.hash)] = app
+            # Another request may have inserted some of them first
+            raced = [key for key in requested if key not in applications]
+            if raced:
+                self._add_committed_applications(
+                    org_id,
+                    generation,
+                    applications,
+                    self.inventory_repository.get_applications_by_keys(org_id, raced),
+                )
+        return [applications[key] for key in requested]
+
+    def _add_committed_applications(
+        self,
+        org_id: str,
+        generation: Optional[int],
+        applications: Dict[ApplicationKey, Union[Application, CatalogEntry]],
+        found: List[Application],
+    ) -> None:
+        for app in found:
+            applications[(app.name, app.version, app.hash)] = app
+        if self.catalog is not None and found:
+            self.catalog.put_many(org_id, generation, found)
+
+    def _invalidate_catalog(self, org_id: str) -> None:
+        # Only once committed, or another worker could cache the old status
+        # under the new generation
+        if self.catalog is not None:
+            catalog = self.catalog
+            self.inventory_repository.after_commit(lambda: catalog.invalidate(org_id))
+
     def create_inventory(
         self, device_id: str, inventory: InventoryCreate
     ) -> List[InventoryResponse]:
-        new_items = []
-        existing_items = []
-
         # validate and load device
         device = self._validate_device_access(device_id)
 
-        for application in inventory.items:
-            app = self.inventory_repository.get_application_by_details(
-                application.name, application.version, device.org_id, application.hash
-            )
-            if not app:
-                app = Application(
-                    name=application.name,
-                    version=application.version,
-                    hash=application.hash,
-                    publisher=application.publisher,
-                    organization_id=device.org_id,
-                    id=str(uuid4()),
-                )
-                app = self.inventory_repository.create_application(
-                    app.model_dump(),
-                )
-
-            inventories = self.inventory_repository.get_device_inventory_by_application(
-                device_id=device_id, app_id=app.id
+        applications = self._resolve_applications(device.org_id, inventory.items)
+        existing_items = (
+            self.inventory_repository.get_device_inventory_for_applications(
+                device_id, [app.id for app in applications]
             )
-            if inventories and len(inventories) > 0:
-                logger.warn(
-                    f"Inventory item already exists for device {device_id} and application {app.id}"
-                )
-                existing_items.append(inventories[0])
-                continue
-
-            new_item = self.inventory_repository.create_inventory_item(
-                device_id, app.id, app.status
+        )
+        if existing_items:
+            logger.warning(
+                f"{len(existing_items)} inventory items already exist for device {device_id}"
             )
-            new_items.append(new_item)
+        present = {item.application_id for item in existing_items}
+        new_items = self.inventory_repository.insert_inventory_items(
+            device_id, [app for app in applications if app.id not in present]
+        )
+        if new_items:
+            self.device_repository.set_inventory_digest(device_id, None)
 
         self.inventory_repository.commit()
-        return [self._convert_to_response(item) for item in new_items] + [
-            self._convert_to_response(item, isExisted=True) for item in existing_items
+        by_id = {app.id: app for app in applications}
+        return [
+            self._convert_to_response(item, application=by_id.get(item.application_id))
+            for item in new_items
+        ] + [
+            self._convert_to_response(
+                item, isExisted=True, application=by_id.get(item.application_id)
+            )
+            for item in existing_items
         ]
 
     def update_inventory(
@@ -163,27 +234,85 @@ class InventoryService:
         # validate and load device
         device = self._validate_device_access(device_id)
 
-        # Remove applications
-        for app_id in inventory_update.removed_app_ids:
-            self.inventory_repository.remove_inventory_item(device_id, app_id)
-
-        # Add new applications
-        for app in inventory_update.added_apps:
-            db_app = self.inventory_repository.get_application_by_details(
-                app.name, app.version, device.org_id
+        if inventory_update.removed_app_ids:
+            self.inventory_repository.remove_inventory_items(
+                device_id, inventory_update.removed_app_ids
             )
-            if not db_app:
-                db_app = self.inventory_repository.create_application(
-                    {**app.model_dump(), "organization_id": device.org_id}
-                )
 
-            self.inventory_repository.create_inventory_item(device_id, db_app.id)
+        applications = self._resolve_applications(
+            device.org_id, inventory_update.added_apps
+        )
+        self.inventory_repository.insert_inventory_items(device_id, applications)
+        self.device_repository.set_inventory_digest(device_id, None)
 
         self.inventory_repository.commit()
         return self.get_device_inventory(device_id)
 
+    def diff_sync_inventory(
+        self, device_id: str, sync_request: InventoryDiffSyncRequest
+    ) -> InventoryDiffSyncResponse:
+        """Reconcile the device inventory against the agent's digest.
+
+        A matching digest answers from the device row alone. Otherwise the
+        agent is asked for its items, and once they arrive only the
+        difference from the stored inventory is written.
+        """
+        device = self._validate_device_access(device_id)
+        if device.inventory_digest == sync_request.digest:
+            metrics.increment("inventory.diff_sync.unchanged")
+            return InventoryDiffSyncResponse(
+                status=InventorySyncStatus.UNCHANGED, digest=device.inventory_digest
+            )
+        if sync_request.items is None:
+            metrics.increment("inventory.diff_sync.items_required")
+            return InventoryDiffSyncResponse(
+                status=InventorySyncStatus.ITEMS_REQUIRED,
+                digest=device.inventory_digest,
+            )
+
+        requested: Dict[ApplicationKey, ApplicationBase] = {}
+        for item in sync_request.items:
+            requested.setdefault((item.name, item.version, item.hash), item)
+        if inventory_digest(requested) != sync_request.digest:
+            raise ValidationException(
+                message="Inventory digest does not match the reported items",
+                error_code="INVENTORY_DIGEST_MISMATCH",
+                details={"device_id": device_id},
+            )
+
+        current = self.inventory_repository.get_device_application_keys(device_id)
+        removed_ids = [
+            app_id for key, app_id in current.items() if key not in requested
+        ]
+        if removed_ids:
+            self.inventory_repository.remove_inventory_items(device_id, removed_ids)
+        applications = self._resolve_applications(
+            device.org_id,
+            [item for key, item in requested.items() if key not in current],
+        )
+        new_items = self.inventory_repository.insert_inventory_items(
+            device_id, applications
+        )
+        self.device_repository.set_inventory_digest(device_id, sync_request.digest)
+
+        self.inventory_repository.commit()
+        metrics.increment("inventory.diff_sync.updated")
+        by_id = {app.id: app for app in applications}
+        return InventoryDiffSyncResponse(
+            status=InventorySyncStatus.UPDATED,
+            digest=sync_request.digest,
+            added=[
+                self._convert_to_response(
+                    item, application=by_id.get(item.application_id)
+                )
+                for item in new_items
+            ],
+            removed_application_ids=removed_ids,
+        )
+
     def delete_inventory_item(self, inventory_id: str) -> Dict[str, str]:
-        self._validate_inventory_access(inventory_id)
+        inventory_item = self._validate_inventory_access(inventory_id)
+        self.device_repository.set_inventory_digest(inventory_item.device_id, None)
         deleted = self.inventory_repository.delete(inventory_id)
         if not deleted:
             raise ObjectNotFoundException(
@@ -205,6 +334,7 @@ class InventoryService:
                 item.approved_at = datetime.now()
 
         self.inventory_repository.commit()
+        self._invalidate_catalog(application.organization_id)
 
         return ApplicationService.convert_to_response(application)
 
@@ -225,29 +355,106 @@ class InventoryService:
                 item.denied_at = datetime.now()
 
         self.inventory_repository.commit()
+        self._invalidate_catalog(application.organization_id)
         return ApplicationService.convert_to_response(application)
 
     def approve_applications(
         self, application_ids: List[str]
-    ) -> List[ApplicationResponse]:
-        approved_applications = []
-        for app_id in application_ids:
-            approved_app = self.approve_application(app_id)
-            approved_applications.append(approved_app)
-        return approved_applications
+    ) -> BulkApplicationDecisionResponse:
+        return self._decide_applications(
+            application_ids,
+            ApprovalStatus.APPROVED,
+            inventory_from=[ApprovalStatus.PENDING],
+        )
 
     def deny_applications(
         self, application_ids: List[str]
-    ) -> List[ApplicationResponse]:
-        denied_applications = []
-        for app_id in application_ids:
-            denied_app = self.deny_application(app_id)
-            denied_applications.append(denied_app)
-        return denied_applications
+    ) -> BulkApplicationDecisionResponse:
+        return self._decide_applications(
+            application_ids,
+            ApprovalStatus.DENIED,
+            inventory_from=[ApprovalStatus.PENDING, ApprovalStatus.APPROVED],
+        )
+
+    def _decide_applications(
+        self,
+        application_ids: List[str],
+        status: ApprovalStatus,
+        inventory_from: List[ApprovalStatus],
+    ) -> BulkApplicationDecisionResponse:
+        """Approve or deny many applications in a single transaction.
+
+        Ownership and state are checked in one locking query. Only pending
+        applications are decided, with one UPDATE for the applications and
+        one for their inventory rows.
+        """
+        org_id = get_org_id()
+        if not org_id:
+            raise UnauthorizedException(
+                "platformadmin cannot access the application approve api"
+            )
+
+        requested = list(dict.fromkeys(application_ids))
+        statuses = self.application_repository.lock_statuses(org_id, requested)
+        pending = [
+            app_id
+            for app_id in requested
+            if statuses.get(app_id) == ApprovalStatus.PENDING
+        ]
+        decided = {}
+        if pending:
+            decided = {
+                application.id: application
+                for application in self.application_repository.set_status(
+                    pending, status
+                )
+            }
+            self.inventory_repository.set_status_for_applications(
+                pending, inventory_from, status
+            )
+        self.inventory_repository.commit()
+        if decided:
+            self._invalidate_catalog(org_id)
+
+        results = []
+        for app_id in requested:
+            if app_id in decided:
+                results.append(
+                    ApplicationDecisionResult(
+                        application_id=app_id,
+                        status="updated",
+                        application=ApplicationService.convert_to_response(
+                            decided[app_id]
+                        ),
+                    )
+                )
+            elif app_id in statuses:
+                results.append(
+                    ApplicationDecisionResult(
+                        application_id=app_id, status="already_decided"
+                    )
+                )
+            else:
+                results.append(
+                    ApplicationDecisionResult(application_id=app_id, status="not_found")
+                )
+        return BulkApplicationDecisionResponse(
+            results=results,
+            updated=len(decided),
+            not_found=sum(result.status == "not_found" for result in results),
+            already_decided=sum(
+                result.status == "already_decided" for result in results
+            ),
+        )
 
     def _convert_to_response(
-        self, inventory: Inventory, isExisted: bool = False
+        self,
+        inventory: Inventory,
+        isExisted: bool = False,
+        application: Optional[Union[Application, CatalogEntry]] = None,
     ) -> InventoryResponse:
+        # A known application avoids lazily loading the relationship per item
+        application = application or inventory.application
         return InventoryResponse(
             id=inventory.id,
             device_id=inventory.device_id,
@@ -258,15 +465,15 @@ class InventoryService:
             last_updated=inventory.last_updated,
             application=(
                 ApplicationResponse(
-                    id=inventory.application.id,
-                    name=inventory.application.name,
-                    version=inventory.application.version,
-                    publisher=inventory.application.publisher,
-                    hash=inventory.application.hash,
-                    status=inventory.application.status,
-                    organization_id=inventory.application.organization_id,
+                    id=application.id,
+                    name=application.name,
+                    version=application.version,
+                    publisher=application.publisher,
+                    hash=application.hash,
+                    status=application.status,
+                    organization_id=application.organization_id,
                 )
-                if inventory.application
+                if application
                 else None
             ),
             message=(
@@ -0,0 +1,15 @@
+import hashlib
+from typing import Iterable, Tuple
+
+FIELD_SEPARATOR = "\x1f"
+
+
+def inventory_digest(keys: Iterable[Tuple[str, str, str]]) -> str:
+    """Order-independent fingerprint of an installed application set.
+
+    Agents compute the same value: the hex SHA-256 of the distinct
+    ``name``, ``version`` and ``hash`` triples, each joined with the ASCII
+    unit separator (0x1F), sorted, and joined with newlines as UTF-8.
+    """
+    lines = sorted({FIELD_SEPARATOR.join(key) for key in keys})
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
@@ -0,0 +1,26 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+from app.core.exceptions import ValidationException
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Opaque keyset cursor pointing just past the row ``(created_at, id)``."""
+    payload = json.dumps({"created_at": created_at.isoformat(), "id": id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["created_at"]), str(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValidationException(
+            message="Invalid pagination cursor",
+            error_code="INVALID_CURSOR",
+            details={"cursor": cursor},
+        )
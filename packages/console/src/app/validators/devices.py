@@ -1,30 +1,81 @@
 import logging
+from typing import Iterable, Optional, Set
 
 from app.core.context import get_org_id
-from app.core.exceptions import NotFoundException
-from app.repositories.device import DeviceRepository
+from app.core.exceptions import BatchDeviceValidationException, NotFoundException
+from app.models.device import Device
+from app.repositories.device import AsyncDeviceRepository, DeviceRepository
 
 logger = logging.getLogger(__name__)
 
 
+def _check_device_access(device_id: str, device: Optional[Device]) -> Device:
+    if not device:
+        logger.warning(f"Attempt to access non-existent device: {device_id}")
+        raise NotFoundException(
+            message=f"Device not found with the given ID {device_id}"
+        )
+    org_id = get_org_id()
+    if device.org_id != get_org_id():
+        logger.warning(
+            f"Unauthorized device access attempt: Device {device_id}, Org {org_id}"
+        )
+        raise NotFoundException(
+            message=f"You do not have permission to access this device {device_id}"
+        )
+    logger.info(f"Authorized access to device {device_id} by org {org_id}")
+    return device
+
+
+def _check_devices_access(requested: Set[str], owned: Set[str], org_id: str) -> None:
+    invalid = requested - owned
+    if invalid:
+        logger.warning(
+            f"Rejected batch for org {org_id}: {len(invalid)} of "
+            f"{len(requested)} devices not found or not owned"
+        )
+        raise BatchDeviceValidationException(invalid, org_id)
+
+
 class DeviceValidator:
     def __init__(self, device_repository: DeviceRepository):
         self.device_repository = device_repository
 
     def validate_device_access(self, device_id: str):
-        device = self.device_repository.get(device_id)
-        if not device:
-            logger.warning(f"Attempt to access non-existent device: {device_id}")
-            raise NotFoundException(
-                message=f"Device not found with the given ID {device_id}"
-            )
-        org_id = get_org_id()
-        if device.org_id != get_org_id():
-            logger.warning(
-                f"Unauthorized device access attempt: Device {device_id}, Org {org_id}"
-            )
-            raise NotFoundException(
-                message=f"You do not have permission to access this device {device_id}"
-            )
-        logger.info(f"Authorized access to device {device_id} by org {org_id}")
-        return device
+        return _check_device_access(device_id, self.device_repository.get(device_id))
+
+    def validate_devices_access(
+        self, device_ids: Iterable[str], org_id: Optional[str] = None
+    ) -> None:
+        """Check a whole batch with one query and report every failing id.
+
+        Devices that do not exist and devices of another organization are
+        reported together, as the single-device check does.
+        """
+        org_id = org_id or get_org_id()
+        requested = set(device_ids)
+        owned = set(
+            self.device_repository.get_owned_device_ids(org_id, list(requested))
+        )
+        _check_devices_access(requested, owned, org_id)
+
+
+class AsyncDeviceValidator:
+    """``DeviceValidator`` over an ``AsyncDeviceRepository``."""
+
+    def __init__(self, device_repository: AsyncDeviceRepository):
+        self.device_repository = device_repository
+
+    async def validate_device_access(self, device_id: str) -> Device:
+        device = await self.device_repository.get(device_id)
+        return _check_device_access(device_id, device)
+
+    async def validate_devices_access(
+        self, device_ids: Iterable[str], org_id: Optional[str] = None
+    ) -> None:
+        org_id = org_id or get_org_id()
+        requested = set(device_ids)
+        owned = set(
+            await self.device_repository.get_owned_device_ids(org_id, list(requested))
+        )
+        _check_devices_access(requested, owned, org_id)
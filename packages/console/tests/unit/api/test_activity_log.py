@@ -1,18 +1,25 @@
 from app.schemas.common import OrgData
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, ANY
+from unittest.mock import AsyncMock, Mock, ANY, patch
 
 from app.main import app
 from app.core.auth import get_org_from_api_key, jwt_required
 from app.models import SeverityLevel
+from app.schemas.common import CountMode, IngestionAccepted
 from app.schemas.activity_logs import (
     ActivityLogCreate,
     ActivityLogResponse,
     ActivityLogsListResponse,
 )
-from app.api.v1.endpoints.activity_log import get_activity_log_service
+from app.api.v1.endpoints.activity_log import (
+    create_activity_log_partitions,
+    expire_activity_log_partitions,
+    get_activity_log_read_service,
+    get_activity_log_service,
+    get_async_activity_log_service,
+)
 
 client = TestClient(app)
 API_PREFIX = "console/v1.0"
@@ -26,6 +33,12 @@ def override_dependencies(mock_activity_log_service):
     app.dependency_overrides[get_activity_log_service] = (
         lambda: mock_activity_log_service
     )
+    app.dependency_overrides[get_activity_log_read_service] = (
+        lambda: mock_activity_log_service
+    )
+    app.dependency_overrides[get_async_activity_log_service] = (
+        lambda: mock_activity_log_service
+    )
     app.dependency_overrides[get_org_from_api_key] = lambda: OrgData(org_id=TEST_ORG_ID)
     app.dependency_overrides[jwt_required] = lambda: TEST_ORG_ID
     yield
@@ -34,7 +47,11 @@ def override_dependencies(mock_activity_log_service):
 
 @pytest.fixture
 def mock_activity_log_service():
-    return Mock()
+    service = Mock()
+    # Awaited by the agent ingestion route
+    service.create_activity_logs = AsyncMock()
+    service.enqueue_activity_logs = AsyncMock()
+    return service
 
 
 @pytest.fixture
@@ -98,6 +115,45 @@ def test_create_activity_log(
     )
 
 
+def test_create_activity_log_async_mode_returns_202(
+    mock_activity_log_service, sample_activity_log_create
+):
+    mock_activity_log_service.enqueue_activity_logs.return_value = IngestionAccepted(
+        ingestion_id="ingestion123", accepted=1
+    )
+
+    response = client.post(
+        f"{API_PREFIX}/activity-logs?mode=async",
+        json=[sample_activity_log_create.model_dump()],
+        headers={"Authorization": f"Bearer {ORG_KEY}"},
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"ingestion_id": "ingestion123", "accepted": 1}
+    mock_activity_log_service.enqueue_activity_logs.assert_called_once_with(
+        [ANY], TEST_ORG_ID
+    )
+    mock_activity_log_service.create_activity_logs.assert_not_called()
+
+
+def test_create_activity_log_async_mode_without_queue_is_synchronous(
+    mock_activity_log_service, sample_activity_log, sample_activity_log_create
+):
+    mock_activity_log_service.queue = None
+    mock_activity_log_service.create_activity_logs.return_value = [
+        ActivityLogResponse(**sample_activity_log)
+    ]
+
+    response = client.post(
+        f"{API_PREFIX}/activity-logs?mode=async",
+        json=[sample_activity_log_create.model_dump()],
+        headers={"Authorization": f"Bearer {ORG_KEY}"},
+    )
+
+    assert response.status_code == 200
+    mock_activity_log_service.enqueue_activity_logs.assert_not_called()
+
+
 def test_create_activity_log_invalid_data(mock_activity_log_service):
     invalid_data = [
         {"device_id": "", "activity_type": "TEST"}
@@ -139,6 +195,10 @@ def test_list_activity_logs(mock_activity_log_service, sample_activity_log):
         severity=None,
         skip=0,
         limit=100,
+        cursor=None,
+        since=None,
+        include_total=True,
+        count_mode=CountMode.EXACT,
     )
 
 
@@ -166,6 +226,10 @@ def test_list_activity_logs_with_search(mock_activity_log_service, sample_activi
         severity="MEDIUM",
         skip=0,
         limit=100,
+        cursor=None,
+        since=None,
+        include_total=True,
+        count_mode=CountMode.EXACT,
     )
 
 
@@ -186,5 +250,71 @@ def test_get_activity_logs_by_device_with_filters(
     assert response.json()["total_count"] == 1
     assert len(response.json()["logs"]) == 1
     mock_activity_log_service.get_activity_logs_by_device.assert_called_once_with(
-        "device123", TEST_ORG_ID, search="test", severity="MEDIUM", skip=10, limit=50
+        "device123",
+        TEST_ORG_ID,
+        search="test",
+        severity="MEDIUM",
+        skip=10,
+        limit=50,
+        cursor=None,
+        since=None,
+        include_total=True,
+        count_mode=CountMode.EXACT,
+    )
+
+
+def test_list_activity_logs_since_limits_the_window(mock_activity_log_service):
+    mock_activity_log_service.get_activity_logs_with_filters.return_value = (
+        ActivityLogsListResponse(logs=[], total_count=0)
+    )
+
+    response = client.get(
+        f"{API_PREFIX}/activity-logs?since=2026-10-01T00:00:00Z",
+        headers={"Authorization": f"Bearer {TEST_ORG_ID}"},
     )
+
+    assert response.status_code == 200
+    _, kwargs = mock_activity_log_service.get_activity_logs_with_filters.call_args
+    assert kwargs["since"] == datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def test_create_activity_log_partitions_records_metrics():
+    with patch(
+        "app.api.v1.endpoints.activity_log.SessionLocal"
+    ) as session_local, patch(
+        "app.api.v1.endpoints.activity_log.MonthlyPartitionRepository"
+    ) as repository, patch(
+        "app.api.v1.endpoints.activity_log.metrics"
+    ) as metrics:
+        repository.return_value.create_ahead.return_value = ["activity_logs_p2027_01"]
+
+        assert create_activity_log_partitions() == 1
+
+    repository.assert_called_once_with(session_local.return_value, "activity_logs")
+    session_local.return_value.close.assert_called_once()
+    metrics.increment.assert_called_once_with("activity_logs.partitions_created", 1)
+
+
+def test_expire_activity_log_partitions_uses_retention_settings():
+    with patch(
+        "app.api.v1.endpoints.activity_log.SessionLocal"
+    ) as session_local, patch(
+        "app.api.v1.endpoints.activity_log.MonthlyPartitionRepository"
+    ) as repository, patch(
+        "app.api.v1.endpoints.activity_log.settings"
+    ) as settings, patch(
+        "app.api.v1.endpoints.activity_log.metrics"
+    ) as metrics:
+        settings.CONSOLE_ACTIVITY_LOG_RETENTION_DAYS = 90
+        settings.CONSOLE_ACTIVITY_LOG_RETENTION_DETACH = True
+        repository.return_value.remove_before.return_value = ["activity_logs_legacy"]
+        before = datetime.now(timezone.utc)
+
+        assert expire_activity_log_partitions() == 1
+
+    (cutoff,), kwargs = repository.return_value.remove_before.call_args
+    retention = timedelta(days=90)
+    assert before - retention <= cutoff <= datetime.now(timezone.utc) - retention
+    assert kwargs == {"detach": True}
+    session_local.return_value.close.assert_called_once()
+    metrics.increment.assert_called_once_with("activity_logs.partitions_expired", 1)
@@ -1,17 +1,23 @@
 from datetime import datetime, timedelta, timezone
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.api.v1.endpoints.devices import get_device_service
+from app.api.v1.endpoints.devices import (
+    get_async_device_service,
+    get_device_read_service,
+    get_device_service,
+    sweep_offline_devices,
+)
 from app.core.context import set_org_id
+from app.schemas.common import CountMode
 from app.main import app
 
 # from app.repositories.device import DeviceRepository
 from app.schemas.device import DeviceCreate, DeviceInDB, DeviceUpdate
 from app.schemas.endpoint_config import EndpointConfigCreate
-from app.services.device import DeviceService
+from app.services.device import AsyncDeviceService, DeviceService
 from app.services.endpoint_config_converter import DEFAULT_CONFIG
 
 # Setup test client
@@ -47,6 +53,7 @@ def override_get_device_service(
     configured_mock_device_repository,
     mock_device_validator,
     mock_endpoint_config_repository,
+    mock_async_device_repository,
 ):
     def get_service():
         service = DeviceService(
@@ -56,6 +63,10 @@ def override_get_device_service(
         return service
 
     app.dependency_overrides[get_device_service] = get_service
+    app.dependency_overrides[get_device_read_service] = get_service
+    app.dependency_overrides[get_async_device_service] = lambda: AsyncDeviceService(
+        mock_async_device_repository
+    )
     yield
     app.dependency_overrides.clear()
 
@@ -103,7 +114,9 @@ def test_create_device(
     print(response.json())
     assert response.status_code == 200
     assert response.json()["name"] == device_create.name
-    configured_mock_device_repository.create.assert_called_once_with(device_create)
+    configured_mock_device_repository.create.assert_called_once_with(
+        device_create, last_seen=ANY
+    )
     mock_endpoint_config_repository.create.assert_called_once()
     called_config = mock_endpoint_config_repository.create.call_args[0][0]
     assert isinstance(called_config, EndpointConfigCreate)
@@ -178,7 +191,7 @@ def test_update_device(configured_mock_device_repository):
     )
 
 
-def test_device_heartbeat(mock_device_repository):
+def test_device_heartbeat(mock_async_device_repository):
     # Arrange
     device_id = "1"
     device_properties = {
@@ -198,7 +211,7 @@ def test_device_heartbeat(mock_device_repository):
         "last_suspicious_extension": "",
         "suspicious_extension_count": 0,
     }
-    mock_device_repository.get.return_value = DeviceInDB(
+    mock_async_device_repository.get.return_value = DeviceInDB(
         id=device_id,
         name="Test Device",
         type="Test",
@@ -219,7 +232,7 @@ def test_device_heartbeat(mock_device_repository):
         last_seen=datetime.now(timezone.utc),
         properties=device_properties,
     )
-    mock_device_repository.update.return_value = updated_device
+    mock_async_device_repository.update.return_value = updated_device
     set_org_id("org1")
 
     # Act
@@ -233,8 +246,8 @@ def test_device_heartbeat(mock_device_repository):
     assert response.status_code == 200
     assert "last_seen" in response.json()
     assert response.json()["properties"] == device_properties
-    mock_device_repository.update.assert_called_once()
-    args, kwargs = mock_device_repository.update.call_args
+    mock_async_device_repository.update.assert_called_once()
+    args, kwargs = mock_async_device_repository.update.call_args
     assert args[0] == device_id
     assert isinstance(args[1], DeviceUpdate)
     assert args[1].last_seen is not None
@@ -355,6 +368,7 @@ def test_read_devices_by_org(mock_device_repository):
         health=health.upper(),
         skip=skip,
         limit=limit,
+        count_mode=CountMode.EXACT,
     )
 
 
@@ -438,3 +452,73 @@ def test_read_devices_by_org_with_filters(mock_device_repository):
         assert "devices" in response.json()
         assert "total" in response.json()
         mock_device_repository.get_devices_by_criteria.assert_called()
+
+
+def test_bulk_device_heartbeats(mock_async_device_repository):
+    # Arrange
+    mock_async_device_repository.bulk_update_heartbeats.return_value = ["1"]
+
+    # Act
+    response = client.post(
+        "console/v1.0/devices/heartbeats",
+        headers={"X-Org-Key": "org1"},
+        json={
+            "heartbeats": [
+                {"device_id": "1", "properties": {"cpu": 0.3}},
+                {"device_id": "2"},
+            ]
+        },
+    )
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"device_id": "1", "status": "updated"},
+            {"device_id": "2", "status": "not_found"},
+        ],
+        "updated": 1,
+        "not_found": 1,
+    }
+    org_id, heartbeats = mock_async_device_repository.bulk_update_heartbeats.call_args[
+        0
+    ]
+    assert org_id == "org1"
+    assert heartbeats["1"][1]["cpu"] == 0.3
+
+
+def test_bulk_device_heartbeats_rejects_empty_batch():
+    response = client.post(
+        "console/v1.0/devices/heartbeats",
+        headers={"X-Org-Key": "org1"},
+        json={"heartbeats": []},
+    )
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_INPUT"
+
+
+def test_sweep_offline_devices_records_metrics():
+    with patch("app.api.v1.endpoints.devices.SessionLocal") as session_local, patch(
+        "app.api.v1.endpoints.devices.DeviceRepository"
+    ) as repository, patch("app.api.v1.endpoints.devices.metrics") as metrics:
+        repository.return_value.update_device_status.return_value = 3
+
+        assert sweep_offline_devices() == 3
+
+    session_local.return_value.close.assert_called_once()
+    metrics.timer.assert_called_once_with("devices.offline_sweep")
+    metrics.increment.assert_called_once_with("devices.marked_offline", 3)
+
+
+def test_read_devices_by_org_reports_count_mode(mock_device_repository):
+    mock_device_repository.get_devices_by_criteria.return_value = ([], 0)
+
+    response = client.get(
+        "console/v1.0/devices/?count_mode=estimate",
+        headers={"Authorization": "Bearer org1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["count_mode"] == "estimate"
+    kwargs = mock_device_repository.get_devices_by_criteria.call_args.kwargs
+    assert kwargs["count_mode"] == CountMode.ESTIMATE
@@ -1,10 +1,15 @@
 from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from fastapi.testclient import TestClient
 
 from app.api.v1.endpoints.inventory import (
+    get_agent_inventory_service,
+    get_application_policy_service,
+    get_application_read_service,
     get_application_service,
+    get_inventory_read_service,
     get_inventory_service,
 )
 from app.core.auth import get_org_from_api_key
@@ -17,13 +22,21 @@ from app.schemas.application import (
     ApplicationResponse,
     ApplicationListResponse,
     ApprovalStatus,
+    ApplicationDecisionResult,
+    BulkApplicationDecisionResponse,
 )
+from app.schemas.common import OrgData
 from app.schemas.inventory import (
     InventoryCreate,
+    InventoryDiffSyncRequest,
+    InventoryDiffSyncResponse,
     InventoryListResponse,
     InventoryResponse,
+    InventorySyncStatus,
     InventoryUpdate,
 )
+from app.services.application_policy import PolicyArtifact
+from app.services.base import AsyncServiceAdapter
 
 client = TestClient(app)
 
@@ -31,10 +44,25 @@ API_PREFIX = "/console/v1.0"
 ORG_KEY = "test_org_key"
 
 
+def adapted(service):
+    # Stands in for AsyncSession.run_sync, which passes the call a sync Session
+    db = Mock(run_sync=AsyncMock(side_effect=lambda call: call(Mock())))
+    return AsyncServiceAdapter(db, lambda session: service)
+
+
 @pytest.fixture(autouse=True)
 def override_dependencies(mock_inventory_service, mock_application_service):
     app.dependency_overrides[get_inventory_service] = lambda: mock_inventory_service
+    app.dependency_overrides[get_inventory_read_service] = (
+        lambda: mock_inventory_service
+    )
+    app.dependency_overrides[get_agent_inventory_service] = lambda: adapted(
+        mock_inventory_service
+    )
     app.dependency_overrides[get_application_service] = lambda: mock_application_service
+    app.dependency_overrides[get_application_read_service] = (
+        lambda: mock_application_service
+    )
     app.dependency_overrides[get_org_from_api_key] = lambda: ORG_KEY
     yield
     app.dependency_overrides.clear()
@@ -386,20 +414,26 @@ def test_deny_application(mock_inventory_service, sample_application):
 
 
 def test_bulk_approve_applications(mock_inventory_service, sample_application):
-    application_ids = ["app_1", "app_2"]
-    mock_responses = [
-        ApplicationResponse(
-            **{**sample_application.model_dump(), "status": ApprovalStatus.APPROVED}
-        ),
-        ApplicationResponse(
-            **{
-                **sample_application.model_dump(),
-                "id": "app_2",
-                "status": ApprovalStatus.APPROVED,
-            }
-        ),
-    ]
-    mock_inventory_service.approve_applications.return_value = mock_responses
+    application_ids = ["app_123", "app_2"]
+    mock_response = BulkApplicationDecisionResponse(
+        results=[
+            ApplicationDecisionResult(
+                application_id="app_123",
+                status="updated",
+                application=ApplicationResponse(
+                    **{
+                        **sample_application.model_dump(),
+                        "status": ApprovalStatus.APPROVED,
+                    }
+                ),
+            ),
+            ApplicationDecisionResult(application_id="app_2", status="not_found"),
+        ],
+        updated=1,
+        not_found=1,
+        already_decided=0,
+    )
+    mock_inventory_service.approve_applications.return_value = mock_response
 
     response = client.post(
         f"{API_PREFIX}/applications/bulk-approve",
@@ -408,25 +442,22 @@ def test_bulk_approve_applications(mock_inventory_service, sample_application):
     )
 
     assert response.status_code == 200
-    assert response.json() == [resp.model_dump(mode="json") for resp in mock_responses]
+    assert response.json() == mock_response.model_dump(mode="json")
     mock_inventory_service.approve_applications.assert_called_once_with(application_ids)
 
 
 def test_bulk_deny_applications(mock_inventory_service, sample_application):
     application_ids = ["app_1", "app_2"]
-    mock_responses = [
-        ApplicationResponse(
-            **{**sample_application.model_dump(), "status": ApprovalStatus.APPROVED}
-        ),
-        ApplicationResponse(
-            **{
-                **sample_application.model_dump(),
-                "id": "app_2",
-                "status": ApprovalStatus.APPROVED,
-            }
-        ),
-    ]
-    mock_inventory_service.deny_applications.return_value = mock_responses
+    mock_response = BulkApplicationDecisionResponse(
+        results=[
+            ApplicationDecisionResult(application_id="app_1", status="already_decided"),
+            ApplicationDecisionResult(application_id="app_2", status="not_found"),
+        ],
+        updated=0,
+        not_found=1,
+        already_decided=1,
+    )
+    mock_inventory_service.deny_applications.return_value = mock_response
 
     response = client.post(
         f"{API_PREFIX}/applications/bulk-deny",
@@ -435,5 +466,67 @@ def test_bulk_deny_applications(mock_inventory_service, sample_application):
     )
 
     assert response.status_code == 200
-    assert response.json() == [resp.model_dump(mode="json") for resp in mock_responses]
+    assert response.json()["already_decided"] == 1
     mock_inventory_service.deny_applications.assert_called_once_with(application_ids)
+
+
+def test_diff_sync_device_inventory(mock_inventory_service):
+    device_id = "device_123"
+    digest = "a" * 64
+    mock_inventory_service.diff_sync_inventory.return_value = InventoryDiffSyncResponse(
+        status=InventorySyncStatus.UNCHANGED, digest=digest
+    )
+
+    response = client.post(
+        f"{API_PREFIX}/devices/{device_id}/inventory/diff-sync",
+        json={"digest": digest},
+        headers={"X-Org-Key": ORG_KEY},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "unchanged",
+        "digest": digest,
+        "added": [],
+        "removed_application_ids": [],
+    }
+    mock_inventory_service.diff_sync_inventory.assert_called_once_with(
+        device_id, InventoryDiffSyncRequest(digest=digest)
+    )
+
+
+def test_diff_sync_device_inventory_rejects_malformed_digest(mock_inventory_service):
+    response = client.post(
+        f"{API_PREFIX}/devices/device_123/inventory/diff-sync",
+        json={"digest": "not-a-digest"},
+        headers={"X-Org-Key": ORG_KEY},
+    )
+
+    assert response.status_code == 400
+    mock_inventory_service.diff_sync_inventory.assert_not_called()
+
+
+def test_get_application_policy_honours_if_none_match():
+    policy_service = Mock()
+    policy_service.get_policy.return_value = PolicyArtifact(
+        generation=0, etag='"v1"', body=b'{"version": "v1"}'
+    )
+    app.dependency_overrides[get_application_policy_service] = lambda: adapted(
+        policy_service
+    )
+    app.dependency_overrides[get_org_from_api_key] = lambda: OrgData(org_id=ORG_KEY)
+
+    response = client.get(
+        f"{API_PREFIX}/applications/policy", headers={"X-Org-Key": ORG_KEY}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"v1"'
+    assert response.json() == {"version": "v1"}
+
+    response = client.get(
+        f"{API_PREFIX}/applications/policy",
+        headers={"X-Org-Key": ORG_KEY, "If-None-Match": '"v1"'},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    policy_service.get_policy.assert_called_with(ORG_KEY)
@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+
+from app.core.dependencies import get_token_data
+from app.main import app
+from app.schemas.common import TokenData
+
+client = TestClient(app)
+
+
+def test_get_metrics_requires_authentication():
+    response = client.get("/console/v1.0/metrics")
+
+    assert response.status_code == 401
+
+
+def test_get_metrics_rejects_org_users():
+    app.dependency_overrides[get_token_data] = lambda: TokenData(
+        org_id="org1", roles=["ORG_ADMIN"]
+    )
+
+    response = client.get("/console/v1.0/metrics")
+
+    assert response.status_code == 403
+
+
+def test_get_metrics_for_platform_admin():
+    app.dependency_overrides[get_token_data] = lambda: TokenData(
+        org_id="", roles=["PLATFORM_ADMIN"]
+    )
+
+    response = client.get("/console/v1.0/metrics")
+
+    assert response.status_code == 200
+    assert "org_key_cache" in response.json()
@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+from app.core.dependencies import get_token_data
+from app.main import app
+from app.schemas.common import TokenData
+
+client = TestClient(app)
+
+
+def test_get_scheduled_jobs_rejects_org_users():
+    app.dependency_overrides[get_token_data] = lambda: TokenData(
+        org_id="org1", roles=["ORG_ADMIN"]
+    )
+
+    response = client.get("/console/v1.0/scheduler/jobs")
+
+    assert response.status_code == 403
+
+
+def test_get_scheduled_jobs_for_platform_admin():
+    app.dependency_overrides[get_token_data] = lambda: TokenData(
+        org_id="", roles=["PLATFORM_ADMIN"]
+    )
+
+    response = client.get("/console/v1.0/scheduler/jobs")
+
+    assert response.status_code == 200
+    jobs = {job["name"]: job for job in response.json()["jobs"]}
+    assert jobs["device_offline_sweep"]["interval_seconds"] == 60
+    assert jobs["device_offline_sweep"]["last_success_at"] is None
+    # Retention is only scheduled when CONSOLE_ACTIVITY_LOG_RETENTION_DAYS is set
+    assert "activity_log_partitions" in jobs
+    assert "activity_log_retention" not in jobs
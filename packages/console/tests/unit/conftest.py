@@ -1,5 +1,5 @@
 import os
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from fastapi import HTTPException, Security
@@ -36,6 +36,13 @@ os.environ.setdefault("CONSOLE_PUBLIC_KEYCLOAK_CLIENT", "console")
 security = HTTPBearer()
 
 
+def _repository_mock() -> Mock:
+    # Nothing is pending in a mocked session, so post-commit work runs at once
+    repository = Mock()
+    repository.after_commit.side_effect = lambda callback: callback()
+    return repository
+
+
 @pytest.fixture
 def mock_db():
     return Mock(spec=Session)
@@ -56,6 +63,11 @@ def mock_device_repository():
     return Mock()
 
 
+@pytest.fixture
+def mock_async_device_repository():
+    return AsyncMock()
+
+
 @pytest.fixture
 def mock_endpoint_config_repository():
     return Mock()
@@ -88,12 +100,12 @@ def application_repository(mock_db):
 
 @pytest.fixture
 def mock_inventory_repository():
-    return Mock()
+    return _repository_mock()
 
 
 @pytest.fixture
 def mock_application_repository():
-    return Mock()
+    return _repository_mock()
 
 
 @pytest.fixture
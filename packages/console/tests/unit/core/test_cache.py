@@ -0,0 +1,65 @@
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_cached_value_until_ttl_expires():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("key", True)
+
+    assert cache.get("key") is True
+
+    clock.now = 61
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_set_with_explicit_ttl_overrides_default():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("rejected", False, ttl=5)
+
+    assert cache.get("rejected") is False
+    clock.now = 6
+    assert cache.get("rejected") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stats_report_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["size"] == 1
+
+
+def test_zero_maxsize_disables_caching():
+    cache = TTLCache(maxsize=0, ttl=60)
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
@@ -0,0 +1,152 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import (
+    after_commit,
+    async_database_url,
+    async_unit_of_work,
+    in_unit_of_work,
+    unit_of_work,
+)
+from app.models.endpoint_config import EndpointConfig
+from app.repositories.endpoint_config import EndpointConfigRepository
+from app.schemas.endpoint_config import EndpointConfigCreate
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file, so each session gets its own connection and transaction
+    engine = create_engine(f"sqlite:///{tmp_path / 'console.db'}")
+    EndpointConfig.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement),
+    )
+    return executed
+
+
+def make_config(config_id):
+    return EndpointConfigCreate(
+        id=config_id, org_id="org_1", name="Config", type="Workstation", config={}
+    )
+
+
+def count(engine):
+    with Session(engine) as db:
+        return db.query(EndpointConfig).count()
+
+
+def test_unit_of_work_commits_all_writes_once(engine, statements):
+    at_commit = []
+    with Session(engine) as db:
+        repository = EndpointConfigRepository(db)
+        with unit_of_work(db):
+            created = repository.create(make_config("config_1"))
+            repository.create(make_config("config_2"))
+            # Server defaults came back with the INSERT, not from a refresh
+            assert created.created_at is not None
+            # Flushed but not yet visible to other sessions
+            assert count(engine) == 0
+            after_commit(db, lambda: at_commit.append(count(engine)))
+            writes = [s for s in statements if not s.startswith("SELECT count")]
+
+    assert at_commit == [2]
+    assert len(writes) == 2
+    assert all(s.startswith("INSERT") and "RETURNING" in s for s in writes)
+
+
+def test_unit_of_work_rolls_back_everything_on_error(engine):
+    committed = []
+    with Session(engine) as db:
+        repository = EndpointConfigRepository(db)
+        with pytest.raises(RuntimeError):
+            with unit_of_work(db):
+                repository.create(make_config("config_1"))
+                after_commit(db, lambda: committed.append(True))
+                raise RuntimeError("request failed")
+
+    assert count(engine) == 0
+    assert committed == []
+
+
+def test_repository_commits_on_its_own_outside_a_unit_of_work(engine):
+    committed = []
+    with Session(engine) as db:
+        EndpointConfigRepository(db).create(make_config("config_1"))
+        after_commit(db, lambda: committed.append(True))
+
+    assert count(engine) == 1
+    assert committed == [True]
+
+
+def mock_async_session():
+    db = AsyncMock(spec=AsyncSession)
+    db.info = {}
+    return db
+
+
+def test_async_unit_of_work_commits_before_running_callbacks():
+    db = mock_async_session()
+    events = []
+    db.commit.side_effect = lambda: events.append("commit")
+
+    async def scenario():
+        async with async_unit_of_work(db):
+            after_commit(db, lambda: events.append("callback"))
+            assert events == []
+
+    asyncio.run(scenario())
+
+    assert events == ["commit", "callback"]
+    assert not in_unit_of_work(db)
+
+
+def test_async_unit_of_work_rolls_back_on_error():
+    db = mock_async_session()
+    committed = []
+
+    async def scenario():
+        async with async_unit_of_work(db):
+            after_commit(db, lambda: committed.append(True))
+            raise RuntimeError("request failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+    db.rollback.assert_awaited_once()
+    db.commit.assert_not_awaited()
+    assert committed == []
+
+
+def test_sync_code_run_on_an_async_session_sees_its_unit_of_work():
+    async def scenario():
+        async with AsyncSession() as db:
+            async with async_unit_of_work(db):
+                return await db.run_sync(in_unit_of_work)
+
+    assert asyncio.run(scenario()) is True
+
+
+def test_async_database_url_defaults_to_asyncpg():
+    with patch("app.core.database.settings") as settings:
+        settings.CONSOLE_ASYNC_DATABASE_URL = None
+        settings.CONSOLE_DATABASE_URL = "postgresql://user:secret@db:5432/console"
+        assert (
+            async_database_url() == "postgresql+asyncpg://user:secret@db:5432/console"
+        )
+
+        settings.CONSOLE_ASYNC_DATABASE_URL = "postgresql+psycopg://db/console"
+        assert async_database_url() == "postgresql+psycopg://db/console"
@@ -0,0 +1,93 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.db_pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    PoolMonitor,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        pool_pre_ping=True,
+    )
+    engine.pool.monitor = PoolMonitor()
+    yield engine
+    engine.dispose()
+
+
+def test_pool_reports_checked_out_connections_and_waits(engine):
+    with engine.connect():
+        stats = engine.pool.stats()
+        assert stats["size"] == 1
+        assert stats["checked_out"] == 1
+        assert stats["overflow"] == 0
+
+    stats = engine.pool.stats()
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["wait_seconds_buckets"]["le_inf"] == 1
+    assert stats["timeouts"] == 0
+
+
+def test_pool_counts_checkout_timeouts(engine):
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = engine.pool.stats()
+    assert stats["timeouts"] == 1
+    # The timed-out caller waited at least the pool timeout
+    assert stats["wait_seconds_max"] >= 0.05
+
+
+def test_recreated_pool_keeps_its_monitor(engine):
+    monitor = engine.pool.monitor
+    engine.dispose()
+    assert engine.pool.monitor is monitor
+
+
+def test_async_pool_counts_checkout_timeouts():
+    pool = InstrumentedAsyncAdaptedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.05
+    )
+    pool.monitor = PoolMonitor()
+
+    async def scenario():
+        # Checkouts run inside a greenlet, as they do under an AsyncEngine
+        connection = await greenlet_spawn(pool.connect)
+        assert pool.stats()["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            await greenlet_spawn(pool.connect)
+        await greenlet_spawn(connection.close)
+
+    asyncio.run(scenario())
+
+    stats = pool.stats()
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert pool.recreate().monitor is pool.monitor
+
+
+def test_wait_histogram_is_cumulative():
+    monitor = PoolMonitor(buckets=(0.01, 0.1))
+    for seconds in (0.001, 0.05, 0.05, 2.0):
+        monitor.record_wait(seconds)
+
+    assert monitor.stats()["wait_seconds_buckets"] == {
+        "le_0.01": 1,
+        "le_0.1": 3,
+        "le_inf": 4,
+    }
@@ -0,0 +1,195 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.context import clear_org_id, set_org_id
+from app.core.database import _request_session, unit_of_work
+from app.core.db_pool import InstrumentedQueuePool, PoolMonitor
+from app.core.db_replicas import (
+    Replica,
+    ReplicaRouter,
+    RoutingSession,
+    pin_to_primary,
+    track_writes,
+    wrote,
+)
+from app.models.endpoint_config import EndpointConfig
+from app.repositories.endpoint_config import EndpointConfigRepository
+from app.schemas.endpoint_config import EndpointConfigCreate
+
+
+def make_engine(path, config_id):
+    engine = create_engine(f"sqlite:///{path}", poolclass=InstrumentedQueuePool)
+    engine.pool.monitor = PoolMonitor()
+    EndpointConfig.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            EndpointConfig.__table__.insert(),
+            {
+                "id": config_id,
+                "org_id": "org_1",
+                "name": config_id,
+                "type": "Workstation",
+                "config": {},
+            },
+        )
+    return engine
+
+
+@pytest.fixture
+def primary(tmp_path):
+    # Each database holds a row the other lacks, so reads reveal their source
+    engine = make_engine(tmp_path / "primary.db", "on_primary")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica(tmp_path):
+    engine = make_engine(tmp_path / "replica.db", "on_replica")
+    yield Replica(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def router(primary, replica):
+    replica.lag_seconds = 0.0
+    return ReplicaRouter(primary, [replica], max_lag=5, pin_seconds=60)
+
+
+@pytest.fixture
+def make_session(router):
+    factory = sessionmaker(class_=RoutingSession, router=router, autoflush=False)
+    track_writes(factory)
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def no_org():
+    yield
+    clear_org_id()
+
+
+def read_ids(db):
+    return set(db.scalars(select(EndpointConfig.id)))
+
+
+def test_reads_go_to_a_caught_up_replica(make_session, router, replica):
+    with make_session() as db:
+        assert read_ids(db) == {"on_replica"}
+    assert replica.reads == 1
+
+
+def test_session_keeps_reading_from_the_replica_it_picked(tmp_path, primary, replica):
+    other = Replica(make_engine(tmp_path / "other.db", "on_other"))
+    other.lag_seconds = replica.lag_seconds = 0.0
+    router = ReplicaRouter(primary, [replica, other], max_lag=5, pin_seconds=60)
+    factory = sessionmaker(class_=RoutingSession, router=router, autoflush=False)
+
+    for _ in range(5):
+        with factory() as db:
+            assert len({frozenset(read_ids(db)) for _ in range(10)}) == 1
+    other.engine.dispose()
+
+    assert replica.reads + other.reads == 5
+
+
+def test_reads_fall_back_to_primary_while_replica_lag_is_unknown_or_high(
+    make_session, router, replica
+):
+    replica.lag_seconds = None
+    with make_session() as db:
+        assert read_ids(db) == {"on_primary"}
+
+    replica.lag_seconds = 30.0
+    with make_session() as db:
+        assert read_ids(db) == {"on_primary"}
+    assert router.fallback_reads == 2
+
+
+def test_session_reads_its_own_writes_from_primary(make_session):
+    with make_session() as db:
+        with unit_of_work(db):
+            EndpointConfigRepository(db).create(
+                EndpointConfigCreate(
+                    id="new", org_id="org_1", name="New", type="Workstation", config={}
+                )
+            )
+            assert wrote(db)
+            assert read_ids(db) == {"on_primary", "new"}
+
+
+def test_core_updates_go_to_primary_and_pin_the_session(make_session, primary):
+    with make_session() as db:
+        assert read_ids(db) == {"on_replica"}
+        db.execute(update(EndpointConfig).values(name="Renamed"))
+        assert wrote(db)
+        assert read_ids(db) == {"on_primary"}
+        db.commit()
+
+    with primary.connect() as connection:
+        names = connection.execute(select(EndpointConfig.name)).scalars().all()
+    assert names == ["Renamed"]
+
+
+def test_locking_reads_go_to_primary(make_session):
+    with make_session() as db:
+        ids = set(db.scalars(select(EndpointConfig.id).with_for_update()))
+    assert ids == {"on_primary"}
+
+
+def test_pinned_session_reads_from_primary(make_session):
+    with make_session() as db:
+        pin_to_primary(db)
+        assert read_ids(db) == {"on_primary"}
+
+
+def test_recent_write_pins_the_organization_to_primary(make_session, router):
+    router.record_write("org_1")
+
+    set_org_id("org_1")
+    with make_session() as db:
+        assert read_ids(db) == {"on_primary"}
+    set_org_id("org_2")
+    with make_session() as db:
+        assert read_ids(db) == {"on_replica"}
+    assert router.pinned_reads == 1
+
+
+def test_request_session_pins_organization_after_committed_write(primary, router):
+    factory = sessionmaker(bind=primary, autoflush=False)
+    track_writes(factory)
+    set_org_id("org_1")
+
+    with patch("app.core.database.replica_router", router):
+        requests = _request_session(factory)
+        db = next(requests)
+        db.execute(select(EndpointConfig.id))
+        next(requests, None)
+        assert not router.is_pinned("org_1")
+
+        requests = _request_session(factory)
+        db = next(requests)
+        db.execute(update(EndpointConfig).values(name="Renamed"))
+        next(requests, None)
+    assert router.is_pinned("org_1")
+
+
+def test_failed_probe_marks_replica_unhealthy(router, replica):
+    # SQLite has no pg_is_in_recovery(), so the probe query fails
+    replica.probe()
+
+    assert replica.lag_seconds is None
+    stats = router.stats()["replicas"][replica.name]
+    assert stats["healthy"] is False
+    assert stats["probe_failures"] == 1
+    assert stats["pool"]["checkouts"] >= 1
+
+
+def test_estimated_count_explains_on_the_replica(make_session, replica):
+    with make_session() as db:
+        query = db.query(EndpointConfig)
+        connection = db.connection(bind_arguments={"clause": query.statement})
+    assert connection.engine is replica.engine
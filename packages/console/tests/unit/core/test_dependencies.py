@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.dependencies import get_org_from_api_key, org_key_cache
+from app.core.exceptions import ForbiddenException
+
+
+@pytest.fixture(autouse=True)
+def clear_org_key_cache():
+    org_key_cache.clear()
+    yield
+    org_key_cache.clear()
+
+
+def test_get_org_from_api_key_caches_valid_key():
+    keycloak_client = AsyncMock()
+    keycloak_client.validate_org_access.return_value = True
+
+    first = asyncio.run(get_org_from_api_key("org-key", keycloak_client))
+    second = asyncio.run(get_org_from_api_key("org-key", keycloak_client))
+
+    assert first.org_id == second.org_id == "org-key"
+    keycloak_client.validate_org_access.assert_awaited_once_with("org-key")
+
+
+def test_get_org_from_api_key_caches_rejected_key():
+    keycloak_client = AsyncMock()
+    keycloak_client.validate_org_access.return_value = False
+
+    for _ in range(2):
+        with pytest.raises(ForbiddenException):
+            asyncio.run(get_org_from_api_key("bad-key", keycloak_client))
+
+    keycloak_client.validate_org_access.assert_awaited_once_with("bad-key")
+
+
+def test_get_org_from_api_key_does_not_cache_keycloak_errors():
+    keycloak_client = AsyncMock()
+    keycloak_client.validate_org_access.side_effect = [Exception("down"), True]
+
+    with pytest.raises(Exception):
+        asyncio.run(get_org_from_api_key("org-key", keycloak_client))
+    result = asyncio.run(get_org_from_api_key("org-key", keycloak_client))
+
+    assert result.org_id == "org-key"
+    assert keycloak_client.validate_org_access.await_count == 2
+
+
+def test_concurrent_requests_share_one_keycloak_lookup():
+    async def slow_validate(api_key):
+        await asyncio.sleep(0.01)
+        return True
+
+    keycloak_client = AsyncMock()
+    keycloak_client.validate_org_access.side_effect = slow_validate
+
+    async def burst():
+        return await asyncio.gather(
+            *(get_org_from_api_key("org-key", keycloak_client) for _ in range(20))
+        )
+
+    results = asyncio.run(burst())
+
+    assert {result.org_id for result in results} == {"org-key"}
+    keycloak_client.validate_org_access.assert_awaited_once_with("org-key")
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import rsa
+from jose import jwk, jwt
+
+from app.config import settings
+from app.core import jwt_utils
+from app.core.cache import TTLCache
+from app.core.exceptions import UnauthorizedException
+from app.core.jwt_utils import JWKSCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_key(kid):
+    _, private_key = rsa.newkeys(1024)
+    pem = private_key.save_pkcs1()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "use": "sig"}
+
+
+KEY_A = make_key("key-a")
+KEY_B = make_key("key-b")
+
+
+class FakeKeycloak:
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.requests = 0
+        self.fail = False
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": self.keys})
+
+
+def make_cache(keycloak, clock):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(keycloak.handler))
+    return JWKSCache(
+        jwks_uri="http://keycloak/realms/test/protocol/openid-connect/certs",
+        ttl=3600,
+        min_refresh_interval=30,
+        http_client=http_client,
+        clock=clock,
+    )
+
+
+def make_token(key=KEY_A, **claims):
+    pem, public = key
+    claims = {
+        "iss": f"{settings.CONSOLE_PUBLIC_KEYCLOAK_URL}/realms/{settings.CONSOLE_KEYCLOAK_REALM}",
+        "azp": settings.CONSOLE_PUBLIC_KEYCLOAK_CLIENT_ID,
+        "exp": int(time.time()) + 300,
+        "preferred_username": "alice",
+        "org_id": "org-1",
+        "realm_access": {"roles": ["ORG_ADMIN"]},
+        **claims,
+    }
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": public["kid"]})
+
+
+@pytest.fixture
+def keycloak(monkeypatch):
+    keycloak = FakeKeycloak([KEY_A[1]])
+    monkeypatch.setattr(jwt_utils, "jwks_cache", make_cache(keycloak, FakeClock()))
+    monkeypatch.setattr(jwt_utils, "verified_tokens", TTLCache(maxsize=100, ttl=60))
+    return keycloak
+
+
+def test_unknown_kid_triggers_refetch():
+    keycloak = FakeKeycloak([KEY_A[1]])
+    clock = FakeClock()
+    cache = make_cache(keycloak, clock)
+
+    async def scenario():
+        await cache.get_key("key-a")
+        keycloak.keys.append(KEY_B[1])
+        clock.now = 31
+        return await cache.get_key("key-b")
+
+    assert asyncio.run(scenario()) is not None
+    assert keycloak.requests == 2
+
+
+def test_unknown_kid_refetch_is_rate_limited():
+    keycloak = FakeKeycloak([KEY_A[1]])
+    cache = make_cache(keycloak, FakeClock())
+
+    async def scenario():
+        await cache.get_key("key-a")
+        with pytest.raises(UnauthorizedException):
+            await cache.get_key("bogus")
+
+    asyncio.run(scenario())
+    assert keycloak.requests == 1
+
+
+def test_keys_are_refetched_after_ttl():
+    keycloak = FakeKeycloak([KEY_A[1]])
+    clock = FakeClock()
+    cache = make_cache(keycloak, clock)
+
+    async def scenario():
+        await cache.get_key("key-a")
+        clock.now = 3599
+        await cache.get_key("key-a")
+        clock.now = 3600
+        await cache.get_key("key-a")
+
+    asyncio.run(scenario())
+    assert keycloak.requests == 2
+
+
+def test_failed_refresh_keeps_cached_keys():
+    keycloak = FakeKeycloak([KEY_A[1]])
+    clock = FakeClock()
+    cache = make_cache(keycloak, clock)
+
+    async def scenario():
+        first = await cache.get_key("key-a")
+        keycloak.fail = True
+        clock.now = 3600
+        assert await cache.get_key("key-a") is first
+        # The failure is not retried on every request
+        assert await cache.get_key("key-a") is first
+
+    asyncio.run(scenario())
+    assert keycloak.requests == 2
+
+
+def test_concurrent_callers_share_one_fetch():
+    keycloak = FakeKeycloak([KEY_A[1]])
+    cache = make_cache(keycloak, FakeClock())
+
+    async def burst():
+        return await asyncio.gather(*(cache.get_key("key-a") for _ in range(10)))
+
+    keys = asyncio.run(burst())
+    assert all(key is keys[0] for key in keys)
+    assert keycloak.requests == 1
+
+
+def test_verify_token_memoizes_verified_tokens(keycloak, monkeypatch):
+    token = make_token()
+    verify_calls = []
+    verify_signature = jwt_utils._verify_signature
+
+    def counting_verify(*args):
+        verify_calls.append(args)
+        return verify_signature(*args)
+
+    monkeypatch.setattr(jwt_utils, "_verify_signature", counting_verify)
+
+    async def scenario():
+        return [await jwt_utils.verify_token(token) for _ in range(3)]
+
+    results = asyncio.run(scenario())
+    assert results[0].username == "alice"
+    assert results[0].roles == ["ORG_ADMIN"]
+    assert len(verify_calls) == 1
+    assert keycloak.requests == 1
+
+
+def test_verify_token_rejects_expired_token(keycloak):
+    token = make_token(exp=int(time.time()) - 1)
+
+    with pytest.raises(UnauthorizedException):
+        asyncio.run(jwt_utils.verify_token(token))
+
+
+def test_verify_token_rejects_bad_signature(keycloak):
+    header, payload, _ = make_token().split(".")
+    _, forged_signature = make_token(KEY_B).rsplit(".", 1)
+
+    with pytest.raises(UnauthorizedException):
+        asyncio.run(jwt_utils.verify_token(f"{header}.{payload}.{forged_signature}"))
+    assert len(jwt_utils.verified_tokens) == 0
@@ -0,0 +1,140 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.dependencies import get_org_from_api_key, org_key_cache
+from app.core.exceptions import ServiceUnavailableException, UnauthorizedException
+from app.core.keycloak_client import KeycloakClient, ServiceAccountTokenManager
+
+
+class FakeKeycloak:
+    def __init__(self, tokens=("token",), admin_statuses=(200,), expires_in=300):
+        self.tokens = list(tokens)
+        self.admin_statuses = list(admin_statuses)
+        self.expires_in = expires_in
+        self.token_requests = 0
+        self.admin_requests = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/token"):
+            self.token_requests += 1
+            await asyncio.sleep(0.01)
+            token = self.tokens[min(self.token_requests, len(self.tokens)) - 1]
+            if token is None:
+                return httpx.Response(401)
+            return httpx.Response(
+                200, json={"access_token": token, "expires_in": self.expires_in}
+            )
+        self.admin_requests.append(request)
+        status = self.admin_statuses[
+            min(len(self.admin_requests), len(self.admin_statuses)) - 1
+        ]
+        return httpx.Response(status, json=[])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(keycloak: FakeKeycloak, clock=None) -> KeycloakClient:
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(keycloak.handler))
+    token_manager = ServiceAccountTokenManager(
+        token_url="http://keycloak/realms/test/protocol/openid-connect/token",
+        client_id="client",
+        client_secret="secret",
+        refresh_margin=30,
+        http_client=http_client,
+        clock=clock or FakeClock(),
+    )
+    return KeycloakClient(http_client=http_client, token_manager=token_manager)
+
+
+def test_get_token_is_reused_until_refresh_margin():
+    keycloak = FakeKeycloak(tokens=["token", "refreshed"], expires_in=300)
+    clock = FakeClock()
+    client = make_client(keycloak, clock)
+
+    async def scenario():
+        assert await client.get_token() == "token"
+        clock.now = 269
+        assert await client.get_token() == "token"
+        clock.now = 271
+        assert await client.get_token() == "refreshed"
+
+    asyncio.run(scenario())
+    assert keycloak.token_requests == 2
+
+
+def test_concurrent_callers_share_one_token_fetch():
+    keycloak = FakeKeycloak()
+    client = make_client(keycloak)
+
+    async def burst():
+        return await asyncio.gather(*(client.get_token() for _ in range(10)))
+
+    assert asyncio.run(burst()) == ["token"] * 10
+    assert keycloak.token_requests == 1
+
+
+def test_get_token_raises_when_keycloak_rejects_client():
+    client = make_client(FakeKeycloak(tokens=[None]))
+
+    with pytest.raises(UnauthorizedException):
+        asyncio.run(client.get_token())
+
+
+def test_validate_org_access_retries_once_with_fresh_token():
+    keycloak = FakeKeycloak(tokens=["stale", "fresh"], admin_statuses=[401, 200])
+    client = make_client(keycloak)
+
+    assert asyncio.run(client.validate_org_access("org-key")) is True
+    assert keycloak.token_requests == 2
+    assert keycloak.admin_requests[-1].headers["Authorization"] == "Bearer fresh"
+
+
+def test_validate_org_access_returns_false_for_unknown_org():
+    keycloak = FakeKeycloak(admin_statuses=[404])
+    client = make_client(keycloak)
+
+    assert asyncio.run(client.validate_org_access("unknown")) is False
+    assert keycloak.admin_requests[0].url.path.endswith("/organizations/unknown")
+    assert keycloak.token_requests == 1
+
+
+def test_keycloak_outage_leaves_org_key_uncached():
+    keycloak = FakeKeycloak(admin_statuses=[503, 200])
+    client = make_client(keycloak)
+    org_key_cache.clear()
+
+    with pytest.raises(ServiceUnavailableException):
+        asyncio.run(get_org_from_api_key("org-key", client))
+    assert org_key_cache.get("org-key") is None
+
+    # The next request asks Keycloak again instead of being rejected
+    assert asyncio.run(get_org_from_api_key("org-key", client)).org_id == "org-key"
+    assert len(keycloak.admin_requests) == 2
+    org_key_cache.clear()
+
+
+def test_invalidate_keeps_token_refreshed_by_another_caller():
+    keycloak = FakeKeycloak(tokens=["stale", "fresh"])
+    clock = FakeClock()
+    client = make_client(keycloak, clock)
+    token_manager = client.token_manager
+
+    async def scenario():
+        stale = await client.get_token()
+        clock.now = 1000
+        fresh = await client.get_token()
+        token_manager.invalidate(stale)
+        return fresh, await client.get_token()
+
+    fresh, current = asyncio.run(scenario())
+
+    assert fresh == current == "fresh"
+    assert keycloak.token_requests == 2
@@ -0,0 +1,31 @@
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_timer_records_duration_even_when_block_raises():
+    registry = MetricsRegistry()
+
+    with registry.timer("job"):
+        pass
+    with pytest.raises(RuntimeError):
+        with registry.timer("job"):
+            raise RuntimeError("boom")
+
+    timing = registry.snapshot()["timings"]["job"]
+    assert timing["count"] == 2
+    assert timing["max"] >= timing["last"] >= 0
+    assert timing["total"] >= timing["max"]
+
+
+def test_snapshot_includes_counters_and_collectors():
+    registry = MetricsRegistry()
+    registry.increment("requests")
+    registry.increment("requests", 2)
+    registry.register_collector("cache", lambda: {"size": 1})
+
+    assert registry.snapshot() == {
+        "counters": {"requests": 3},
+        "timings": {},
+        "cache": {"size": 1},
+    }
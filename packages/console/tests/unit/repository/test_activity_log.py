@@ -1,8 +1,13 @@
 import pytest
 from datetime import datetime, timezone
 from fastapi.testclient import TestClient
-from unittest.mock import Mock
-from app.repositories.activity_logs import ActivityLogRepository
+import asyncio
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.activity_logs import (
+    ActivityLogRepository,
+    AsyncActivityLogRepository,
+)
 from app.main import app
 from app.models import SeverityLevel
 from app.schemas.activity_logs import ActivityLogCreate
@@ -57,15 +62,62 @@ def sample_activity_log_create():
 
 def test_repository_create_activity_logs(mock_db_session, sample_activity_log_create):
     repository = ActivityLogRepository(mock_db_session)
-    logs_to_create = [sample_activity_log_create]
+    logs_to_create = [sample_activity_log_create, sample_activity_log_create]
+    mock_db_session.query.return_value.filter.return_value = [
+        ("device123", "Device 123")
+    ]
+    created_row = Mock(device_id="device123")
+    mock_db_session.execute.return_value.all.return_value = [created_row, created_row]
 
     # Call the method
-    repository.create_activity_logs(logs_to_create, TEST_ORG_ID)
+    result = repository.create_activity_logs(logs_to_create, TEST_ORG_ID)
 
-    # Assert DB operations
-    mock_db_session.add.assert_called()
+    # One lookup for the device names and one batched insert, no per-row work
+    assert result == [(created_row, "Device 123"), (created_row, "Device 123")]
+    mock_db_session.query.assert_called_once()
+    statement, rows = mock_db_session.execute.call_args[0]
+    assert "RETURNING" in str(statement)
+    assert [row["org_id"] for row in rows] == [TEST_ORG_ID, TEST_ORG_ID]
+    assert rows[0]["id"] != rows[1]["id"]
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called()
+    mock_db_session.add.assert_not_called()
+    mock_db_session.refresh.assert_not_called()
+
+
+def test_repository_create_activity_logs_rolls_back_on_error(
+    mock_db_session, sample_activity_log_create
+):
+    repository = ActivityLogRepository(mock_db_session)
+    mock_db_session.query.return_value.filter.return_value = []
+    mock_db_session.execute.side_effect = RuntimeError("insert failed")
+
+    with pytest.raises(RuntimeError):
+        repository.create_activity_logs([sample_activity_log_create], TEST_ORG_ID)
+
+    mock_db_session.rollback.assert_called_once()
+    mock_db_session.commit.assert_not_called()
+
+
+def test_async_repository_create_activity_logs(sample_activity_log_create):
+    db = AsyncMock(spec=AsyncSession)
+    db.info = {}
+    names, inserted = Mock(), Mock()
+    names.all.return_value = [("device123", "Device 123")]
+    created_row = Mock(device_id="device123")
+    inserted.all.return_value = [created_row]
+    db.execute.side_effect = [names, inserted]
+
+    result = asyncio.run(
+        AsyncActivityLogRepository(db).create_activity_logs(
+            [sample_activity_log_create], TEST_ORG_ID
+        )
+    )
+
+    assert result == [(created_row, "Device 123")]
+    statement, rows = db.execute.call_args[0]
+    assert "RETURNING" in str(statement)
+    assert rows[0]["org_id"] == TEST_ORG_ID
+    db.commit.assert_awaited_once()
 
 
 def test_repository_get_activity_logs_by_filters(mock_db_session):
@@ -179,3 +231,52 @@ def test_repository_get_activity_logs_by_device_with_filters(mock_db_session):
     query_mock.join.assert_called_once()
     join_mock.filter.assert_called_once()
     filter_mock.count.assert_called_once()
+
+
+def test_repository_get_activity_logs_by_filters_with_cursor(mock_db_session):
+    repository = ActivityLogRepository(mock_db_session)
+
+    filter_mock = Mock()
+    cursor_mock = Mock()
+    order_mock = Mock()
+    mock_db_session.query.return_value.join.return_value.filter.return_value = (
+        filter_mock
+    )
+    filter_mock.filter.return_value = cursor_mock
+    cursor_mock.order_by.return_value = order_mock
+    order_mock.offset.return_value.limit.return_value.all.return_value = []
+
+    logs, count = repository.get_activity_logs_by_filters(
+        org_id=TEST_ORG_ID,
+        skip=200,
+        limit=100,
+        cursor=(datetime.now(timezone.utc), "log123"),
+        include_total=False,
+    )
+
+    assert logs == []
+    assert count is None
+    filter_mock.count.assert_not_called()
+    keyset_condition = str(filter_mock.filter.call_args[0][0])
+    assert "(activity_logs.created_at, activity_logs.id) <" in keyset_condition
+    # The cursor replaces the offset
+    order_mock.offset.assert_called_once_with(0)
+
+
+def test_repository_get_activity_logs_since_bounds_created_at(mock_db_session):
+    repository = ActivityLogRepository(mock_db_session)
+    join_mock = mock_db_session.query.return_value.join.return_value
+    filter_mock = join_mock.filter.return_value
+    filter_mock.order_by.return_value.offset.return_value.limit.return_value.all.return_value = (
+        []
+    )
+
+    repository.get_activity_logs_by_filters(
+        org_id=TEST_ORG_ID,
+        since=datetime(2026, 10, 1, tzinfo=timezone.utc),
+        include_total=False,
+    )
+
+    # A lower bound on the partition key lets the planner skip older months
+    conditions = str(join_mock.filter.call_args[0][0])
+    assert "activity_logs.created_at >= :created_at_1" in conditions
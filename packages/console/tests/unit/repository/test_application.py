@@ -1,6 +1,7 @@
 from datetime import datetime
 from unittest.mock import Mock, patch
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from app.models import Application, ApprovalStatus
 from app.schemas.application import ApplicationCreate
@@ -44,7 +45,7 @@ def test_application_repository_create(
         assert result.organization_id == app_create.organization_id
         mock_db.add.assert_called_once()
         mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once()
+        mock_db.refresh.assert_not_called()
 
 
 def test_application_repository_get(
@@ -156,7 +157,7 @@ def test_application_repository_update(
     assert result.organization_id == sample_application["organization_id"]
     mock_db.add.assert_called_once_with(existing_app)
     mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(existing_app)
+    mock_db.refresh.assert_not_called()
 
 
 def test_application_repository_delete(
@@ -355,3 +356,34 @@ def test_application_repository_deny_nonexistent_application(
 
     assert result is None
     mock_db.commit.assert_not_called()
+
+
+def test_application_repository_lock_statuses(application_repository, mock_db):
+    mock_query = mock_db.query.return_value
+    mock_query.filter.return_value.with_for_update.return_value.all.return_value = [
+        ("app_1", ApprovalStatus.PENDING)
+    ]
+
+    result = application_repository.lock_statuses("org_1", ["app_1", "app_2"])
+
+    assert result == {"app_1": ApprovalStatus.PENDING}
+    mock_query.filter.return_value.with_for_update.assert_called_once()
+
+
+def test_application_repository_set_status_in_one_update(
+    application_repository, mock_db
+):
+    decided = [Mock(spec=Application)]
+    mock_db.scalars.return_value = iter(decided)
+
+    result = application_repository.set_status(
+        ["app_1", "app_2"], ApprovalStatus.DENIED
+    )
+
+    assert result == decided
+    compiled = mock_db.scalars.call_args[0][0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("UPDATE applications SET status=")
+    assert "denied_at=now()" in sql
+    assert "RETURNING applications.id" in sql
+    mock_db.commit.assert_not_called()
@@ -0,0 +1,55 @@
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from app.core.cache import TTLCache
+from app.models import ActivityLog
+from app.repositories import counting
+from app.repositories.counting import count_rows
+from app.schemas.common import CountMode
+
+
+@pytest.fixture(autouse=True)
+def count_cache(monkeypatch):
+    cache = TTLCache(maxsize=100, ttl=30)
+    monkeypatch.setattr(counting, "count_cache", cache)
+    return cache
+
+
+def test_exact_count_runs_count_every_time():
+    query = Mock()
+    query.count.return_value = 7
+
+    assert count_rows(query, CountMode.EXACT, ("logs", "org1")) == 7
+    assert count_rows(query, CountMode.EXACT, ("logs", "org1")) == 7
+    assert query.count.call_count == 2
+
+
+def test_cached_count_is_reused_per_key():
+    query = Mock()
+    query.count.side_effect = [7, 3]
+
+    assert count_rows(query, CountMode.CACHED, ("logs", "org1", None)) == 7
+    assert count_rows(query, CountMode.CACHED, ("logs", "org1", None)) == 7
+    # A different organization or filter set is counted separately
+    assert count_rows(query, CountMode.CACHED, ("logs", "org2", None)) == 3
+    assert query.count.call_count == 2
+
+
+def test_estimate_reads_planner_rows_from_explain():
+    session = Mock()
+    connection = session.connection.return_value
+    connection.dialect = postgresql.dialect()
+    connection.exec_driver_sql.return_value.scalar.return_value = [
+        {"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234}}
+    ]
+    query = Query(ActivityLog, session=session).filter(ActivityLog.org_id == "org1")
+
+    assert count_rows(query, CountMode.ESTIMATE, ("logs", "org1")) == 1234
+
+    sql, params = connection.exec_driver_sql.call_args[0]
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "activity_logs.org_id = %(org_id_1)s" in sql
+    assert params == {"org_id_1": "org1"}
@@ -1,12 +1,18 @@
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 from app.core.exceptions import NotFoundException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql.dml import Update
 import pytest
 from fastapi import HTTPException
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.sql.elements import BooleanClauseList
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.database import async_unit_of_work
 from app.models.device import Device
+from app.repositories.device import AsyncDeviceRepository
 from app.schemas.device import DeviceCreate, DeviceUpdate
 
 
@@ -119,7 +125,7 @@ def test_create(device_repository, mock_db):
     assert isinstance(result, Device)
     mock_db.add.assert_called_once()
     mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once()
+    mock_db.refresh.assert_not_called()
 
 
 def test_create_with_db_error(device_repository, mock_db):
@@ -155,7 +161,7 @@ def test_update(device_repository, mock_db):
     assert result == mock_device
     mock_db.add.assert_called_once_with(mock_device)
     mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(mock_device)
+    mock_db.refresh.assert_not_called()
 
 
 def test_update_not_found(device_repository, mock_db):
@@ -174,86 +180,42 @@ def test_update_not_found(device_repository, mock_db):
 
 
 def test_update_device_status(device_repository, mock_db):
-    # Arrange
-    current_time = datetime.now(timezone.utc)
-    five_minutes_ago = current_time - timedelta(minutes=5)
-
-    # Setup test devices with properties
-    offline_devices = [
-        Device(id="1", last_seen=five_minutes_ago, properties={"cpu": 0.8}),
-        Device(
-            id="2", created_at=five_minutes_ago, last_seen=None, properties={"cpu": 0.9}
-        ),
-    ]
-
-    # Mock the query chain
-    mock_query = Mock()
-    mock_db.query.return_value = mock_query
-    mock_query.filter.return_value = mock_query
-    mock_query.all.return_value = offline_devices
-
-    # Mock the execute method to track calls
-    mock_db.execute = Mock()
+    # Arrange: one full chunk, then a partial one
+    mock_db.execute.return_value.all.side_effect = [[("1",), ("2",)], [("3",)]]
 
     # Act
-    device_repository.update_device_status()
+    swept = device_repository.update_device_status(chunk_size=2)
 
     # Assert
-    mock_db.query.assert_called_once_with(Device)
-
-    # Verify filter conditions
-    filter_call = mock_query.filter.call_args[0][0]
-    assert isinstance(filter_call, BooleanClauseList)
-
-    # Verify execute was called for each device
-    assert mock_db.execute.call_count == len(offline_devices)
-
-    # Verify execute was called for each device
-    assert mock_db.execute.call_count == len(offline_devices)
-
-    # Verify the update parameters
-    expected_updates = {
-        "health": "UNKNOWN",
-        "last_seen": None,
-        "properties": {"cpu": None},
+    assert swept == 3
+    assert mock_db.execute.call_count == 2
+    assert mock_db.commit.call_count == 2
+    mock_db.query.assert_not_called()
+
+    update_stmt = mock_db.execute.call_args[0][0]
+    assert isinstance(update_stmt, Update)
+    sql = str(update_stmt.compile(dialect=postgresql.dialect()))
+    assert "WHERE devices.id IN (SELECT devices.id" in sql
+    assert "IS DISTINCT FROM" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "RETURNING devices.id" in sql
+    assert set(update_stmt._values) >= {
+        Device.__table__.c.last_seen,
+        Device.__table__.c.properties,
     }
 
-    # Verify each update call
-    for call_args in mock_db.execute.call_args_list:
-        update_stmt = call_args[0][0]
-
-        # Verify it's an update statement
-        assert isinstance(update_stmt, Update), "Expected an Update statement"
-
-        # Verify the WHERE clause contains the device ID
-        where_clause = update_stmt.whereclause
-        assert where_clause is not None
-        assert str(where_clause).startswith("devices.id = :id_1")
-
-        # Verify the SET clause contains all expected updates
-        set_clause = update_stmt._values
-        assert set_clause is not None
-        assert len(set_clause) == len(expected_updates)
-
-        # Verify each update value
-        for col, val in expected_updates.items():
-            assert col in str(set_clause)
-
 
 def test_update_device_status_no_offline_devices(device_repository, mock_db):
     # Arrange
-    mock_query = Mock()
-    mock_db.query.return_value = mock_query
-    mock_query.filter.return_value = mock_query
-    mock_query.all.return_value = []  # No offline devices
+    mock_db.execute.return_value.all.return_value = []  # No offline devices
 
     # Act
-    device_repository.update_device_status()
+    swept = device_repository.update_device_status()
 
     # Assert
-    mock_db.query.assert_called_once_with(Device)
-    mock_db.execute.assert_not_called()
-    mock_db.commit.assert_not_called()
+    assert swept == 0
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_called_once()
 
 
 def test_calculate_device_status_variations(device_repository):
@@ -339,3 +301,137 @@ def test_calculate_device_status_variations(device_repository):
 
     for device, expected_status in test_cases:
         assert device_repository._calculate_device_status(device) == expected_status
+
+
+def test_bulk_update_heartbeats(device_repository, mock_db):
+    # Arrange
+    seen_at = datetime.now(timezone.utc)
+    mock_db.execute.return_value.scalars.return_value = iter(["1"])
+
+    # Act
+    result = device_repository.bulk_update_heartbeats(
+        "org1", {"1": (seen_at, {"cpu": 0.5}), "2": (seen_at, {})}
+    )
+
+    # Assert
+    assert result == ["1"]
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_called_once()
+    update_stmt = mock_db.execute.call_args[0][0]
+    assert isinstance(update_stmt, Update)
+    sql = str(update_stmt.compile(dialect=postgresql.dialect()))
+    assert "FROM (VALUES" in sql
+    assert "devices.org_id" in sql
+    assert "RETURNING devices.id" in sql
+
+
+def test_bulk_update_heartbeats_empty(device_repository, mock_db):
+    assert device_repository.bulk_update_heartbeats("org1", {}) == []
+    mock_db.execute.assert_not_called()
+    mock_db.commit.assert_not_called()
+
+
+@pytest.fixture
+def mock_async_db():
+    db = AsyncMock(spec=AsyncSession)
+    db.info = {}
+    return db
+
+
+def test_async_bulk_update_heartbeats(mock_async_db):
+    # Arrange
+    seen_at = datetime.now(timezone.utc)
+    mock_async_db.execute.return_value = Mock(scalars=Mock(return_value=iter(["1"])))
+    repository = AsyncDeviceRepository(mock_async_db)
+
+    # Act
+    result = asyncio.run(
+        repository.bulk_update_heartbeats(
+            "org1", {"1": (seen_at, {"cpu": 0.5}), "2": (seen_at, {})}
+        )
+    )
+
+    # Assert
+    assert result == ["1"]
+    mock_async_db.execute.assert_awaited_once()
+    mock_async_db.commit.assert_awaited_once()
+    sql = str(
+        mock_async_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    )
+    assert "FROM (VALUES" in sql
+    assert "RETURNING devices.id" in sql
+
+
+def test_async_update_reuses_the_loaded_device(mock_async_db):
+    # Arrange
+    device = Device(id="1", org_id="org1", properties={})
+    mock_async_db.get.return_value = device
+    repository = AsyncDeviceRepository(mock_async_db)
+
+    # Act
+    result = asyncio.run(repository.update("1", DeviceUpdate(properties={"cpu": 0.5})))
+
+    # Assert
+    assert result is device
+    assert device.properties == {"cpu": 0.5}
+    mock_async_db.get.assert_awaited_once_with(Device, "1")
+    mock_async_db.commit.assert_awaited_once()
+
+
+def test_async_update_missing_device(mock_async_db):
+    mock_async_db.get.return_value = None
+    repository = AsyncDeviceRepository(mock_async_db)
+
+    with pytest.raises(NotFoundException):
+        asyncio.run(repository.update("1", DeviceUpdate(properties={})))
+    mock_async_db.commit.assert_not_awaited()
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def sqlite_async_engine(tmp_path):
+    # A real asyncio driver, so awaits, flushes and commits reach a database
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'console.db'}")
+
+    async def create():
+        async with engine.begin() as connection:
+            await connection.run_sync(Device.__table__.create)
+            await connection.execute(
+                Device.__table__.insert(),
+                [
+                    {"id": "1", "org_id": "org1", "properties": {}},
+                    {"id": "2", "org_id": "org2", "properties": {}},
+                ],
+            )
+
+    asyncio.run(create())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def test_async_repository_writes_commit_with_the_unit_of_work(sqlite_async_engine):
+    async def scenario():
+        async with AsyncSession(sqlite_async_engine) as db:
+            repository = AsyncDeviceRepository(db)
+            async with async_unit_of_work(db):
+                assert await repository.get_owned_device_ids("org1", ["1", "2"]) == [
+                    "1"
+                ]
+                await repository.update("1", DeviceUpdate(properties={"cpu": 0.5}))
+
+            with pytest.raises(RuntimeError):
+                async with async_unit_of_work(db):
+                    await repository.update("1", {"name": "Renamed"})
+                    raise RuntimeError("request failed")
+
+        async with AsyncSession(sqlite_async_engine) as db:
+            return await db.get(Device, "1")
+
+    device = asyncio.run(scenario())
+
+    assert device.properties == {"cpu": 0.5}
+    assert device.name is None
@@ -2,7 +2,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from app.core.exceptions import NotFoundException
+from app.core.exceptions import BatchDeviceValidationException, NotFoundException
 from app.validators.devices import DeviceValidator
 
 
@@ -63,3 +63,37 @@ def test_validate_device_access_success(device_validator, device_repository):
             mock_logger.info.assert_called_once_with(
                 f"Authorized access to device {device_id} by org current_org_id"
             )
+
+
+def test_validate_devices_access_checks_distinct_ids_in_one_query(
+    device_validator, device_repository
+):
+    device_repository.get_owned_device_ids.return_value = ["device_1", "device_2"]
+
+    device_validator.validate_devices_access(
+        ["device_1", "device_2", "device_1"], "current_org_id"
+    )
+
+    device_repository.get_owned_device_ids.assert_called_once()
+    org_id, device_ids = device_repository.get_owned_device_ids.call_args.args
+    assert org_id == "current_org_id"
+    assert sorted(device_ids) == ["device_1", "device_2"]
+    device_repository.get.assert_not_called()
+
+
+def test_validate_devices_access_reports_every_failing_id(
+    device_validator, device_repository
+):
+    device_repository.get_owned_device_ids.return_value = ["device_1"]
+
+    with patch("app.validators.devices.get_org_id", return_value="current_org_id"):
+        with pytest.raises(BatchDeviceValidationException) as excinfo:
+            device_validator.validate_devices_access(
+                ["device_3", "device_1", "device_2"]
+            )
+
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.details == {
+        "invalid_devices": ["device_2", "device_3"],
+        "org_id": "current_org_id",
+    }
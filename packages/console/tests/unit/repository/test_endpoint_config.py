@@ -58,7 +58,7 @@ def test_endpoint_config_repository_create(
         assert result.config == config.config
         mock_db.add.assert_called_once()
         mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once()
+        mock_db.refresh.assert_not_called()
 
 
 def test_endpoint_config_repository_get(
@@ -117,7 +117,7 @@ def test_endpoint_config_repository_update(
     assert "Analysis" in result.config  # Ensure old config sections are retained
     mock_db.add.assert_called_once_with(existing_config)
     mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(existing_config)
+    mock_db.refresh.assert_not_called()
 
 
 def test_endpoint_config_repository_delete(
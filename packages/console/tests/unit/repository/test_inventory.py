@@ -1,8 +1,12 @@
 from unittest.mock import Mock
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from app.models import Application, Inventory
+from app.models import ApprovalStatus as ModelApprovalStatus
+from app.repositories import inventory as inventory_module
+from app.schemas.application import ApplicationBase
 from app.schemas.inventory import (
     ApplicationCreate,
     InventoryCreate,
@@ -157,6 +161,63 @@ def test_remove_inventory_item_no_match(inventory_repository, mock_db):
     mock_filter.delete.assert_called_once()
 
 
+def compile_postgres(statement):
+    return statement.compile(dialect=postgresql.dialect())
+
+
+def test_insert_applications_skips_conflicting_rows(inventory_repository, mock_db):
+    created = [Mock(spec=Application)]
+    mock_db.scalars.return_value.all.return_value = created
+    apps = [
+        ApplicationBase(name="App1", version="1.0", publisher="pub", hash="hash1"),
+        ApplicationBase(name="App2", version="2.0", publisher="pub", hash="hash2"),
+    ]
+
+    result = inventory_repository.insert_applications("org_123", apps)
+
+    assert result == created
+    compiled = compile_postgres(mock_db.scalars.call_args[0][0])
+    assert "ON CONFLICT (organization_id, name, version, hash) DO NOTHING" in str(
+        compiled
+    )
+    assert "RETURNING applications.id" in str(compiled)
+    assert compiled.params["name_m1"] == "App2"
+    assert compiled.params["organization_id_m0"] == "org_123"
+
+
+def test_insert_inventory_items_uses_application_status(inventory_repository, mock_db):
+    mock_db.scalars.return_value.all.return_value = []
+    app = Mock(spec=Application, id="app_1", status=ApprovalStatus.APPROVED)
+
+    inventory_repository.insert_inventory_items("device_123", [app])
+
+    compiled = compile_postgres(mock_db.scalars.call_args[0][0])
+    assert "ON CONFLICT (device_id, application_id) DO NOTHING" in str(compiled)
+    assert compiled.params["application_id_m0"] == "app_1"
+    assert compiled.params["status_m0"] == ApprovalStatus.APPROVED
+
+
+def test_bulk_statements_are_chunked(inventory_repository, mock_db, monkeypatch):
+    monkeypatch.setattr(inventory_module, "BULK_CHUNK_SIZE", 2)
+    mock_db.scalars.return_value.all.return_value = []
+    apps = [
+        ApplicationBase(name=f"App{n}", version="1.0", publisher="pub", hash="hash")
+        for n in range(5)
+    ]
+
+    inventory_repository.insert_applications("org_123", apps)
+
+    assert mock_db.scalars.call_count == 3
+
+
+def test_bulk_statements_skip_empty_input(inventory_repository, mock_db):
+    assert inventory_repository.get_applications_by_keys("org_123", []) == []
+    assert inventory_repository.insert_inventory_items("device_123", []) == []
+
+    mock_db.query.assert_not_called()
+    mock_db.scalars.assert_not_called()
+
+
 def test_commit(inventory_repository, mock_db):
     inventory_repository.commit()
     mock_db.commit.assert_called_once()
@@ -198,3 +259,19 @@ def test_delete(inventory_repository, mock_db):
     assert result == mock_inventory
     mock_db.delete.assert_called_once_with(mock_inventory)
     mock_db.commit.assert_called_once()
+
+
+def test_set_status_for_applications_updates_matching_rows(
+    inventory_repository, mock_db
+):
+    mock_db.execute.return_value.rowcount = 3
+
+    result = inventory_repository.set_status_for_applications(
+        ["app_1"], [ModelApprovalStatus.PENDING], ModelApprovalStatus.APPROVED
+    )
+
+    assert result == 3
+    compiled = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    assert "approved_at=now()" in str(compiled)
+    assert "inventories.status IN" in str(compiled)
+    mock_db.commit.assert_not_called()
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+
+from app.repositories.partitions import (
+    MonthlyPartitionRepository,
+    add_months,
+    month_start,
+    upper_bound,
+)
+
+NOW = datetime(2026, 11, 17, 9, 30, tzinfo=timezone.utc)
+
+
+def bound(start, stop):
+    return f"FOR VALUES FROM ('{start}') TO ('{stop}')"
+
+
+def repository_with(partitions):
+    db = Mock()
+    db.execute.side_effect = lambda statement, *args: (partitions if args else Mock())
+    return MonthlyPartitionRepository(db, "activity_logs"), db
+
+
+def ddl(db):
+    return [
+        str(call.args[0])
+        for call in db.execute.call_args_list
+        if not call.args[1:] and "lock_timeout" not in str(call.args[0])
+    ]
+
+
+def test_month_arithmetic_rolls_over_years():
+    assert month_start(NOW) == datetime(2026, 11, 1, tzinfo=timezone.utc)
+    assert add_months(month_start(NOW), 2) == datetime(2027, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        (
+            bound("2026-11-01 00:00:00+00", "2026-12-01 00:00:00+00"),
+            datetime(2026, 12, 1, tzinfo=timezone.utc),
+        ),
+        # Bounds are printed in the session time zone
+        (
+            "FOR VALUES FROM (MINVALUE) TO ('2026-10-31 20:00:00-04')",
+            datetime(2026, 11, 1, tzinfo=timezone.utc),
+        ),
+        ("FOR VALUES FROM ('2026-11-01 00:00:00+00') TO (MAXVALUE)", None),
+        ("DEFAULT", None),
+    ],
+)
+def test_upper_bound_reads_partition_expression(expression, expected):
+    assert upper_bound(expression) == expected
+    if expected is not None:
+        assert upper_bound(expression).tzinfo == timezone.utc
+
+
+def test_create_ahead_continues_after_the_last_partition():
+    repository, db = repository_with(
+        [
+            (
+                "activity_logs_legacy",
+                "FOR VALUES FROM (MINVALUE) TO ('2026-12-01 00:00:00+00')",
+            ),
+            (
+                "activity_logs_p2026_12",
+                bound("2026-12-01 00:00:00+00", "2027-01-01 00:00:00+00"),
+            ),
+        ]
+    )
+
+    created = repository.create_ahead(NOW, months_ahead=3)
+
+    assert created == ["activity_logs_p2027_01", "activity_logs_p2027_02"]
+    statements = ddl(db)
+    assert statements[0] == (
+        'CREATE TABLE IF NOT EXISTS "activity_logs_p2027_01" PARTITION OF '
+        "\"activity_logs\" FOR VALUES FROM ('2027-01-01T00:00:00+00:00') "
+        "TO ('2027-02-01T00:00:00+00:00')"
+    )
+    # Each partition is created in its own short, lock-bounded transaction
+    assert db.commit.call_count == 2
+
+
+def test_create_ahead_starts_at_the_current_month_after_a_gap():
+    repository, _ = repository_with(
+        [
+            (
+                "activity_logs_p2026_01",
+                bound("2026-01-01 00:00:00+00", "2026-02-01 00:00:00+00"),
+            )
+        ]
+    )
+
+    created = repository.create_ahead(NOW, months_ahead=1)
+
+    assert created == ["activity_logs_p2026_11", "activity_logs_p2026_12"]
+
+
+def test_create_ahead_reads_bounds_printed_in_another_time_zone():
+    # A legacy bound printed by a session outside UTC
+    repository, db = repository_with(
+        [
+            (
+                "activity_logs_legacy",
+                "FOR VALUES FROM (MINVALUE) TO ('2026-11-30 19:00:00-05')",
+            )
+        ]
+    )
+
+    created = repository.create_ahead(NOW, months_ahead=1)
+
+    assert created == ["activity_logs_p2026_12"]
+    assert "FROM ('2026-12-01T00:00:00+00:00')" in ddl(db)[0]
+
+
+def test_create_ahead_moves_rows_out_of_the_default_partition():
+    repository, db = repository_with(
+        [
+            (
+                "activity_logs_p2026_09",
+                bound("2026-09-01 00:00:00+00", "2026-10-01 00:00:00+00"),
+            ),
+            ("activity_logs_default", "DEFAULT"),
+        ]
+    )
+
+    created = repository.create_ahead(NOW, months_ahead=0)
+
+    # The months the stalled job missed are filled, not skipped
+    assert created == ["activity_logs_p2026_10", "activity_logs_p2026_11"]
+    assert ddl(db)[:3] == [
+        'CREATE TABLE "activity_logs_p2026_10" '
+        '(LIKE "activity_logs" INCLUDING DEFAULTS)',
+        'WITH moved AS (DELETE FROM "activity_logs_default" '
+        "WHERE created_at >= '2026-10-01T00:00:00+00:00' "
+        "AND created_at < '2026-11-01T00:00:00+00:00' RETURNING *) "
+        'INSERT INTO "activity_logs_p2026_10" SELECT * FROM moved',
+        'ALTER TABLE "activity_logs" ATTACH PARTITION "activity_logs_p2026_10" '
+        "FOR VALUES FROM ('2026-10-01T00:00:00+00:00') "
+        "TO ('2026-11-01T00:00:00+00:00')",
+    ]
+    # Each move happens in one transaction with its partition's creation
+    assert db.commit.call_count == 2
+
+
+def test_remove_before_drops_only_fully_expired_partitions():
+    repository, db = repository_with(
+        [
+            (
+                "activity_logs_legacy",
+                "FOR VALUES FROM (MINVALUE) TO ('2026-09-01 00:00:00+00')",
+            ),
+            (
+                "activity_logs_p2026_09",
+                bound("2026-09-01 00:00:00+00", "2026-10-01 00:00:00+00"),
+            ),
+            ("activity_logs_default", "DEFAULT"),
+        ]
+    )
+
+    removed = repository.remove_before(NOW - timedelta(days=60))
+
+    assert removed == ["activity_logs_legacy"]
+    assert ddl(db) == ['DROP TABLE "activity_logs_legacy"']
+
+
+def test_remove_before_can_detach_for_archiving():
+    repository, db = repository_with(
+        [
+            (
+                "activity_logs_p2026_09",
+                bound("2026-09-01 00:00:00+00", "2026-10-01 00:00:00+00"),
+            )
+        ]
+    )
+
+    repository.remove_before(NOW, detach=True)
+
+    assert ddl(db) == [
+        'ALTER TABLE "activity_logs" DETACH PARTITION "activity_logs_p2026_09"'
+    ]
+
+
+def test_failed_partition_change_is_rolled_back():
+    repository, db = repository_with(
+        [
+            (
+                "activity_logs_p2026_09",
+                bound("2026-09-01 00:00:00+00", "2026-10-01 00:00:00+00"),
+            )
+        ]
+    )
+    db.commit.side_effect = RuntimeError("lock timeout")
+
+    with pytest.raises(RuntimeError):
+        repository.remove_before(NOW)
+
+    db.rollback.assert_called_once()
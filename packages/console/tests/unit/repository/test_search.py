@@ -0,0 +1,30 @@
+from sqlalchemy.dialects import postgresql
+
+from app.models import Device
+from app.repositories.search import escape_like, text_search
+
+
+def compile_filter(clause):
+    compiled = clause.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_long_terms_match_anywhere_in_the_value():
+    sql, params = compile_filter(text_search(Device.name, "  laptop "))
+
+    assert sql == "devices.name ILIKE %(name_1)s ESCAPE '\\\\'"
+    assert params == {"name_1": "%laptop%"}
+
+
+def test_short_terms_fall_back_to_prefix_search():
+    _, params = compile_filter(text_search(Device.name, "ab"))
+
+    assert params == {"name_1": "ab%"}
+
+
+def test_wildcards_in_the_term_are_matched_literally():
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+
+    _, params = compile_filter(text_search(Device.serial_number, "a_%"))
+
+    assert params == {"serial_number_1": "%a\\_\\%%"}
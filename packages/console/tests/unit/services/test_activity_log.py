@@ -1,12 +1,15 @@
 import pytest
 from datetime import datetime, timezone
 from unittest.mock import Mock
+from app.schemas.common import CountMode
 from app.schemas.activity_logs import (
     ActivityLogCreate,
     ActivityLogResponse,
     ActivityLogsListResponse,
 )
+from app.core.exceptions import ValidationException
 from app.services.activity_logs import ActivityLogService
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.models import ActivityLog, SeverityLevel
 
 
@@ -93,9 +96,11 @@ class TestActivityLogService:
         assert result[0].activity_type == sample_activity_log.activity_type
         assert result[0].severity == sample_activity_log.severity
         assert result[0].details == sample_activity_log.details
-        activity_log_service.validator.validate_device_access.assert_called_once_with(
-            "device123"
+        device_ids, org_id = (
+            activity_log_service.validator.validate_devices_access.call_args.args
         )
+        assert list(device_ids) == ["device123"]
+        assert org_id == "test_org_id"
         activity_log_service.repository.create_activity_logs.assert_called_once_with(
             logs_to_create, "test_org_id"
         )
@@ -144,6 +149,10 @@ class TestActivityLogService:
             severity="MEDIUM",
             skip=10,
             limit=50,
+            cursor=None,
+            since=None,
+            include_total=True,
+            count_mode=CountMode.EXACT,
         )
 
     def test_get_activity_logs_with_filters_empty_result(self, activity_log_service):
@@ -194,6 +203,10 @@ class TestActivityLogService:
             severity="MEDIUM",
             skip=10,
             limit=50,
+            cursor=None,
+            since=None,
+            include_total=True,
+            count_mode=CountMode.EXACT,
         )
 
     def test_convert_to_response(self, activity_log_service, sample_activity_log):
@@ -209,3 +222,49 @@ class TestActivityLogService:
         assert result.severity == sample_activity_log.severity
         assert result.details == sample_activity_log.details
         assert result.created_at == sample_activity_log.created_at
+
+    def test_get_activity_logs_with_cursor_returns_next_cursor(
+        self, activity_log_service, sample_activity_log
+    ):
+        # Arrange: a full page means there may be more
+        activity_log_service.repository.get_activity_logs_by_filters.return_value = (
+            [(sample_activity_log, "Test Device")],
+            None,
+        )
+        cursor = encode_cursor(sample_activity_log.created_at, "previous")
+
+        # Act
+        result = activity_log_service.get_activity_logs_with_filters(
+            org_id="test_org_id", limit=1, cursor=cursor, include_total=False
+        )
+
+        # Assert
+        kwargs = activity_log_service.repository.get_activity_logs_by_filters.call_args
+        assert kwargs.kwargs["cursor"] == (sample_activity_log.created_at, "previous")
+        assert kwargs.kwargs["include_total"] is False
+        assert result.total_count is None
+        assert decode_cursor(result.next_cursor) == (
+            sample_activity_log.created_at,
+            sample_activity_log.id,
+        )
+
+    def test_get_activity_logs_last_page_has_no_cursor(
+        self, activity_log_service, sample_activity_log
+    ):
+        activity_log_service.repository.get_activity_logs_by_device.return_value = (
+            [(sample_activity_log, "Test Device")],
+            1,
+        )
+
+        result = activity_log_service.get_activity_logs_by_device(
+            device_id="device123", org_id="test_org_id", limit=50
+        )
+
+        assert result.next_cursor is None
+
+    def test_invalid_cursor_is_rejected(self, activity_log_service):
+        with pytest.raises(ValidationException):
+            activity_log_service.get_activity_logs_with_filters(
+                org_id="test_org_id", cursor="not-a-cursor"
+            )
+        activity_log_service.repository.get_activity_logs_by_filters.assert_not_called()
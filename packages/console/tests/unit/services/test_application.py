@@ -5,6 +5,7 @@ import pytest
 from app.models import Application
 
 # from app.repositories.application import ApplicationRepository
+from app.schemas.common import CountMode
 from app.schemas.application import (
     ApplicationCreate,
     ApprovalStatus,
@@ -137,7 +138,12 @@ def test_get_by_org(
     result = application_service.get_by_org(org_id, search, status, skip=5, limit=20)
 
     mock_application_repository.get_by_org.assert_called_once_with(
-        org_id=org_id, search=search, skip=5, limit=20, status=status
+        org_id=org_id,
+        search=search,
+        skip=5,
+        limit=20,
+        status=status,
+        count_mode=CountMode.EXACT,
     )
     assert result == ApplicationListResponse(
         applications=mock_applications, message=None, total_count=total_count
@@ -178,5 +184,10 @@ def test_get_by_org_default_params(
     )
     application_service.get_by_org(org_id, search, status, skip=5, limit=20)
     mock_application_repository.get_by_org.assert_called_once_with(
-        org_id=org_id, search=search, skip=5, limit=20, status=status
+        org_id=org_id,
+        search=search,
+        skip=5,
+        limit=20,
+        status=status,
+        count_mode=CountMode.EXACT,
     )
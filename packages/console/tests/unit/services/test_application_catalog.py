@@ -0,0 +1,136 @@
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.context import set_org_id
+from app.models import Application, ApprovalStatus, Device, Inventory
+from app.schemas.inventory import ApplicationBase, InventoryCreate
+from app.services.application_catalog import (
+    ApplicationCatalog,
+    CatalogEntry,
+    SQLiteGenerationStore,
+)
+from app.services.inventory import InventoryService
+
+KEY = ("App1", "1.0", "hash1")
+
+
+def make_application(app_id="app_1", status=ApprovalStatus.PENDING):
+    application = Mock(
+        spec=Application,
+        id=app_id,
+        version="1.0",
+        publisher="pub1",
+        hash="hash1",
+        status=status,
+        organization_id="org_1",
+    )
+    application.name = "App1"
+    return application
+
+
+@pytest.fixture
+def catalog():
+    return ApplicationCatalog(maxsize=100, ttl=60)
+
+
+def test_catalog_returns_entries_cached_under_current_generation(catalog):
+    generation = catalog.generation("org_1")
+    assert catalog.get_many("org_1", generation, [KEY]) == {}
+
+    catalog.put_many("org_1", generation, [make_application()])
+
+    entry = catalog.get_many("org_1", generation, [KEY])[KEY]
+    assert entry == CatalogEntry(
+        "app_1", "App1", "1.0", "pub1", "hash1", ApprovalStatus.PENDING, "org_1"
+    )
+    # Other organizations never see the entry
+    assert catalog.get_many("org_2", catalog.generation("org_2"), [KEY]) == {}
+
+
+def test_invalidate_hides_entries_of_the_organization(catalog):
+    generation = catalog.generation("org_1")
+    catalog.put_many("org_1", generation, [make_application()])
+
+    catalog.invalidate("org_1")
+
+    assert catalog.get_many("org_1", catalog.generation("org_1"), [KEY]) == {}
+    assert catalog.stats()["invalidations"] == 1
+
+
+def test_rows_read_before_an_invalidation_are_not_cached(catalog):
+    generation = catalog.generation("org_1")
+    catalog.invalidate("org_1")
+
+    catalog.put_many("org_1", generation, [make_application()])
+
+    assert catalog.get_many("org_1", catalog.generation("org_1"), [KEY]) == {}
+
+
+def test_shared_store_keeps_workers_coherent(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    worker_a = ApplicationCatalog(100, 60, generations=SQLiteGenerationStore(path))
+    worker_b = ApplicationCatalog(100, 60, generations=SQLiteGenerationStore(path))
+    worker_a.put_many("org_1", worker_a.generation("org_1"), [make_application()])
+
+    worker_b.invalidate("org_1")
+
+    assert worker_a.get_many("org_1", worker_a.generation("org_1"), [KEY]) == {}
+
+
+def test_create_inventory_reads_no_applications_once_cached(
+    catalog, mock_inventory_repository, mock_device_repository
+):
+    set_org_id("org_1")
+    mock_device_repository.get.return_value = Mock(spec=Device, org_id="org_1")
+    mock_inventory_repository.get_applications_by_keys.return_value = [
+        make_application()
+    ]
+    mock_inventory_repository.get_device_inventory_for_applications.return_value = []
+    mock_inventory_repository.insert_inventory_items.return_value = [
+        Mock(spec=Inventory, application_id="app_1")
+    ]
+    service = InventoryService(
+        mock_inventory_repository,
+        mock_device_repository,
+        Mock(),
+        catalog=catalog,
+    )
+    service._convert_to_response = Mock()
+    inventory = InventoryCreate(
+        items=[
+            ApplicationBase(name="App1", version="1.0", publisher="pub1", hash="hash1")
+        ]
+    )
+
+    service.create_inventory("device_1", inventory)
+    service.create_inventory("device_2", inventory)
+
+    mock_inventory_repository.get_applications_by_keys.assert_called_once()
+    mock_inventory_repository.insert_applications.assert_not_called()
+    entry = mock_inventory_repository.insert_inventory_items.call_args[0][1][0]
+    assert isinstance(entry, CatalogEntry)
+    assert entry.id == "app_1"
+
+
+def test_bulk_decision_invalidates_the_catalog(
+    catalog, mock_inventory_repository, mock_application_repository
+):
+    set_org_id("org_1")
+    catalog.put_many("org_1", catalog.generation("org_1"), [make_application()])
+    mock_application_repository.lock_statuses.return_value = {
+        "app_1": ApprovalStatus.PENDING
+    }
+    mock_application_repository.set_status.return_value = [
+        make_application(status=ApprovalStatus.APPROVED)
+    ]
+    service = InventoryService(
+        mock_inventory_repository,
+        Mock(),
+        mock_application_repository,
+        catalog=catalog,
+    )
+
+    service.approve_applications(["app_1"])
+
+    assert catalog.get_many("org_1", catalog.generation("org_1"), [KEY]) == {}
@@ -0,0 +1,81 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.models import ApprovalStatus
+from app.repositories.application import ApplicationRepository
+from app.services.application_catalog import ApplicationCatalog
+from app.services.application_policy import ApplicationPolicyService, etag_matches
+
+
+@pytest.fixture
+def repository():
+    repository = Mock(spec=ApplicationRepository)
+    repository.get_decided_hashes.return_value = [
+        ("hash_a", ApprovalStatus.APPROVED),
+        ("hash_b", ApprovalStatus.DENIED),
+        ("hash_c", ApprovalStatus.APPROVED),
+        ("hash_c", ApprovalStatus.DENIED),
+    ]
+    return repository
+
+
+@pytest.fixture
+def catalog():
+    return ApplicationCatalog(maxsize=10, ttl=60)
+
+
+@pytest.fixture
+def policy_service(repository, catalog):
+    return ApplicationPolicyService(repository, catalog, TTLCache(maxsize=10, ttl=60))
+
+
+def test_get_policy_lists_sorted_decisions_with_deny_winning(policy_service):
+    artifact = policy_service.get_policy("org_1")
+
+    body = json.loads(artifact.body)
+    assert body["approved"] == ["hash_a"]
+    assert body["denied"] == ["hash_b", "hash_c"]
+    assert body["organization_id"] == "org_1"
+    assert artifact.etag == f'"{body["version"]}"'
+
+
+def test_get_policy_is_built_once_per_generation(policy_service, repository, catalog):
+    first = policy_service.get_policy("org_1")
+    assert policy_service.get_policy("org_1") is first
+    repository.get_decided_hashes.assert_called_once_with("org_1")
+
+    catalog.invalidate("org_1")
+    rebuilt = policy_service.get_policy("org_1")
+
+    assert repository.get_decided_hashes.call_count == 2
+    # Same decisions, same version, so agents holding the old ETag get a 304
+    assert rebuilt.etag == first.etag
+
+
+def test_get_policy_version_changes_with_decisions(policy_service, repository, catalog):
+    before = policy_service.get_policy("org_1")
+    repository.get_decided_hashes.return_value = [("hash_a", ApprovalStatus.DENIED)]
+    catalog.invalidate("org_1")
+
+    after = policy_service.get_policy("org_1")
+
+    assert after.etag != before.etag
+    assert json.loads(after.body)["denied"] == ["hash_a"]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other", "abc"', True),
+        ("*", True),
+        ('"other"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
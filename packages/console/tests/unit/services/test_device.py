@@ -1,5 +1,6 @@
+import asyncio
 from datetime import datetime, timezone
-from unittest.mock import Mock, PropertyMock
+from unittest.mock import ANY, Mock, PropertyMock, patch
 import pytest
 
 from app.core.exceptions import (
@@ -8,9 +9,18 @@ from app.core.exceptions import (
     ObjectNotFoundException,
 )
 from app.models.device import Device
-from app.schemas.device import DeviceCreate, DeviceInDB, DeviceTypes, DeviceUpdate
+from app.schemas.common import CountMode
+from app.schemas.device import (
+    DeviceCreate,
+    DeviceHeartbeat,
+    DeviceInDB,
+    DeviceTypes,
+    DeviceUpdate,
+)
 from app.schemas.endpoint_config import EndpointConfigCreate
+from app.services.device import AsyncDeviceService, DeviceService
 from app.services.endpoint_config_converter import DEFAULT_CONFIG
+from app.services.heartbeat_buffer import HeartbeatBuffer
 
 
 def test_get(device_service):
@@ -137,7 +147,10 @@ def test_create_device_success(device_service, mock_endpoint_config_repository):
     device_service.repository.get_by_serial_number.assert_called_once_with(
         "test-serial", "test-org-id"
     )
-    device_service.repository.create.assert_called_once_with(device_create)
+    device_service.repository.create.assert_called_once_with(
+        device_create, last_seen=ANY
+    )
+    device_service.repository.update.assert_not_called()
 
     # Check if endpoint config was created
     device_service.endpoint_config_service.create_endpoint_config.assert_called_once()
@@ -317,6 +330,7 @@ def test_get_devices_by_org_with_count(device_service):
         skip=0,
         limit=10,
         health=None,
+        count_mode=CountMode.EXACT,
     )
 
 
@@ -496,9 +510,192 @@ def test_create_device_with_initial_status(
     assert result.org_id == mock_device.org_id
     assert result.properties == mock_device.properties
     device_service.repository.create.assert_called_once()
-    device_service.repository.update.assert_called_once()
+    device_service.repository.update.assert_not_called()
+
+    # Verify last_seen was set by the insert itself
+    assert device_service.repository.create.call_args.kwargs["last_seen"] is not None
+
+
+def test_bulk_update_heartbeats(device_service, mock_device_repository):
+    # Arrange
+    mock_device_repository.bulk_update_heartbeats.return_value = ["1"]
+    heartbeats = [
+        DeviceHeartbeat(device_id="1", properties={"cpu": 10}),
+        DeviceHeartbeat(device_id="2"),
+        DeviceHeartbeat(device_id="1", properties={"cpu": 20}),
+    ]
+
+    # Act
+    response = device_service.bulk_update_heartbeats("org1", heartbeats)
+
+    # Assert
+    org_id, heartbeats = mock_device_repository.bulk_update_heartbeats.call_args[0]
+    assert org_id == "org1"
+    assert heartbeats["1"][1]["cpu"] == 20
+    assert heartbeats["2"][1] == {}
+    assert heartbeats["1"][0].tzinfo is not None
+    assert [(r.device_id, r.status) for r in response.results] == [
+        ("1", "updated"),
+        ("2", "not_found"),
+    ]
+    assert response.updated == 1
+    assert response.not_found == 1
+
+
+def test_bulk_update_heartbeats_write_behind(
+    mock_device_repository, mock_endpoint_config_repository
+):
+    # Arrange
+    buffer = HeartbeatBuffer(session_factory=Mock())
+    service = DeviceService(
+        mock_device_repository, mock_endpoint_config_repository, buffer
+    )
+    mock_device_repository.get_owned_device_ids.return_value = ["1"]
+
+    # Act
+    response = service.bulk_update_heartbeats(
+        "org1",
+        [
+            DeviceHeartbeat(device_id="1", properties={"cpu": 10}),
+            DeviceHeartbeat(device_id="2"),
+        ],
+    )
+
+    # Assert
+    mock_device_repository.bulk_update_heartbeats.assert_not_called()
+    assert response.updated == 1
+    assert buffer.get("1").properties["cpu"] == 10
+    assert buffer.get("2") is None
+
+
+def test_record_heartbeat_write_behind_serves_reads_from_buffer(
+    mock_device_repository, mock_endpoint_config_repository
+):
+    # Arrange
+    buffer = HeartbeatBuffer(session_factory=Mock())
+    service = DeviceService(
+        mock_device_repository, mock_endpoint_config_repository, buffer
+    )
+    device = Device(
+        id="1",
+        org_id="org1",
+        name="Test Device",
+        type="Test",
+        serial_number="123",
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+        last_seen=None,
+        properties={},
+    )
+    service.validator.validate_device_access = Mock(return_value=device)
+    mock_device_repository.get.return_value = device
+
+    # Act
+    response = service.record_heartbeat("1", {"cpu": 42.0})
+
+    # Assert
+    mock_device_repository.update.assert_not_called()
+    assert response.properties == {"cpu": 42.0}
+    assert response.is_active == "ONLINE"
+    assert service.get("1").properties == {"cpu": 42.0}
+
 
-    # Verify last_seen was set
-    update_call = device_service.repository.update.call_args[0]
-    assert isinstance(update_call[1], DeviceUpdate)
-    assert update_call[1].last_seen is not None
+def agent_device(**overrides):
+    fields = dict(
+        id="1",
+        org_id="org1",
+        name="Test Device",
+        type="Test",
+        serial_number="123",
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+        last_seen=None,
+        properties={},
+    )
+    return Device(**{**fields, **overrides})
+
+
+def test_async_record_heartbeat_updates_the_validated_device(
+    mock_async_device_repository,
+):
+    # Arrange
+    device = agent_device()
+    mock_async_device_repository.get.return_value = device
+    mock_async_device_repository.update.return_value = agent_device(
+        last_seen=datetime.now(timezone.utc), properties={"cpu": 42.0}
+    )
+    service = AsyncDeviceService(mock_async_device_repository)
+
+    # Act
+    with patch("app.validators.devices.get_org_id", return_value="org1"):
+        response = asyncio.run(service.record_heartbeat("1", {"cpu": 42.0}))
+
+    # Assert
+    mock_async_device_repository.get.assert_awaited_once_with("1")
+    device_id, update = mock_async_device_repository.update.call_args[0]
+    assert device_id == "1"
+    assert update.properties == {"cpu": 42.0}
+    assert isinstance(response, DeviceInDB)
+    assert response.properties == {"cpu": 42.0}
+
+
+def test_async_record_heartbeat_rejects_another_organizations_device(
+    mock_async_device_repository,
+):
+    mock_async_device_repository.get.return_value = agent_device(org_id="org2")
+    service = AsyncDeviceService(mock_async_device_repository)
+
+    with patch("app.validators.devices.get_org_id", return_value="org1"):
+        with pytest.raises(NotFoundException):
+            asyncio.run(service.record_heartbeat("1", {"cpu": 42.0}))
+
+    mock_async_device_repository.update.assert_not_awaited()
+
+
+def test_async_bulk_update_heartbeats(mock_async_device_repository):
+    # Arrange
+    mock_async_device_repository.bulk_update_heartbeats.return_value = ["1"]
+    service = AsyncDeviceService(mock_async_device_repository)
+
+    # Act
+    response = asyncio.run(
+        service.bulk_update_heartbeats(
+            "org1",
+            [
+                DeviceHeartbeat(device_id="1", properties={"cpu": 10}),
+                DeviceHeartbeat(device_id="2"),
+            ],
+        )
+    )
+
+    # Assert
+    call = mock_async_device_repository.bulk_update_heartbeats.call_args
+    org_id, heartbeats = call.args
+    assert org_id == "org1"
+    assert heartbeats["1"][1]["cpu"] == 10
+    assert response.updated == 1
+    assert response.not_found == 1
+
+
+def test_async_bulk_update_heartbeats_write_behind(mock_async_device_repository):
+    # Arrange
+    buffer = HeartbeatBuffer(session_factory=Mock())
+    service = AsyncDeviceService(mock_async_device_repository, buffer)
+    mock_async_device_repository.get_owned_device_ids.return_value = ["1"]
+
+    # Act
+    response = asyncio.run(
+        service.bulk_update_heartbeats(
+            "org1",
+            [
+                DeviceHeartbeat(device_id="1", properties={"cpu": 10}),
+                DeviceHeartbeat(device_id="2"),
+            ],
+        )
+    )
+
+    # Assert
+    mock_async_device_repository.bulk_update_heartbeats.assert_not_awaited()
+    assert response.updated == 1
+    assert buffer.get("1").properties["cpu"] == 10
+    assert buffer.get("2") is None
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.heartbeat_buffer import HeartbeatBuffer
+
+
+@pytest.fixture
+def session():
+    session = Mock(spec=Session)
+    session.execute.return_value.scalars.return_value = []
+    return session
+
+
+@pytest.fixture
+def buffer(session):
+    return HeartbeatBuffer(session_factory=lambda: session)
+
+
+def test_record_keeps_latest_heartbeat_per_device(buffer):
+    first = datetime.now(timezone.utc)
+    second = first + timedelta(seconds=10)
+
+    buffer.record("org1", "1", first, {"cpu": 10})
+    buffer.record("org1", "1", second, {"cpu": 20})
+
+    assert len(buffer) == 1
+    assert buffer.get("1").last_seen == second
+    assert buffer.get("1").properties == {"cpu": 20}
+
+
+def test_flush_writes_one_statement_per_org(buffer, session):
+    now = datetime.now(timezone.utc)
+    buffer.record("org1", "1", now, {"cpu": 10})
+    buffer.record("org1", "2", now, {})
+    buffer.record("org2", "3", now, {})
+
+    assert buffer.flush() == 3
+
+    assert session.execute.call_count == 2
+    assert session.commit.call_count == 2
+    session.close.assert_called_once()
+    assert len(buffer) == 0
+    assert buffer.flush() == 0
+
+
+def test_failed_flush_requeues_without_overwriting_newer(buffer, session):
+    older = datetime.now(timezone.utc)
+    newer = older + timedelta(seconds=10)
+    buffer.record("org1", "1", older, {"cpu": 10})
+    buffer.record("org1", "2", older, {"cpu": 10})
+
+    def fail(*args, **kwargs):
+        # A heartbeat arrives while the flush is in progress
+        buffer.record("org1", "1", newer, {"cpu": 20})
+        raise RuntimeError("database unavailable")
+
+    session.execute.side_effect = fail
+
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+
+    session.rollback.assert_called_once()
+    assert buffer.get("1").last_seen == newer
+    assert buffer.get("2").last_seen == older
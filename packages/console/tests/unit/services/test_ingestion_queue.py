@@ -0,0 +1,136 @@
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.exceptions import ServiceUnavailableException
+from app.models import SeverityLevel
+from app.schemas.activity_logs import ActivityLogCreate
+from app.services import ingestion_queue as ingestion_queue_module
+from app.services.ingestion_queue import IngestionKind, IngestionQueue
+
+
+def make_logs(count, device_id="device_1"):
+    return [
+        ActivityLogCreate(
+            device_id=device_id,
+            activity_type="RANSOMWARE",
+            severity=SeverityLevel.HIGH,
+            details={"sequence": number},
+        )
+        for number in range(count)
+    ]
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Record what the drainer writes instead of touching Postgres."""
+    calls = []
+
+    def write(db, items, org_id):
+        if any(item.device_id == "poison" for item in items):
+            raise RuntimeError("constraint violation")
+        calls.append((org_id, items))
+
+    monkeypatch.setitem(
+        ingestion_queue_module.INGESTION_KINDS,
+        "activity_logs",
+        IngestionKind(ActivityLogCreate, write),
+    )
+    return calls
+
+
+def make_queue(tmp_path, **kwargs):
+    options = {"max_depth": 100, "batch_size": 10, "claim_timeout": 60}
+    options.update(kwargs)
+    return IngestionQueue(str(tmp_path / "queue.db"), session_factory=Mock, **options)
+
+
+def test_drain_writes_requests_grouped_by_organization(tmp_path, writes):
+    queue = make_queue(tmp_path)
+    queue.enqueue("activity_logs", "org_1", make_logs(2))
+    queue.enqueue("activity_logs", "org_2", make_logs(1))
+    queue.enqueue("activity_logs", "org_1", make_logs(3))
+    assert queue.stats()["depth"] == 6
+
+    assert queue.drain() == 6
+
+    assert sorted((org_id, len(items)) for org_id, items in writes) == [
+        ("org_1", 5),
+        ("org_2", 1),
+    ]
+    assert writes[0][1][0].details == {"sequence": 0}
+    assert queue.stats() == {
+        "depth": 0,
+        "requests": 0,
+        "lag_seconds": 0.0,
+        "parked_requests": 0,
+    }
+
+
+def test_drain_takes_at_most_one_batch(tmp_path, writes):
+    queue = make_queue(tmp_path, batch_size=5)
+    for _ in range(3):
+        queue.enqueue("activity_logs", "org_1", make_logs(3))
+
+    assert queue.drain() == 3
+    assert queue.stats()["depth"] == 6
+
+
+def test_enqueue_rejects_when_queue_is_full(tmp_path, writes):
+    queue = make_queue(tmp_path, max_depth=4)
+    queue.enqueue("activity_logs", "org_1", make_logs(3))
+
+    with pytest.raises(ServiceUnavailableException) as exc_info:
+        queue.enqueue("activity_logs", "org_1", make_logs(2))
+
+    assert exc_info.value.status_code == 503
+    assert queue.stats()["depth"] == 3
+
+
+def test_queued_requests_survive_a_restart(tmp_path, writes):
+    make_queue(tmp_path).enqueue("activity_logs", "org_1", make_logs(2))
+
+    assert make_queue(tmp_path).drain() == 2
+    assert len(writes) == 1
+
+
+def test_failing_request_is_isolated_and_parked(tmp_path, writes):
+    queue = make_queue(tmp_path)
+    queue.enqueue("activity_logs", "org_1", make_logs(1, device_id="poison"))
+    queue.enqueue("activity_logs", "org_1", make_logs(2))
+
+    assert queue.drain() == 2
+    assert queue.stats()["requests"] == 1
+
+    for _ in range(ingestion_queue_module.MAX_ATTEMPTS - 1):
+        queue.drain()
+
+    assert queue.stats()["parked_requests"] == 1
+    assert queue.stats()["depth"] == 0
+    assert queue.drain() == 0
+
+
+def test_unreadable_request_is_parked_without_blocking_the_queue(tmp_path, writes):
+    queue = make_queue(tmp_path)
+    for _ in range(3):
+        queue.enqueue("activity_logs", "org_1", make_logs(1))
+    connection = queue._connect()
+    connection.execute("UPDATE ingestion_queue SET payload = '[{' WHERE seq = 1")
+    connection.execute("UPDATE ingestion_queue SET kind = 'retired' WHERE seq = 2")
+
+    assert queue.drain() == 1
+
+    assert queue.stats()["parked_requests"] == 2
+    assert queue.stats()["depth"] == 0
+
+
+def test_claimed_requests_are_not_drained_twice_until_the_lease_expires(
+    tmp_path, writes
+):
+    first = make_queue(tmp_path)
+    first.enqueue("activity_logs", "org_1", make_logs(1))
+    claimed = first._claim()
+    assert len(claimed) == 1
+
+    assert make_queue(tmp_path).drain() == 0
+    assert make_queue(tmp_path, claim_timeout=-1).drain() == 1
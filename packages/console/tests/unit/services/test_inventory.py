@@ -4,17 +4,25 @@ from unittest.mock import Mock, call
 import pytest
 
 from app.core.context import set_org_id
-from app.core.exceptions import NotFoundException, ObjectNotFoundException
+from app.core.exceptions import (
+    NotFoundException,
+    ObjectNotFoundException,
+    ValidationException,
+)
 from app.models import Application, ApprovalStatus, Device, Inventory
-from app.schemas.application import ApplicationResponse
+from app.schemas.application import ApplicationBase, ApplicationResponse
+from app.schemas.common import CountMode
 from app.schemas.inventory import (
     ApplicationCreate,
     InventoryCreate,
+    InventoryDiffSyncRequest,
     InventoryListResponse,
     InventoryResponse,
+    InventorySyncStatus,
     InventoryUpdate,
 )
 from app.services.inventory import InventoryService
+from app.utils.inventory_digest import inventory_digest
 
 
 @pytest.fixture
@@ -150,7 +158,7 @@ def test_get_device_inventory(inventory_service, mock_inventory_repository):
 
     # Assertions
     mock_inventory_repository.get_device_inventory.assert_called_once_with(
-        device_id, skip, limit, search, status
+        device_id, skip, limit, search, status, count_mode=CountMode.EXACT
     )
     inventory_service._convert_to_response.assert_has_calls(
         [call(inv) for inv in mock_inventories]
@@ -174,7 +182,7 @@ def test_get_device_inventory_not_found(inventory_service, mock_inventory_reposi
 
     assert str(exc_info.value) == f"No inventory found for device with id {device_id}"
     mock_inventory_repository.get_device_inventory.assert_called_once_with(
-        device_id, skip, limit, search, status
+        device_id, skip, limit, search, status, count_mode=CountMode.EXACT
     )
 
 
@@ -186,58 +194,80 @@ def test_create_inventory(
 ):
     set_org_id("org_123")
     device_id = "device_123"
-    # Mock device
-    mock_device = Mock(spec=Device, org_id="org_123")
+    mock_device_repository.get.return_value = Mock(spec=Device, org_id="org_123")
 
-    # Mock Application objects
+    # App1 is new to the organization, App2 is already known
     mock_app1 = Mock(spec=Application, id="app_id_1")
+    mock_app1.configure_mock(name="App1", version="1.0", hash="hash1")
     mock_app2 = Mock(spec=Application, id="app_id_2")
-
-    # Mock Inventory objects
-    mock_inventory_item1 = Mock(spec=Inventory)
-    mock_inventory_item2 = Mock(spec=Inventory)
-
-    # Mock InventoryResponse objects
-    mock_inventory_response1 = Mock(spec=InventoryResponse)
-    mock_inventory_response2 = Mock(spec=InventoryResponse)
-
-    # Set up mock behavior
-    mock_device_repository.get.return_value = mock_device
-    mock_inventory_repository.get_application_by_details.side_effect = [None, mock_app2]
-    mock_inventory_repository.create_application.return_value = mock_app1
-    mock_inventory_repository.create_inventory_item.side_effect = [
-        mock_inventory_item1,
-        mock_inventory_item2,
+    mock_app2.configure_mock(name="App2", version="2.0", hash="hash2")
+    mock_inventory_repository.get_applications_by_keys.return_value = [mock_app2]
+    mock_inventory_repository.insert_applications.return_value = [mock_app1]
+
+    # The device already lists App2
+    existing_item = Mock(spec=Inventory, application_id="app_id_2")
+    new_item = Mock(spec=Inventory, application_id="app_id_1")
+    mock_inventory_repository.get_device_inventory_for_applications.return_value = [
+        existing_item
     ]
-    mock_inventory_repository.get_device_inventory_by_application.return_value = []
+    mock_inventory_repository.insert_inventory_items.return_value = [new_item]
 
-    # Mock the _convert_to_response method
-    inventory_service._convert_to_response = Mock()
-    inventory_service._convert_to_response.side_effect = [
-        mock_inventory_response1,
-        mock_inventory_response2,
-    ]
+    created_response = Mock(spec=InventoryResponse)
+    existing_response = Mock(spec=InventoryResponse)
+    inventory_service._convert_to_response = Mock(
+        side_effect=[created_response, existing_response]
+    )
 
-    # Call the method under test
     result = inventory_service.create_inventory(device_id, sample_inventory_create)
 
-    # Assertions
-    assert mock_inventory_repository.get_application_by_details.call_count == 2
-    mock_inventory_repository.create_application.assert_called_once()
-    assert mock_inventory_repository.create_inventory_item.call_count == 2
+    mock_inventory_repository.get_applications_by_keys.assert_called_once_with(
+        "org_123", [("App1", "1.0", "hash1"), ("App2", "2.0", "hash2")]
+    )
+    inserted = mock_inventory_repository.insert_applications.call_args[0]
+    assert inserted[0] == "org_123"
+    assert [item.name for item in inserted[1]] == ["App1"]
+    mock_inventory_repository.get_device_inventory_for_applications.assert_called_once_with(
+        device_id, ["app_id_1", "app_id_2"]
+    )
+    mock_inventory_repository.insert_inventory_items.assert_called_once_with(
+        device_id, [mock_app1]
+    )
     mock_inventory_repository.commit.assert_called_once()
-
-    # Assert that _convert_to_response was called for each inventory item
     inventory_service._convert_to_response.assert_has_calls(
         [
-            call(mock_inventory_item1),
-            call(mock_inventory_item2),
+            call(new_item, application=mock_app1),
+            call(existing_item, isExisted=True, application=mock_app2),
         ]
     )
+    assert result == [created_response, existing_response]
 
-    # Assert that the result is a list of InventoryResponse objects
-    assert result == [mock_inventory_response1, mock_inventory_response2]
-    assert all(isinstance(item, InventoryResponse) for item in result)
+
+def test_create_inventory_looks_up_applications_inserted_concurrently(
+    inventory_service,
+    mock_inventory_repository,
+    sample_inventory_create,
+    mock_device_repository,
+):
+    set_org_id("org_123")
+    mock_device_repository.get.return_value = Mock(spec=Device, org_id="org_123")
+    mock_app1 = Mock(spec=Application, id="app_id_1")
+    mock_app1.configure_mock(name="App1", version="1.0", hash="hash1")
+    mock_app2 = Mock(spec=Application, id="app_id_2")
+    mock_app2.configure_mock(name="App2", version="2.0", hash="hash2")
+    # Another request inserts App2 between our lookup and our insert
+    mock_inventory_repository.get_applications_by_keys.side_effect = [[], [mock_app2]]
+    mock_inventory_repository.insert_applications.return_value = [mock_app1]
+    mock_inventory_repository.get_device_inventory_for_applications.return_value = []
+    mock_inventory_repository.insert_inventory_items.return_value = []
+
+    inventory_service.create_inventory("device_123", sample_inventory_create)
+
+    assert mock_inventory_repository.get_applications_by_keys.call_args_list[1] == call(
+        "org_123", [("App2", "2.0", "hash2")]
+    )
+    mock_inventory_repository.insert_inventory_items.assert_called_once_with(
+        "device_123", [mock_app1, mock_app2]
+    )
 
 
 def test_update_inventory(
@@ -246,6 +276,7 @@ def test_update_inventory(
     device_id = "device_123"
     set_org_id("org_123")
     mock_app = Mock(spec=Application, id="app_id_3", organization_id="org_123")
+    mock_app.configure_mock(name="App3", version="3.0", hash="hash3")
 
     # Create mock Inventory objects
     mock_inventory1 = Mock(spec=Inventory, id="inv_1", application=mock_app)
@@ -283,8 +314,8 @@ def test_update_inventory(
     )
 
     # Set up mock repository behavior
-    mock_inventory_repository.get_application_by_details.return_value = None
-    mock_inventory_repository.create_application.return_value = mock_app
+    mock_inventory_repository.get_applications_by_keys.return_value = []
+    mock_inventory_repository.insert_applications.return_value = [mock_app]
     mock_inventory_repository.get_device_inventory.return_value = mock_inventories, len(
         mock_inventories
     )
@@ -297,15 +328,19 @@ def test_update_inventory(
     result = inventory_service.update_inventory(device_id, sample_inventory_update)
 
     # Assertions
-    assert mock_inventory_repository.remove_inventory_item.call_count == 2
-    mock_inventory_repository.get_application_by_details.assert_called_once()
-    mock_inventory_repository.create_application.assert_called_once()
-    mock_inventory_repository.create_inventory_item.assert_called_once_with(
-        device_id, mock_app.id
+    mock_inventory_repository.remove_inventory_items.assert_called_once_with(
+        device_id, ["app_id_1", "app_id_2"]
+    )
+    mock_inventory_repository.get_applications_by_keys.assert_called_once_with(
+        "org_123", [("App3", "3.0", "hash3")]
+    )
+    mock_inventory_repository.insert_applications.assert_called_once()
+    mock_inventory_repository.insert_inventory_items.assert_called_once_with(
+        device_id, [mock_app]
     )
     mock_inventory_repository.commit.assert_called_once()
     mock_inventory_repository.get_device_inventory.assert_called_once_with(
-        device_id, 0, 100, None, None
+        device_id, 0, 100, None, None, count_mode=CountMode.EXACT
     )
 
     # Assert that _convert_to_response was called for each inventory item
@@ -325,6 +360,124 @@ def test_update_inventory(
         assert response.application is not None
 
 
+def make_app_item(name, version="1.0"):
+    return ApplicationBase(
+        name=name, version=version, publisher="pub1", hash=f"hash-{name}"
+    )
+
+
+def key_of(item):
+    return (item.name, item.version, item.hash)
+
+
+def test_inventory_digest_ignores_order_and_duplicates():
+    first, second = make_app_item("App1"), make_app_item("App2")
+
+    assert inventory_digest([key_of(first), key_of(second)]) == inventory_digest(
+        [key_of(second), key_of(first), key_of(second)]
+    )
+    assert inventory_digest([key_of(first)]) != inventory_digest([key_of(second)])
+
+
+def test_diff_sync_unchanged_digest_skips_inventory(
+    inventory_service, mock_inventory_repository, mock_device_repository
+):
+    set_org_id("org_123")
+    digest = inventory_digest([("App1", "1.0", "hash-App1")])
+    mock_device_repository.get.return_value = Mock(
+        spec=Device, org_id="org_123", inventory_digest=digest
+    )
+
+    result = inventory_service.diff_sync_inventory(
+        "device_123", InventoryDiffSyncRequest(digest=digest)
+    )
+
+    assert result.status == InventorySyncStatus.UNCHANGED
+    assert mock_inventory_repository.method_calls == []
+    mock_device_repository.set_inventory_digest.assert_not_called()
+
+
+def test_diff_sync_changed_digest_without_items_asks_for_them(
+    inventory_service, mock_inventory_repository, mock_device_repository
+):
+    set_org_id("org_123")
+    mock_device_repository.get.return_value = Mock(
+        spec=Device, org_id="org_123", inventory_digest=None
+    )
+
+    result = inventory_service.diff_sync_inventory(
+        "device_123", InventoryDiffSyncRequest(digest="0" * 64)
+    )
+
+    assert result.status == InventorySyncStatus.ITEMS_REQUIRED
+    assert result.digest is None
+    assert mock_inventory_repository.method_calls == []
+
+
+def test_diff_sync_rejects_items_that_do_not_match_digest(
+    inventory_service, mock_device_repository
+):
+    set_org_id("org_123")
+    mock_device_repository.get.return_value = Mock(
+        spec=Device, org_id="org_123", inventory_digest=None
+    )
+
+    with pytest.raises(ValidationException) as exc_info:
+        inventory_service.diff_sync_inventory(
+            "device_123",
+            InventoryDiffSyncRequest(digest="0" * 64, items=[make_app_item("App1")]),
+        )
+
+    assert exc_info.value.error_code == "INVENTORY_DIGEST_MISMATCH"
+
+
+def test_diff_sync_writes_only_the_delta(
+    inventory_service, mock_inventory_repository, mock_device_repository
+):
+    set_org_id("org_123")
+    device_id = "device_123"
+    kept, added = make_app_item("Kept"), make_app_item("Added")
+    digest = inventory_digest([key_of(kept), key_of(added)])
+    mock_device_repository.get.return_value = Mock(
+        spec=Device, org_id="org_123", inventory_digest="stale"
+    )
+    mock_inventory_repository.get_device_application_keys.return_value = {
+        key_of(kept): "app_kept",
+        ("Gone", "1.0", "hash-Gone"): "app_gone",
+    }
+    added_app = Mock(spec=Application, id="app_added")
+    added_app.configure_mock(name="Added", version="1.0", hash="hash-Added")
+    mock_inventory_repository.get_applications_by_keys.return_value = [added_app]
+    new_item = Mock(spec=Inventory, application_id="app_added")
+    mock_inventory_repository.insert_inventory_items.return_value = [new_item]
+    added_response = Mock(spec=InventoryResponse)
+    inventory_service._convert_to_response = Mock(return_value=added_response)
+
+    result = inventory_service.diff_sync_inventory(
+        device_id, InventoryDiffSyncRequest(digest=digest, items=[kept, added])
+    )
+
+    mock_inventory_repository.remove_inventory_items.assert_called_once_with(
+        device_id, ["app_gone"]
+    )
+    mock_inventory_repository.get_applications_by_keys.assert_called_once_with(
+        "org_123", [key_of(added)]
+    )
+    mock_inventory_repository.insert_inventory_items.assert_called_once_with(
+        device_id, [added_app]
+    )
+    mock_device_repository.set_inventory_digest.assert_called_once_with(
+        device_id, digest
+    )
+    mock_inventory_repository.commit.assert_called_once()
+    assert result.status == InventorySyncStatus.UPDATED
+    assert result.digest == digest
+    assert result.removed_application_ids == ["app_gone"]
+    inventory_service._convert_to_response.assert_called_once_with(
+        new_item, application=added_app
+    )
+
+
 def test_delete_inventory_item(inventory_service, mock_inventory_repository):
     set_org_id("org_123")
     inventory_id = "inv_123"
@@ -483,67 +636,90 @@ def test_deny_application_not_found(inventory_service, mock_application_reposito
     mock_application_repository.get.assert_called_once_with(application_id)
 
 
-def test_approve_applications(inventory_service):
-    application_ids = ["app_1", "app_2"]
-    mock_responses = [
-        ApplicationResponse(
-            id="app_1",
-            status=ApprovalStatus.APPROVED,
-            name="App1",
-            version="1.0",
-            publisher="pub1",
-            hash="hash1",
-            organization_id="org1",
-        ),
-        ApplicationResponse(
-            id="app_2",
-            status=ApprovalStatus.APPROVED,
-            name="App2",
-            version="2.0",
-            publisher="pub1",
-            hash="hash1",
-            organization_id="org1",
-        ),
+def make_decided_app(app_id, status):
+    app = Mock(
+        spec=Application,
+        id=app_id,
+        version="1.0",
+        publisher="pub1",
+        hash="hash1",
+        status=status,
+        organization_id="org_123",
+    )
+    app.name = f"App {app_id}"
+    return app
+
+
+def test_approve_applications(
+    inventory_service, mock_application_repository, mock_inventory_repository
+):
+    set_org_id("org_123")
+    mock_application_repository.lock_statuses.return_value = {
+        "app_1": ApprovalStatus.PENDING,
+        "app_2": ApprovalStatus.DENIED,
+    }
+    mock_application_repository.set_status.return_value = [
+        make_decided_app("app_1", ApprovalStatus.APPROVED)
     ]
-    inventory_service.approve_application = Mock(side_effect=mock_responses)
-
-    result = inventory_service.approve_applications(application_ids)
-
-    assert len(result) == 2
-    assert all(isinstance(item, ApplicationResponse) for item in result)
-    assert all(str(item.status) == str(ApprovalStatus.APPROVED) for item in result)
-    inventory_service.approve_application.assert_has_calls(
-        [call("app_1"), call("app_2")]
-    )
-
-
-def test_deny_applications(inventory_service):
-    application_ids = ["app_1", "app_2"]
-    mock_responses = [
-        ApplicationResponse(
-            id="app_1",
-            status=ApprovalStatus.DENIED,
-            name="App1",
-            version="1.0",
-            publisher="pub1",
-            hash="hash1",
-            organization_id="org1",
-        ),
-        ApplicationResponse(
-            id="app_2",
-            status=ApprovalStatus.DENIED,
-            name="App2",
-            version="2.0",
-            publisher="pub1",
-            hash="hash1",
-            organization_id="org1",
-        ),
+
+    result = inventory_service.approve_applications(
+        ["app_1", "app_2", "app_3", "app_1"]
+    )
+
+    mock_application_repository.lock_statuses.assert_called_once_with(
+        "org_123", ["app_1", "app_2", "app_3"]
+    )
+    mock_application_repository.set_status.assert_called_once_with(
+        ["app_1"], ApprovalStatus.APPROVED
+    )
+    mock_inventory_repository.set_status_for_applications.assert_called_once_with(
+        ["app_1"], [ApprovalStatus.PENDING], ApprovalStatus.APPROVED
+    )
+    mock_inventory_repository.commit.assert_called_once()
+    assert [(r.application_id, r.status) for r in result.results] == [
+        ("app_1", "updated"),
+        ("app_2", "already_decided"),
+        ("app_3", "not_found"),
     ]
-    inventory_service.deny_application = Mock(side_effect=mock_responses)
+    assert result.results[0].application.status == "approved"
+    assert (result.updated, result.already_decided, result.not_found) == (1, 1, 1)
+
+
+def test_deny_applications(
+    inventory_service, mock_application_repository, mock_inventory_repository
+):
+    set_org_id("org_123")
+    mock_application_repository.lock_statuses.return_value = {
+        "app_1": ApprovalStatus.PENDING,
+        "app_2": ApprovalStatus.PENDING,
+    }
+    mock_application_repository.set_status.return_value = [
+        make_decided_app("app_1", ApprovalStatus.DENIED),
+        make_decided_app("app_2", ApprovalStatus.DENIED),
+    ]
+
+    result = inventory_service.deny_applications(["app_1", "app_2"])
+
+    mock_application_repository.set_status.assert_called_once_with(
+        ["app_1", "app_2"], ApprovalStatus.DENIED
+    )
+    mock_inventory_repository.set_status_for_applications.assert_called_once_with(
+        ["app_1", "app_2"],
+        [ApprovalStatus.PENDING, ApprovalStatus.APPROVED],
+        ApprovalStatus.DENIED,
+    )
+    assert result.updated == 2
+    assert all(r.status == "updated" for r in result.results)
+
+
+def test_bulk_decision_without_pending_applications_skips_updates(
+    inventory_service, mock_application_repository, mock_inventory_repository
+):
+    set_org_id("org_123")
+    mock_application_repository.lock_statuses.return_value = {}
 
-    result = inventory_service.deny_applications(application_ids)
+    result = inventory_service.approve_applications(["app_9"])
 
-    assert len(result) == 2
-    assert all(isinstance(item, ApplicationResponse) for item in result)
-    assert all(str(item.status) == str(ApprovalStatus.DENIED) for item in result)
-    inventory_service.deny_application.assert_has_calls([call("app_1"), call("app_2")])
+    mock_application_repository.set_status.assert_not_called()
+    mock_inventory_repository.set_status_for_applications.assert_not_called()
+    assert result.not_found == 1